@@ -0,0 +1,134 @@
+import logging
+from typing import TYPE_CHECKING, override
+
+from textual import on
+from textual.app import ComposeResult
+from textual.containers import Container, Horizontal
+from textual.reactive import reactive
+from textual.widget import Widget
+from textual.widgets import Collapsible, Label, Switch
+
+from apps.registry import AppDescriptor
+
+if TYPE_CHECKING:
+    from apps.installable_app import InstallableApp
+    from configuration import ConfigurationData
+    from configuration.profile import ConfigurationProfile
+
+
+class AppWidget(Widget):
+    """
+    Renders an application from its descriptor, the application itself is only loaded when its configuration is expanded
+    or when it is applied
+    """
+
+    DEFAULT_CSS: str = r"""
+    #evenly_spaced {
+        height: 5;
+    }
+    #evenly_spaced Label {
+        height: 100%;
+        content-align: center middle;
+        padding: 1;
+    }
+    #detail {
+        color: gray;
+    }
+    #should_install {
+        border: none none;
+        background: transparent;
+        padding: 0 1 0 2;
+    }
+    #should_install_container {
+        width: auto;
+        height: 100%;
+        align-vertical: middle;
+    }
+    #config {
+        background: transparent;
+    }
+    """
+
+    should_install: reactive[bool] = reactive(True)
+
+    def __init__(
+        self,
+        descriptor: AppDescriptor,
+        should_install: bool = True,
+        profile: "ConfigurationProfile | None" = None,
+    ) -> None:
+        super().__init__()
+        self.descriptor: AppDescriptor = descriptor
+        self.profile: "ConfigurationProfile | None" = profile
+        self.should_install = should_install
+        self.installable_app: "InstallableApp | None" = None
+
+        self.styles.height = "auto"
+        self.styles.border = ("round", "white")
+
+        self.logger: logging.Logger = logging.getLogger(
+            f"{__name__}.{type(self).__name__}"
+        )
+
+    def load(self) -> "InstallableApp":
+        if self.installable_app is None:
+            self.logger.debug("Loading application: %s", self.descriptor.name)
+            self.installable_app = self.descriptor.create(self._load_config_data())
+
+        return self.installable_app
+
+    def _load_config_data(self) -> "ConfigurationData | None":
+        """
+        The application's saved configuration from the profile (None to use the default configuration)
+        """
+        config_class = self.descriptor.load_config_class()
+        if self.profile is None or config_class is None:
+            return None
+
+        try:
+            return self.profile.load(self.descriptor.name, config_class)
+        except ValueError:
+            self.logger.exception(
+                "The saved configuration of %s is not valid, using the default configuration",
+                self.descriptor.name,
+            )
+            return None
+
+    @override
+    def compose(self) -> ComposeResult:
+        yield Horizontal(
+            Horizontal(
+                Container(
+                    Switch(self.should_install, animate=False, id="should_install"),
+                    id="should_install_container",
+                ),
+                Label(self.descriptor.name),
+                id="label_container",
+            ),
+            Label(self.descriptor.detail, id="detail"),
+            id="evenly_spaced",
+        )
+
+        if not self.descriptor.configurable:
+            return
+
+        yield Collapsible(title="Configuration", id="config")
+
+    @on(Collapsible.Expanded, "#config")
+    async def config_expanded(self, expanded: Collapsible.Expanded) -> None:
+        contents = expanded.collapsible.query_one(Collapsible.Contents)
+        if len(contents.children) != 0:
+            return
+
+        installable_app = self.load()
+        if (
+            installable_app.configuration is None
+            or installable_app.configuration.widget is None
+        ):
+            return
+
+        _ = await contents.mount(installable_app.configuration.widget)
+
+    def on_switch_changed(self, event: Switch.Changed) -> None:
+        if event.switch.id == "should_install":
+            self.should_install = event.value
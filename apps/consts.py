@@ -3,6 +3,7 @@ from pathlib import PosixPath
 from typing import Final
 
 
+# The binaries are shipped inside of the `apps` package (see `utils.resources.package_resource`)
 BINARIES_PATH: Final[str] = "binaries"
 RETURN_CODE_SUCCESS: Final[int] = 0
 INSTALL_DIRECTORY: Final[PosixPath] = PosixPath(os.getenv("HOME", "~"), ".local", "bin")
@@ -14,6 +14,5 @@ class EzaApp(TarballApp):
 
     def __init__(self) -> None:
         super().__init__(
-            detail="THE GLORIOUS ICONS ON LS ARE HERE",
             link_path=PosixPath("eza"),
         )
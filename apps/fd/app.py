@@ -14,7 +14,6 @@ class FDApp(TarballApp):
 
     def __init__(self) -> None:
         super().__init__(
-            detail="An actually usable find that follow f-cking gnu",
             link_path=PosixPath("fd"),
             strip_components=True,
         )
@@ -14,6 +14,5 @@ class FZFApp(TarballApp):
 
     def __init__(self) -> None:
         super().__init__(
-            detail="The fuzzy finder will find you anywhere",
             link_path=PosixPath("fzf"),
         )
@@ -1,72 +1,41 @@
 import os
 import logging
-import shutil
-import sys
+from typing import TYPE_CHECKING
 
+from importlib.resources.abc import Traversable
 from pathlib import PosixPath
-from typing import override
 
 from apps import consts
+from apps.registry import get_app_descriptor
 import utils
+from utils.requirements.binary_requirements import MissingBinariesError
+from utils.resources import package_resource, resource_digest
 
 from configuration import Configuration
-from textual.app import ComposeResult
-from textual.containers import Container, Horizontal
-from textual.reactive import reactive
-from textual.widget import Widget
-from textual.widgets import Collapsible, Label, Switch
-
-
-class InstallableApp(Widget):
-    DEFAULT_CSS: str = r"""
-    #evenly_spaced {
-        height: 5;
-    }
-    #evenly_spaced Label {
-        height: 100%;
-        content-align: center middle;
-        padding: 1;
-    }
-    #detail {
-        color: gray;
-    }
-    #should_install {
-        border: none none;
-        background: transparent;
-        padding: 0 1 0 2;
-    }
-    #should_install_container {
-        width: auto;
-        height: 100%;
-        align-vertical: middle;
-    }
-    #config {
-        background: transparent;
-    }
+
+if TYPE_CHECKING:
+    from apps.journal import ApplyJournal
+
+
+class InstallableApp:
+    """
+    Installs (and configures) an application, the UI renders it through `apps.app_widget.AppWidget`
     """
 
     BINARIES: dict[str, str | None] = {}
     BINARY_NAME: str = ""
     CWD: str = ""
 
-    should_install: reactive[bool] = reactive(True)
-
     def __init__(
         self,
         label: str,
         should_install: bool = True,
-        detail: str = "",
         configuration: Configuration | None = None,
     ) -> None:
-        super().__init__()
         self.label: str = label
-        self.detail: str = detail
-        self.should_install = should_install
+        self.should_install: bool = should_install
         self.configuration: Configuration | None = configuration
 
-        self.styles.height = "auto"
-        self.styles.border = ("round", "white")
-
         self.logger: logging.Logger = logging.getLogger(
             f"{__name__}.{type(self).__name__}"
         )
@@ -74,6 +43,10 @@ class InstallableApp(Widget):
         self._validate_binaries()
         self._log_paths()
 
+    @property
+    def detail(self) -> str:
+        return get_app_descriptor(self.label).detail
+
     @property
     def home_path(self):
         home_path = os.getenv("HOME")
@@ -82,13 +55,12 @@ class InstallableApp(Widget):
         return home_path
 
     @property
-    def full_source_directory(self):
-        full_cwd = os.getcwd()
-        return PosixPath(full_cwd, type(self).CWD)
+    def full_source_directory(self) -> Traversable:
+        return package_resource("apps", type(self).CWD)
 
     @property
-    def full_source_path(self):
-        return PosixPath(self.full_source_directory, type(self).BINARY_NAME)
+    def full_source_path(self) -> Traversable:
+        return self.full_source_directory.joinpath(type(self).BINARY_NAME)
 
     @property
     def full_target_path(self):
@@ -98,23 +70,28 @@ class InstallableApp(Widget):
     def backup_directory_path(self) -> PosixPath:
         return PosixPath(self.home_path, ".local", "backups")
 
-    @property
-    def resources_directory_path(self) -> PosixPath:
-        return PosixPath(self.full_source_directory, "..", "resources")
+    def source_digest(self) -> str:
+        """
+        The digest of what the application is installed from
+        """
+        return resource_digest(self.full_source_path)
+
+    def is_installed(self) -> bool:
+        return os.path.lexists(self.full_target_path)
 
     def _validate_binaries(self):
-        is_any_binary_missing: bool = False
+        missing_binaries: list[str] = []
 
         for binary_name in type(self).BINARIES.keys():
             binary_path = utils.find_executable(binary_name)
             if binary_path is None:
                 self.logger.fatal(f"BINARY NOT FOUND: {binary_name}")
-                is_any_binary_missing = True
+                missing_binaries.append(binary_name)
 
             type(self).BINARIES[binary_name] = binary_path
 
-        if is_any_binary_missing:
-            sys.exit(1)
+        if len(missing_binaries) != 0:
+            raise MissingBinariesError(missing_binaries)
 
     def _log_paths(self):
         self.logger.debug(f"home_path: {self.home_path}")
@@ -123,30 +100,6 @@ class InstallableApp(Widget):
         self.logger.debug(f"full_target_path: {self.full_target_path}")
         self.logger.debug(f"backup_directory_path: {self.backup_directory_path}")
 
-    @override
-    def compose(self) -> ComposeResult:
-        yield Horizontal(
-            Horizontal(
-                Container(
-                    Switch(self.should_install, animate=False, id="should_install"),
-                    id="should_install_container",
-                ),
-                Label(self.label),
-                id="label_container",
-            ),
-            Label(self.detail, id="detail"),
-            id="evenly_spaced",
-        )
-
-        if self.configuration is None or self.configuration.widget is None:
-            return
-
-        yield Collapsible(self.configuration.widget, title="Configuration", id="config")
-
-    def on_switch_changed(self, event: Switch.Changed) -> None:
-        if event.switch.id == "should_install":
-            self.should_install = event.value
-
     def get_binary_path(self, binary_name: str) -> str:
         binary_path: str | None = type(self).BINARIES.get(binary_name, None)
 
@@ -184,8 +137,6 @@ class InstallableApp(Widget):
             self.logger.warning(
                 f"The binary: {type(self).BINARY_NAME} did not install correctly (is it already installed?)"
             )
-            if self.full_source_path.exists():
-                shutil.rmtree(self.full_source_path.as_posix())
             return False
 
         self.logger.info("Installed successfully")
@@ -194,7 +145,9 @@ class InstallableApp(Widget):
     async def _configure(self, config: Configuration) -> bool:
         raise NotImplementedError
 
-    def configure(self, config: Configuration | None = None) -> bool:
+    def configure(
+        self, config: Configuration | None = None, prepare: bool = True
+    ) -> bool:
         configuration = self.configuration if config is None else config
 
         if configuration is None:
@@ -202,7 +155,7 @@ class InstallableApp(Widget):
             return True
 
         self.logger.info("Configuring application")
-        result: bool = configuration.config()
+        result: bool = configuration.config(prepare)
 
         if not result:
             self.logger.error("Failed to configure application")
@@ -211,7 +164,26 @@ class InstallableApp(Widget):
         self.logger.info("Successfully configured application")
         return True
 
-    async def install_and_configure(self) -> bool:
+    async def install_and_configure(
+        self, journal: "ApplyJournal | None" = None, force: bool = False
+    ) -> bool:
+        """
+        With a journal, only the steps whose inputs changed since the last successful apply are run
+        """
+        if journal is not None:
+            plan = journal.plan(self, force=force)
+            did_install = await self.install() if plan.install else True
+            did_configure = (
+                self.configure(prepare=plan.prepare) if plan.configure else True
+            )
+            journal.record(
+                self,
+                installed=plan.install,
+                configured=plan.configure and did_configure,
+            )
+            journal.save()
+            return did_install and did_configure
+
         did_install = await self.install()
 
         if self.configuration is None:
@@ -0,0 +1,166 @@
+import json
+import logging
+from dataclasses import asdict, dataclass, replace
+from pathlib import PosixPath
+from typing import TYPE_CHECKING
+
+from utils.atomic_write import FsyncPolicy, atomic_write
+from utils.state import state_directory
+
+if TYPE_CHECKING:
+    from apps.installable_app import InstallableApp
+
+JOURNAL_FILE_NAME: str = "journal.json"
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class AppFingerprint:
+    """
+    The inputs of the last successful apply of an application
+    """
+
+    install: str | None = None
+    "The digest of what the application was installed from"
+
+    config: str | None = None
+    "The fingerprint of the configuration (see `ConfigurationData.fingerprint`)"
+
+    resources: str | None = None
+    "The version of the resources that were copied with the configuration"
+
+    config_file: str | None = None
+    "The digest of the configuration file that was written, so changes made to it by hand are noticed"
+
+
+@dataclass(frozen=True)
+class ApplyPlan:
+    """
+    The steps of an apply that have to run, because their inputs changed
+    """
+
+    install: bool
+    configure: bool
+    prepare: bool
+    "Whether the resources of the configuration have to be copied as well"
+
+    @property
+    def skipped(self) -> bool:
+        return not self.install and not self.configure
+
+
+class ApplyJournal:
+    """
+    Remembers the fingerprint of every application's last successful apply (keyed by the application's binary name),
+    so an apply only runs the applications (and the steps) whose inputs changed
+    """
+
+    def __init__(self, path: PosixPath | None = None) -> None:
+        self.path: PosixPath = path or state_directory(JOURNAL_FILE_NAME)
+        self.fingerprints: dict[str, AppFingerprint] = self._load()
+
+    def _load(self) -> dict[str, AppFingerprint]:
+        try:
+            with open(self.path, "r") as journal_file:
+                raw_journal: dict[str, dict[str, str | None]] = json.load(journal_file)
+
+            return {
+                app_name: AppFingerprint(**raw_fingerprint)
+                for app_name, raw_fingerprint in raw_journal.items()
+            }
+        except FileNotFoundError:
+            return {}
+        except (ValueError, TypeError):
+            logger.warning(
+                "The apply journal is corrupted, ignoring it (%s)", self.path
+            )
+            return {}
+
+    def save(self) -> None:
+        raw_journal = {
+            app_name: asdict(fingerprint)
+            for app_name, fingerprint in self.fingerprints.items()
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write(
+            self.path,
+            json.dumps(raw_journal, indent=2, sort_keys=True).encode(),
+            FsyncPolicy.FILE,
+        )
+
+    @staticmethod
+    def _source_digest(installable_app: "InstallableApp") -> str | None:
+        try:
+            return installable_app.source_digest()
+        except OSError:
+            # Without a source the install is always attempted (and reports its own error)
+            return None
+
+    def plan(
+        self,
+        installable_app: "InstallableApp",
+        install: bool = True,
+        configure: bool = True,
+        force: bool = False,
+    ) -> ApplyPlan:
+        configuration = installable_app.configuration
+        previous = self.fingerprints.get(type(installable_app).BINARY_NAME)
+
+        if force or previous is None:
+            return ApplyPlan(
+                install=install,
+                configure=configure and configuration is not None,
+                prepare=True,
+            )
+
+        source_digest = self._source_digest(installable_app)
+        should_install = install and (
+            source_digest is None
+            or previous.install != source_digest
+            or not installable_app.is_installed()
+        )
+
+        if not configure or configuration is None:
+            return ApplyPlan(install=should_install, configure=False, prepare=False)
+
+        config_data = configuration.config_data
+        should_prepare = (
+            previous.resources != config_data.resources_version
+            or not config_data.resources_deployed()
+        )
+        should_configure = (
+            should_prepare
+            or previous.config != config_data.fingerprint()
+            or previous.config_file != config_data.config_file_digest()
+        )
+
+        return ApplyPlan(
+            install=should_install, configure=should_configure, prepare=should_prepare
+        )
+
+    def record(
+        self, installable_app: "InstallableApp", installed: bool, configured: bool
+    ) -> None:
+        """
+        Records the steps of the apply that ran successfully (call `save` to write the journal)
+        """
+        app_name = type(installable_app).BINARY_NAME
+        fingerprint = self.fingerprints.get(app_name, AppFingerprint())
+
+        # Installing an application that is already installed "fails", so the result of the install is not enough
+        if installed and installable_app.is_installed():
+            fingerprint = replace(
+                fingerprint, install=self._source_digest(installable_app)
+            )
+
+        if configured and installable_app.configuration is not None:
+            config_data = installable_app.configuration.config_data
+            fingerprint = replace(
+                fingerprint,
+                config=config_data.fingerprint(),
+                resources=config_data.resources_version,
+                config_file=config_data.config_file_digest(),
+            )
+
+        self.fingerprints[app_name] = fingerprint
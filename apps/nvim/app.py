@@ -14,7 +14,6 @@ class NVIMApp(TarballApp):
 
     def __init__(self) -> None:
         super().__init__(
-            detail="THE BEST EDITOR ON THE PLANET",
             link_path=PosixPath("bin", "nvim"),
             strip_components=True,
         )
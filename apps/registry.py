@@ -0,0 +1,126 @@
+import importlib
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Final
+
+if TYPE_CHECKING:
+    from apps.installable_app import InstallableApp
+    from configuration import ConfigurationData
+
+
+@dataclass(frozen=True)
+class AppDescriptor:
+    """
+    A lightweight description of an installable application.
+    The application's module (and with it the configuration model) is only imported when the application is loaded
+    """
+
+    name: str
+    "The name of the application, as shown in the UI and used on the command line"
+
+    detail: str
+    "A short detail about the application (the application itself reads it from here)"
+
+    module_path: str
+    "The module that exposes the application's class"
+
+    class_name: str
+    "The name of the application's class inside of the module"
+
+    config_class_name: str | None = None
+    "The name of the application's configuration data class inside of the module (if it has a configuration)"
+
+    show_in_ui: bool = True
+    "Whether or not the application is shown in the UI"
+
+    @property
+    def configurable(self) -> bool:
+        return self.config_class_name is not None
+
+    def load(self) -> type["InstallableApp"]:
+        module = importlib.import_module(self.module_path)
+        return getattr(module, self.class_name)
+
+    def load_config_class(self) -> type["ConfigurationData"] | None:
+        if self.config_class_name is None:
+            return None
+
+        module = importlib.import_module(self.module_path)
+        return getattr(module, self.config_class_name)
+
+    def create(
+        self, config_data: "ConfigurationData | None" = None
+    ) -> "InstallableApp":
+        if config_data is None:
+            return self.load()()
+
+        return self.load()(config_data)  # pyright: ignore[reportCallIssue]
+
+
+APPS: Final[list[AppDescriptor]] = [
+    AppDescriptor(
+        name="zsh",
+        detail="The simple, modern shell that is posix compliant",
+        module_path="apps.zsh",
+        class_name="ZshApp",
+        config_class_name="ZshConfigData",
+    ),
+    AppDescriptor(
+        name="zellij",
+        detail="The new terminal multiplexer on the block",
+        module_path="apps.zellij",
+        class_name="ZellijApp",
+        config_class_name="ZellijConfigData",
+    ),
+    AppDescriptor(
+        name="tmux",
+        detail="Your normal terminal multiplexer",
+        module_path="apps.tmux",
+        class_name="TmuxApp",
+        config_class_name="TmuxConfigData",
+        show_in_ui=False,
+    ),
+    AppDescriptor(
+        name="nvim",
+        detail="THE BEST EDITOR ON THE PLANET",
+        module_path="apps.nvim",
+        class_name="NVIMApp",
+    ),
+    AppDescriptor(
+        name="fd",
+        detail="An actually usable find that follow f-cking gnu",
+        module_path="apps.fd",
+        class_name="FDApp",
+    ),
+    AppDescriptor(
+        name="fzf",
+        detail="The fuzzy finder will find you anywhere",
+        module_path="apps.fzf",
+        class_name="FZFApp",
+    ),
+    AppDescriptor(
+        name="rg",
+        detail="The fastest grepping in the west",
+        module_path="apps.ripgrep",
+        class_name="RipGrepApp",
+    ),
+    AppDescriptor(
+        name="zoxide",
+        detail="This will change how you enter directories... (it's cool I promise)",
+        module_path="apps.zoxide",
+        class_name="ZoxideApp",
+    ),
+    AppDescriptor(
+        name="eza",
+        detail="THE GLORIOUS ICONS ON LS ARE HERE",
+        module_path="apps.eza",
+        class_name="EzaApp",
+    ),
+]
+
+
+def get_app_descriptor(name: str) -> AppDescriptor:
+    for descriptor in APPS:
+        if descriptor.name == name:
+            return descriptor
+
+    raise KeyError(f"Unknown application: {name}")
@@ -14,7 +14,6 @@ class RipGrepApp(TarballApp):
 
     def __init__(self) -> None:
         super().__init__(
-            detail="The fastest grepping in the west",
             link_path=PosixPath("rg"),
             strip_components=True,
         )
@@ -1,12 +1,15 @@
 import os
+from importlib.resources.abc import Traversable
 from pathlib import PosixPath
 import shutil
 import subprocess
 import sys
+import tempfile
 from typing import override
 from apps import consts
 from apps.installable_app import InstallableApp
 from configuration import Configuration
+from utils.resources import resource_digest
 
 
 class TarballApp(InstallableApp):
@@ -20,13 +23,11 @@ class TarballApp(InstallableApp):
     def __init__(
         self,
         link_path: PosixPath,
-        detail: str = "",
         strip_components: bool = False,
         configuration: Configuration | None = None,
     ) -> None:
         super().__init__(
             label=type(self).BINARY_NAME,
-            detail=detail,
             configuration=configuration,
         )
 
@@ -34,8 +35,24 @@ class TarballApp(InstallableApp):
         self.link_path: PosixPath = link_path
 
     @property
-    def archive_name(self):
-        return f"{self.full_source_path}.tar.gz"
+    def archive(self) -> Traversable:
+        return self.full_source_directory.joinpath(f"{type(self).BINARY_NAME}.tar.gz")
+
+    @property
+    def target_unarchive_path(self) -> str:
+        return (
+            f"{self.full_target_path.as_posix()}{type(self).UNARCHIVE_DIRECTORY_PREFIX}"
+        )
+
+    @override
+    def source_digest(self) -> str:
+        return resource_digest(self.archive)
+
+    @override
+    def is_installed(self) -> bool:
+        return os.path.lexists(self.target_unarchive_path) and os.path.lexists(
+            self.full_target_path
+        )
 
     @property
     def full_link_path(self):
@@ -50,32 +67,57 @@ class TarballApp(InstallableApp):
         tar_path: str = self.get_binary_path("tar")
         self.logger.debug(f"Binary path of tar ({tar_path})")
 
+        if os.path.lexists(self.target_unarchive_path):
+            self.logger.warning(
+                f"Failed to move the target directory, file already exists in: {self.target_unarchive_path}"
+            )
+            return False
+
         self.logger.debug(
-            f"Making sure that the source unarchive directory exists ({consts.INSTALL_DIRECTORY})"
+            f"Creating the staging unarchive directory in ({consts.INSTALL_DIRECTORY})"
+        )
+        staging_path = PosixPath(
+            tempfile.mkdtemp(
+                prefix=f".{type(self).BINARY_NAME}-", dir=consts.INSTALL_DIRECTORY
+            )
         )
-        self.full_source_path.mkdir(parents=True, exist_ok=True)
 
+        try:
+            return self._unarchive(tar_path, staging_path)
+        finally:
+            shutil.rmtree(staging_path, ignore_errors=True)
+
+    def _unarchive(self, tar_path: str, staging_path: PosixPath) -> bool:
         tar_unarchive_args = [
             tar_path,
             "-xzf",
-            self.archive_name,
+            "-",
             "-C",
-            self.full_source_path.as_posix(),
+            staging_path.as_posix(),
         ]
 
         if self.strip_components:
             tar_unarchive_args += ["--strip-components=1"]
 
         self.logger.debug(
-            f"Creating tar subprocess to un-archive the gzip ({' '.join(tar_unarchive_args)})"
+            f"Creating tar subprocess to un-archive the gzip ({' '.join(tar_unarchive_args)}), reading from ({self.archive})"
         )
 
-        unarchive_process = subprocess.Popen(
-            tar_unarchive_args,
-            cwd=self.full_source_directory,
-            stdout=sys.stdout,
-            stderr=sys.stderr,
-        )
+        # The archive is streamed to tar, so it can be read straight from the zipapp
+        with self.archive.open("rb") as archive_file:
+            unarchive_process = subprocess.Popen(
+                tar_unarchive_args,
+                stdin=subprocess.PIPE,
+                stdout=sys.stdout,
+                stderr=sys.stderr,
+            )
+
+            try:
+                shutil.copyfileobj(archive_file, unarchive_process.stdin)
+            except BrokenPipeError:
+                pass
+            finally:
+                unarchive_process.stdin.close()
 
         return_code = unarchive_process.wait()
         if return_code != consts.RETURN_CODE_SUCCESS:
@@ -83,16 +125,15 @@ class TarballApp(InstallableApp):
 
         self.logger.debug("Un-archived the gzip archive successfully")
 
-        target_unarchive_path = (
-            f"{self.full_target_path.as_posix()}{type(self).UNARCHIVE_DIRECTORY_PREFIX}"
-        )
+        target_unarchive_path = self.target_unarchive_path
 
         try:
-            _ = shutil.move(self.full_source_path.as_posix(), target_unarchive_path)
+            # The staging directory is inside of the install directory, so this is a single rename
+            os.rename(staging_path, target_unarchive_path)
             self.logger.debug(
                 f"Moved the executable to the target path ({target_unarchive_path})"
             )
-        except shutil.Error:
+        except OSError:
             self.logger.warning(
                 f"Failed to move the target directory, file already exists in: {target_unarchive_path}"
             )
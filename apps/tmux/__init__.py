@@ -1,5 +1,4 @@
 from .app import TmuxApp
 from .config_data import TmuxConfigData
-from .config_widget import TmuxConfigWidget
 
-__all__ = ["TmuxApp", "TmuxConfigData", "TmuxConfigWidget"]
+__all__ = ["TmuxApp", "TmuxConfigData"]
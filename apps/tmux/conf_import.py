@@ -0,0 +1,166 @@
+from tree_sitter import Node
+
+from configuration.rc_import import (
+    RcImport,
+    argument_text,
+    command_arguments,
+    node_text,
+    parse_shell,
+)
+
+SET_COMMANDS: frozenset[str] = frozenset(
+    {"set", "set-option", "setw", "set-window-option"}
+)
+BIND_COMMANDS: frozenset[str] = frozenset({"bind", "bind-key"})
+UNBIND_COMMANDS: frozenset[str] = frozenset({"unbind", "unbind-key"})
+
+RENDERED_OPTIONS: frozenset[str] = frozenset({"pane-base-index", "renumber-windows"})
+"Options configold renders along with the ones it imports (e.g. with the base index)"
+
+VIM_COPY_MODE_BINDINGS: frozenset[str] = frozenset(
+    {"v send -X begin-selection", "V send -X select-line"}
+)
+"The copy mode keybindings that are rendered with the vim copy mode"
+
+
+class _TmuxConfImporter:
+    def __init__(self) -> None:
+        # The imported file is the whole configuration, so everything starts from tmux's defaults (instead of configold's)
+        self.result: RcImport = RcImport(
+            config={
+                "prefix": "C-b",
+                "keybindings": {},
+                "mouse_support": False,
+                "tpm": False,
+                "plugins": [],
+                "status_position": "bottom",
+                "base_index": 0,
+                "scroll_vim_mode": False,
+            }
+        )
+        self._unbound_keys: set[str] = set()
+
+    def _set(self, words: list[str]) -> bool | None:
+        """
+        Imports a `set` command, True if it was imported, False if configold renders it by itself, None if it is not supported
+        """
+        flags = [word for word in words if word.startswith("-")]
+        if any(flag not in ("-g", "-w", "-gw", "-wg") for flag in flags):
+            return None
+
+        arguments = [word for word in words if not word.startswith("-")]
+        if len(arguments) != 2:
+            return None
+
+        option, value = arguments
+        config = self.result.config
+
+        if option == "@plugin":
+            owner, _, plugin = value.rpartition("/")
+            if owner == "tmux-plugins" and plugin == "tpm":
+                config["tpm"] = True
+            elif owner == "tmux-plugins":
+                config["plugins"].append(plugin)
+            elif owner == "themes" and plugin.startswith("theme-"):
+                config["theme"] = plugin.removeprefix("theme-")
+            else:
+                return None
+        elif option == "prefix":
+            config["prefix"] = value
+        elif option == "mouse" and value in ("on", "off"):
+            config["mouse_support"] = value == "on"
+        elif option == "status-position" and value in ("top", "bottom"):
+            config["status_position"] = value
+        elif option == "base-index" and value.isdigit():
+            config["base_index"] = int(value)
+        elif option == "mode-keys" and value in ("vi", "emacs"):
+            config["scroll_vim_mode"] = value == "vi"
+        elif option in RENDERED_OPTIONS:
+            return False
+        else:
+            return None
+
+        return True
+
+    def _bind(self, command: Node, arguments: list[Node]) -> bool | None:
+        words = [argument_text(argument) for argument in arguments]
+        bind_type = ""
+
+        if words[:2] == ["-T", "copy-mode-vi"]:
+            binding = " ".join(words[2:])
+            return False if binding in VIM_COPY_MODE_BINDINGS else None
+
+        if words[:1] == ["-n"]:
+            bind_type = "-n"
+            arguments, words = arguments[1:], words[1:]
+
+        if len(words) < 2 or words[0].startswith("-"):
+            return None
+
+        # The command is kept as written (with its quoting), it is rendered as is
+        key = words[0]
+        value = node_text(command)[arguments[1].start_byte - command.start_byte :]
+        self.result.config["keybindings"][key] = {
+            "unbind": key in self._unbound_keys,
+            "bind_type": bind_type,
+            "bind_value": value,
+        }
+        return True
+
+    def _statement(self, statement: Node) -> bool | None:
+        if statement.has_error or statement.type != "command":
+            return None
+
+        name, arguments = command_arguments(statement)
+        words = [argument_text(argument) for argument in arguments]
+
+        if name in SET_COMMANDS:
+            if words[-2:-1] == ["TMUX_PLUGIN_MANAGER_PATH"]:
+                return False
+
+            return self._set(words)
+
+        if name == "set-environment" and "TMUX_PLUGIN_MANAGER_PATH" in words:
+            return False
+
+        if name in BIND_COMMANDS:
+            return self._bind(statement, arguments)
+
+        if name in UNBIND_COMMANDS and len(words) == 1:
+            self._unbound_keys.add(words[0])
+            return False
+
+        if name in ("run", "run-shell") and len(words) >= 1:
+            if words[-1].endswith("tpm/tpm"):
+                self.result.config["tpm"] = True
+                return True
+
+        return None
+
+    def feed(self, statement: Node) -> None:
+        if statement.type == "comment":
+            return
+
+        text = node_text(statement)
+        self.result.statements += 1
+
+        imported = self._statement(statement)
+        if imported is None:
+            self.result.unsupported.append(text)
+        elif imported:
+            self.result.imported += 1
+        else:
+            self.result.dropped.append(text)
+
+
+def import_config_file(source: bytes) -> RcImport:
+    """
+    Imports an existing tmux.conf: the prefix, the keybindings, the plugins and the options configold renders.
+    The rest of the statements are reported as unsupported
+    """
+    importer = _TmuxConfImporter()
+
+    for statement in parse_shell(source).root_node.named_children:
+        importer.feed(statement)
+
+    return importer.result
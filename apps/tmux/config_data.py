@@ -1,8 +1,7 @@
 import os
 from enum import StrEnum
 from pathlib import PosixPath
-import shutil
-from typing import ClassVar, Literal, TextIO, override
+from typing import ClassVar, Literal, override
 
 from pydantic import BaseModel, Field
 from configuration import ConfigurationData
@@ -23,6 +22,9 @@ class TmuxKeybinding(BaseModel):
 class TmuxConfigData(ConfigurationData):
     CONFIG_FILE_NAME: ClassVar[str] = ".tmux.conf"
     CONFIG_NAME: ClassVar[str] = "tmux"
+    CONFIG_FILE_IMPORTER: ClassVar[str | None] = "apps.tmux.conf_import"
+    # tpm installs the plugins into the resources
+    MUTABLE_RESOURCES: ClassVar[tuple[str, ...]] = ("plugins",)
 
     resource_target_path: PosixPath = Field(
         default_factory=lambda: PosixPath(
@@ -90,140 +92,30 @@ class TmuxConfigData(ConfigurationData):
     scroll_vim_mode: bool = Field(default=True)
     "If the scroll mode in tmux has vim keybindings"
 
-    def _copy_resources(self) -> None:
-        self.resource_target_path.mkdir(parents=True, exist_ok=True)
-
-        _ = shutil.copytree(
-            self.resources_path.as_posix(),
-            self.resource_target_path.as_posix(),
-            dirs_exist_ok=True,
-        )
-
-    def _config_keybindings(self, config_file: TextIO) -> None:
-        _ = config_file.write("# All of your keybindings for tmux\n")
-
-        for bind_key, tmux_keybind in self.keybindings.items():
-            if tmux_keybind.unbind:
-                _ = config_file.write(f"unbind {bind_key}\n")
-
-            _ = config_file.write("bind")
-            if tmux_keybind.bind_type != TmuxKeybindingType.NORMAL:
-                _ = config_file.write(" ")
-
-            _ = config_file.write(
-                f"{tmux_keybind.bind_type} {bind_key} {tmux_keybind.bind_value}\n"
-            )
-
-        _ = config_file.write("\n")
-
-    def _convert_bool_to_tmux_value(
-        self, boolean: bool
-    ) -> Literal["on"] | Literal["off"]:
-        return "on" if boolean else "off"
-
-    def _config_prefix(self, config_file: TextIO) -> None:
-        _ = config_file.write(
-            "# The prefix is what you press before pressing another key to activate keybind\n"
-        )
-        _ = config_file.write(f"set -g prefix {self.prefix}\n\n")
-
-    def _config_mouse_support(self, config_file: TextIO) -> None:
-        # tmux's default is off
-
-        if not self.mouse_support:
-            return
-
-        _ = config_file.write(
-            "# The prefix is what you press before pressing another key to activate keybind\n"
-        )
-        _ = config_file.write(
-            f"set -g mouse {self._convert_bool_to_tmux_value(self.mouse_support)}\n\n"
-        )
-
-    def _config_plugins(self, config_file: TextIO) -> None:
-        if not self.tpm:
-            return
-
-        plugins_directory = PosixPath(self.resource_target_path, "plugins")
-
-        config_file.writelines(
-            [
-                "# Setting the plugins directory to your installed one\n",
-                f"set-environment -g TMUX_PLUGIN_MANAGER_PATH '{plugins_directory}'\n",
-                "\n",
-                "# Here you can define all of the plugins you want to install for tmux\n",
-                "set -g @plugin 'tmux-plugins/tpm'\n",
-            ]
-        )
-
-        config_file.writelines(
-            [f"set -g @plugin 'tmux-plugins/{plugin}'\n" for plugin in self.plugins]
-        )
-        _ = config_file.write("\n")
-
-    def _config_theme(self, config_file: TextIO) -> None:
-        _ = config_file.write("# This is your theme, it defines how tmux should look\n")
-        _ = config_file.write(f"set -g @plugin 'themes/theme-{self.theme}'\n")
-        _ = config_file.write("\n")
-
-    def _run_tpm(self, config_file: TextIO) -> None:
-        tpm_path = PosixPath(self.resource_target_path, "tpm", "tpm")
-        _ = config_file.write(f"run '{tpm_path}'\n")
-
-    def _config_status_bar(self, config_file: TextIO) -> None:
-        _ = config_file.write("# The status bar configuration\n")
-        _ = config_file.write(f"set-option -g status-position {self.status_position}\n")
-
-        _ = config_file.write("\n")
-
-    def _config_base_index(self, config_file: TextIO) -> None:
-        # The tmux default is 0
-
-        if self.base_index == 0:
-            return
-
-        _ = config_file.write(
-            "# The base index is the starting index of tmux windows\n"
-        )
-        _ = config_file.writelines(
-            [
-                f"set -g base-index {self.base_index}\n",
-                f"set -g pane-base-index {self.base_index}\n",
-                f"set-window-option -g pane-base-index {self.base_index}\n",
-                "set-option -g renumber-windows on\n",
-            ]
-        )
-
-        _ = config_file.write("\n")
+    @override
+    def resources_deployed(self) -> bool:
+        return self.resource_target_path.is_dir()
 
-    def _config_scroll_vim_mode(self, config_file: TextIO) -> None:
-        # The tmux default is false
-        if not self.scroll_vim_mode:
-            return
+    @property
+    @override
+    def deployed_resources_path(self) -> PosixPath | None:
+        return self.resource_target_path
 
-        config_file.writelines(
-            [
-                "# Enabled vim mode for the scrolling in tmux\n",
-                "set-window-option -g mode-keys vi\n",
-                "bind-key -T copy-mode-vi v send -X begin-selection\n",
-                "bind-key -T copy-mode-vi V send -X select-line\n",
-            ]
-        )
-        _ = config_file.write("\n")
+    @override
+    def _sections(self) -> list[str]:
+        return [
+            "prefix",
+            "keybindings",
+            "mouse",
+            "status-bar",
+            "base-index",
+            "vim-copy-mode",
+            "theme",
+            "plugins",
+            "tpm",
+        ]
 
     @override
     def _config(self) -> bool:
-        self._copy_resources()
-
-        with open(self.config_path, "w+") as config_file:
-            self._config_prefix(config_file)
-            self._config_keybindings(config_file)
-            self._config_mouse_support(config_file)
-            self._config_status_bar(config_file)
-            self._config_base_index(config_file)
-            self._config_scroll_vim_mode(config_file)
-            self._config_theme(config_file)
-            self._config_plugins(config_file)
-            self._run_tpm(config_file)
-
+        self.deploy_resources()
         return True
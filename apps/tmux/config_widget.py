@@ -1,4 +1,4 @@
-from configuration import ConfigurationWidget
+from configuration.widget import ConfigurationWidget
 from .config_data import TmuxConfigData
 
 
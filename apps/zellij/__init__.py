@@ -1,5 +1,4 @@
 from .app import ZellijApp
 from .config_data import ZellijConfigData
-from .config_widget import ZellijConfigWidget
 
-__all__ = ["ZellijApp", "ZellijConfigData", "ZellijConfigWidget"]
+__all__ = ["ZellijApp", "ZellijConfigData"]
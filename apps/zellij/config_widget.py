@@ -6,7 +6,7 @@ from textual.containers import Horizontal
 from textual.widgets import Input, Switch
 
 from .config_data import ZellijConfigData
-from configuration import ConfigurationWidget
+from configuration.widget import ConfigurationWidget
 from configuration.widget import LabelWithTooltip
 
 
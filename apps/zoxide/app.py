@@ -15,6 +15,5 @@ class ZoxideApp(TarballApp):
 
     def __init__(self) -> None:
         super().__init__(
-            detail="This will change how you enter directories... (it's cool I promise)",
             link_path=PosixPath("zoxide"),
         )
@@ -1,6 +1,5 @@
 from .app import ZshApp
 from .config_data import ZshConfigData
-from .config_widget import ZshConfigWidget
 from .plugin_managers import (
     OmzPluginManager,
     ZinitPluginManager,
@@ -11,7 +10,6 @@ from .plugin_managers import (
 __all__ = [
     "ZshApp",
     "ZshConfigData",
-    "ZshConfigWidget",
     "OmzPluginManager",
     "ZinitPluginManager",
     "ZshPluginManager",
@@ -3,7 +3,6 @@ from pathlib import PosixPath
 from apps import consts
 from apps.tarball import TarballApp
 from .config_data import ZshConfigData
-from .config_widget import ZshConfigWidget
 from configuration import Configuration
 
 
@@ -17,14 +16,13 @@ class ZshApp(TarballApp):
 
     def __init__(self, configuration: ZshConfigData | None = None) -> None:
         super().__init__(
-            detail="The simple, modern shell that is posix compliant",
             configuration=Configuration(
                 config_data=ZshConfigData(
                     backup_directory_path=self.backup_directory_path
                 )
                 if configuration is None
                 else configuration,
-                widget=ZshConfigWidget(),
+                widget="apps.zsh.config_widget:ZshConfigWidget",
             ),
             link_path=PosixPath("bin", "zsh"),
         )
@@ -1,22 +1,51 @@
+import hashlib
 import json
 import os
 from pathlib import PosixPath
-import shutil
 
-from pprint import pformat
-from typing import ClassVar, TextIO, override
+from typing import Any, ClassVar, override
 from pydantic import Field
 
 from apps import consts
 
-from .plugin_managers import ZshPluginManager, ZshPluginManagerType, get_plugin_manager
-from configuration.data import ConfigurationData
+from .plugin_managers import ZshPluginManagerType, get_plugin_manager
+from .zcompile import (
+    compile_sources,
+    compiled_path,
+    remove_compiled,
+    sourced_files,
+)
+from configuration.data import ConfigurationData, ResourceDeployMode
+from configuration.templates import template_environment
+from utils.atomic_write import atomic_write
+from utils.find_executable import find_executable
 from utils.requirements.binary_requirements import BinaryRequirement
+from utils.resource_sync import ResourceSelection
+
+LIVE_PIECES: dict[str, tuple[str, str]] = {
+    "exports": ("exports", "unset"),
+    "aliases": ("aliases", "unalias"),
+    "suffix-aliases": ("suffix_aliases", "unalias -s"),
+    "zstyle": ("zstyle", ""),
+}
+"The sections running shells apply when they change: the field they are rendered from, and the command that removes a name that is gone"
 
 
 class ZshConfigData(ConfigurationData):
     CONFIG_FILE_NAME: ClassVar[str] = ".zshrc"
     CONFIG_NAME: ClassVar[str] = "zsh"
+    RENDERER_MODULES: ClassVar[tuple[str, ...]] = (
+        "apps.zsh.plugin_managers.plugin_manager",
+        "apps.zsh.plugin_managers.omz_plugin_mananger",
+        "apps.zsh.plugin_managers.zinit_plugin_manager",
+    )
+    # tree-sitter is only imported when a zshrc is imported
+    CONFIG_FILE_IMPORTER: ClassVar[str | None] = "apps.zsh.rc_import"
+    # Oh My Zsh writes its cache next to itself, and loads the user's own scripts from `custom`
+    MUTABLE_RESOURCES: ClassVar[tuple[str, ...]] = (
+        "plugin_managers/oh-my-zsh/cache",
+        "plugin_managers/oh-my-zsh/custom",
+    )
 
     resource_target_path: PosixPath = Field(
         default_factory=lambda: PosixPath(
@@ -118,239 +147,292 @@ class ZshConfigData(ConfigurationData):
     recommended_extras: bool = Field(default=True)
     "My recommended extra zshrc configurations :)"
 
-    def _escape_string(self, value: str | BinaryRequirement[str]) -> str:
-        return json.dumps(str(value))[1:-1]
-
-    def _config_aliases(self, config_file: TextIO) -> None:
-        if len(self.aliases.keys()) == 0:
-            return
-
-        _ = config_file.write(
-            """\n# This is the aliases, they define 'commands' that will point to other commands themself, for example: A `g` alias is just an alias to `git`\n"""
-        )
-        aliases_raw: str = "\n".join(
-            f'alias {alias_name}="{self._escape_string(alias_value)}"'
-            for alias_name, alias_value in self.aliases.items()
-        )
-        _ = config_file.write(aliases_raw)
-        _ = config_file.write("\n\n")
-
-        self.logger.debug("Configured aliases %s", pformat(self.aliases))
+    selective_resources: bool = Field(default=True)
+    "Only deploy the plugins, theme and plugin manager you use (without their documentation and tests), instead of all of them"
 
-    def _config_suffix_aliases(self, config_file: TextIO) -> None:
-        if len(self.suffix_aliases.keys()) == 0:
-            return
+    live_reload: bool = Field(default=True)
+    "Running shells apply the changed aliases, exports and zstyles before their next prompt (instead of re-sourcing the zshrc)"
 
-        _ = config_file.write(
-            """\n# This is the suffix aliases, they are like aliases but can be at the end of the command you run\n# This can be used for many things, like: opening files with the correct program depending on the file type\n"""
-        )
-        aliases_raw: str = "\n".join(
-            f'alias -s {alias_name}="{self._escape_string(alias_value)}"'
-            for alias_name, alias_value in self.suffix_aliases.items()
-        )
-        _ = config_file.write(aliases_raw)
-        _ = config_file.write("\n\n")
-
-        self.logger.debug("Configured suffix aliases %s", pformat(self.suffix_aliases))
-
-    def _config_exports(self, config_file: TextIO) -> None:
-        if len(self.exports.keys()) == 0:
-            return
+    runtime_staging: bool = Field(default=False)
+    "Shells source the resources from a copy in $XDG_RUNTIME_DIR (local memory) instead of from the home directory, for home directories on network storage"
 
-        _ = config_file.write(
-            """# This is the exports, they define variables that are accessible by other programs (plus the shell itself)\n# You can override this to whatever you want, for example: the EDITOR env variable will define what multiple programs\n# will use as their editor, for example `sudoedit` (the command to edit files as the super user)\n"""
-        )
+    zcompile: bool = Field(default=True)
+    "Compile the zshrc and the resources it sources (into .zwc files next to them), so the shells don't parse them on every start"
 
-        exports_raw: str = "\n".join(
-            f'export {export_name}="{self._escape_string(export_value)}"'
-            for export_name, export_value in self.exports.items()
+    @property
+    def install_directory(self) -> PosixPath:
+        # The installed programs are relative to the home directory the configuration is rendered for
+        return self._rebase_path(
+            consts.INSTALL_DIRECTORY, os.getenv("HOME", "~"), self.home_path
         )
-        _ = config_file.write(exports_raw)
-        _ = config_file.write("\n")
-
-        self.logger.debug("Configured exports %s", pformat(self.aliases))
 
-    def _copy_resources(self) -> None:
-        self.resource_target_path.mkdir(parents=True, exist_ok=True)
-
-        _ = shutil.copytree(
-            self.resources_path.as_posix(),
-            self.resource_target_path.as_posix(),
-            dirs_exist_ok=True,
-        )
-
-    def _config_instant_prompt(self, config_file: TextIO) -> None:
-        if not self.instant_prompt:
-            return
-
-        config_file.writelines(
-            [
-                "# Use the instant prompt (this should be the very first line in your .zshrc)\n",
-                f'if [[ -r "{self.resource_target_path}/instant-prompt.zsh" ]]; then\n',
-                f'  source "{self.resource_target_path}/instant-prompt.zsh"\n',
-                "fi",
-                "\n\n",
-            ]
-        )
-
-    def _config_p10k_prompt(self, config_file: TextIO) -> None:
-        _ = config_file.write("# Sourcing the p10k prompt\n")
-        _ = config_file.write(
-            f"[[ ! -f {self.resource_target_path}/prompt.zsh ]] || source {self.resource_target_path}/prompt.zsh\n\n"
-        )
-
-        self.logger.debug("Using the premade p10k prompt")
-
-    def _source_lib_files(self, config_file: TextIO) -> None:
-        _ = config_file.write("# Sourcing library files (you can ignore this)\n")
-        _ = config_file.write(
-            f"source {self.resource_target_path}/plugin_managers/lib/lib.zsh {self.resource_target_path}\n\n"
-        )
-
-        self.logger.debug("Sourced library scripts to align zinit and omz")
-
-    def _init_plugin_manager(
-        self, config_file: TextIO, plugin_manager: ZshPluginManager
-    ) -> None:
-        _ = config_file.write("# Initialize your plugin manager here\n")
-        plugin_manager.init(config_file, self.resource_target_path)
-
-        self.logger.debug("Initialized plugin manager: %s", self.plugin_manager)
-
-    def _config_theme(
-        self, config_file: TextIO, plugin_manager: ZshPluginManager
-    ) -> None:
-        _ = config_file.write("# Setup your theme here\n")
-        plugin_manager.config_theme(config_file, self.resource_target_path, self.theme)
+    @override
+    def resources_deployed(self) -> bool:
+        return self.resource_target_path.is_dir()
 
-        self.logger.debug("Configured the shell theme: %s", self.theme)
+    @property
+    @override
+    def deployed_resources_path(self) -> PosixPath | None:
+        return self.resource_target_path
 
-    def _config_plugins(
-        self, config_file: TextIO, plugin_manager: ZshPluginManager
-    ) -> None:
-        _ = config_file.write("# Load all of the installed plugins\n")
-        plugin_manager.config_plugins(
-            config_file, self.resource_target_path, self.plugins
+    @override
+    def resource_selection(self) -> ResourceSelection | None:
+        if not self.selective_resources:
+            return None
+
+        # Both of the plugin managers load the library files, Oh My Zsh loads the plugins and themes through `custom`
+        paths = ["plugin_managers/lib/"]
+        if self.plugin_manager == ZshPluginManagerType.OMZ:
+            paths.append("plugin_managers/oh-my-zsh/")
+            plugins_directory, themes_directory = (
+                "plugin_managers/oh-my-zsh/custom/plugins/",
+                "plugin_managers/oh-my-zsh/custom/themes/",
+            )
+        else:
+            paths.append("plugin_managers/zinit/")
+            plugins_directory, themes_directory = "plugins/", "themes/"
+
+        if self.theme == "powerlevel10k":
+            paths.append("prompt.zsh")
+            if self.instant_prompt:
+                paths.append("instant-prompt.zsh")
+
+        plugins = [
+            plugin.value if isinstance(plugin, BinaryRequirement) else plugin
+            for plugin in self.plugins
+        ]
+        paths += [f"{plugins_directory}{plugin}/" for plugin in plugins]
+        paths.append(f"{themes_directory}{self.theme}/")
+
+        return ResourceSelection(
+            tuple(paths),
+            # Oh My Zsh is deployed without the plugins and themes that are not used
+            excluded_paths=(
+                "plugin_managers/oh-my-zsh/custom/plugins/",
+                "plugin_managers/oh-my-zsh/custom/themes/",
+            ),
         )
-        _ = config_file.write("\n")
-
-        self.logger.debug("Configured zsh plugins: %s", pformat(self.plugins))
-
-    def _source_plugin_manager(
-        self, config_file: TextIO, plugin_manager: ZshPluginManager
-    ) -> None:
-        _ = config_file.write("# Source your plugin manager here\n")
-        plugin_manager.source(config_file)
 
-        self.logger.debug("Sourced the plugin manager")
-
-    def _config_extra(self, config_file: TextIO) -> None:
-        _ = config_file.write(
-            "# Here you can put anything you want to add to your zshrc\n"
+    @property
+    def zcompile_record_path(self) -> PosixPath:
+        """
+        The record of the compiled files (next to the deployed resources)
+        """
+        return PosixPath(self.resource_target_path.parent, "zcompile.json")
+
+    def compile_sources(self) -> bool:
+        """
+        Compiles the zshrc and the deployed resources it sources with the installed zsh (only the files that changed).
+        Returns whether they were compiled, they can not be without zsh
+        """
+        zsh_path = PosixPath(self.install_directory, "zsh")
+        if not os.access(zsh_path, os.X_OK):
+            installed_zsh = find_executable("zsh")
+            if installed_zsh is None:
+                self.logger.debug("zsh is not installed, the zshrc is not compiled")
+                return False
+
+            zsh_path = PosixPath(installed_zsh)
+
+        # A zshrc linked through the active profile is compiled when the profile is built (into the profile)
+        sources = [] if self.config_path.is_symlink() else [self.config_path]
+        # Linked resources are read-only, they are compiled where they are shared from (if at all)
+        if self.resource_deploy_mode == ResourceDeployMode.COPY:
+            sources += sourced_files(self.resource_target_path)
+
+        compile_result = compile_sources(
+            zsh_path, sources, self.zcompile_record_path, self.fsync_policy
         )
-        _ = config_file.write(self.extra)
-
-        self.logger.debug("Wrote the extra zshrc lines")
-
-    def _config_history(self, config_file: TextIO) -> None:
-        _ = config_file.write("# History options\n")
-
-        for key, value in self.history_options.items():
-            if key == "options":
-                _ = config_file.write(f"setopt {value}\n")
-            else:
-                _ = config_file.write(f"{key}={value}\n")
-
-        _ = config_file.write("\n")
-
-    def _config_zstyle(self, config_file: TextIO) -> None:
-        _ = config_file.write(
-            "# Zsh Styling, this is used for many options of the shell itself, from completions, to plugins\n"
+        self.logger.debug(
+            f"Compiled the zsh sources ({len(compile_result.compiled)} compiled, "
+            + f"{len(compile_result.failed)} failed, {compile_result.unchanged} unchanged)"
         )
+        return True
 
-        config_file.writelines([str(style) + "\n" for style in self.zstyle])
-        _ = config_file.write("\n")
-
-    def _config_autoloads(self, config_file: TextIO) -> None:
-        _ = config_file.write(
-            "# Autoloads, these are extra functions that zsh exposes and you can enable\n"
-        )
+    @override
+    def config_file_companions(self) -> list[PosixPath]:
+        # zsh loads the compiled zshrc that is next to the zshrc it is started with (it does not follow the link)
+        return [compiled_path(self.config_path)]
+
+    @property
+    def staging_stamp_path(self) -> PosixPath:
+        """
+        The stamp the shells check their local copy of the resources against (next to the deployed resources)
+        """
+        return PosixPath(self.resource_target_path.parent, "resources.stamp")
+
+    def publish_staging_stamp(self) -> bool:
+        """
+        Writes the stamp of the deployed resources when they changed (so the shells copy them again), returns whether it was written
+        """
+        selection = self.resource_selection()
+        stamp = json.dumps(
+            {
+                "resources": self.resources_version,
+                "selection": None if selection is None else selection.version,
+                "deploy_mode": self.resource_deploy_mode.value,
+                "zcompile": self.zcompile,
+            },
+            sort_keys=True,
+        ).encode()
+
+        try:
+            if self.staging_stamp_path.read_bytes() == stamp:
+                return False
+        except OSError:
+            pass
+
+        atomic_write(self.staging_stamp_path, stamp, self.fsync_policy)
+        return True
 
-        config_file.writelines(
-            [f"autoload -U {autoload}\n" for autoload in self.autoloads]
+    @property
+    def live_directory(self) -> PosixPath:
+        """
+        Where the pieces running shells apply are published (next to the deployed resources). Every zshrc has its own
+        (e.g. every profile's), so a shell only applies the pieces of the zshrc it was started from
+        """
+        rc_id = hashlib.sha256(self.config_path.as_posix().encode()).hexdigest()[:16]
+        return PosixPath(self.resource_target_path.parent, "live", rc_id)
+
+    def _live_digests(self) -> dict[str, str]:
+        """
+        A digest of every live piece's field, a running shell applies the pieces whose digest is not the one it has
+        """
+        fields = self.model_dump(
+            mode="json", include={field_name for field_name, _ in LIVE_PIECES.values()}
         )
+        return {
+            piece: hashlib.sha256(
+                json.dumps(fields[field_name], sort_keys=True).encode()
+            ).hexdigest()[:16]
+            for piece, (field_name, _) in LIVE_PIECES.items()
+        }
 
-        if "compinit" in self.autoloads:
-            _ = config_file.write(
-                "\n# compinit needs to run after it is autoloaded (to refresh the completions)\ncompinit\n"
-            )
-
-        _ = config_file.write("\n")
+    def _live_names(self) -> dict[str, list[str]]:
+        return {
+            piece: list(getattr(self, field_name))
+            for piece, (field_name, remove_command) in LIVE_PIECES.items()
+            if remove_command
+        }
 
-    def _config_evals(self, config_file: TextIO) -> None:
-        _ = config_file.write("# Evaluations, for shell integrations and more\n")
+    def publish_live_pieces(self) -> list[str]:
+        """
+        Writes the live pieces and their stamp (only the ones that changed), returns the pieces that were written.
+        The stamp is written last, so a shell that sees a new stamp also sees the new pieces
+        """
+        live_directory = self.live_directory
+        live_directory.mkdir(parents=True, exist_ok=True)
+
+        template = template_environment().get_template("zsh/live/piece.j2")
+        sections = dict(self.render_sections(list(LIVE_PIECES)))
+        names = self._live_names()
+
+        written_pieces: list[str] = []
+        for piece, (field_name, remove_command) in LIVE_PIECES.items():
+            content = template.render(
+                piece=piece,
+                variable=field_name,
+                names=names.get(piece, []),
+                remove_command=remove_command,
+                content=sections[piece],
+            ).encode()
+
+            piece_path = PosixPath(live_directory, f"{piece}.zsh")
+            try:
+                if piece_path.read_bytes() == content:
+                    continue
+            except OSError:
+                pass
+
+            atomic_write(piece_path, content, self.fsync_policy)
+            written_pieces.append(piece)
+
+        stamp_path = PosixPath(live_directory, "stamp")
+        stamp = "".join(
+            f"{piece} {digest}\n" for piece, digest in self._live_digests().items()
+        ).encode()
+        if len(written_pieces) != 0 or not stamp_path.is_file():
+            atomic_write(stamp_path, stamp, self.fsync_policy)
+
+        return written_pieces
 
-        config_file.writelines(
-            [f'eval "$({evaluation})"\n' for evaluation in self.evals]
-        )
-        _ = config_file.write("\n")
+    @override
+    def _template_context(self) -> dict[str, Any]:  # pyright: ignore[reportExplicitAny]
+        return {
+            **super()._template_context(),
+            "install_directory": self.install_directory,
+            "plugin_manager_macros": get_plugin_manager(self.plugin_manager).macros,
+            "ZshPluginManagerType": ZshPluginManagerType,
+            "staging_stamp_path": self.staging_stamp_path,
+            # The templates source the resources from the local copy the zshrc picks
+            **(
+                {"resource_target_path": "${_configold_resources}"}
+                if self.runtime_staging
+                else {}
+            ),
+            "live_directory": self.live_directory,
+            "live_digests": self._live_digests() if self.live_reload else {},
+            "live_names": self._live_names() if self.live_reload else {},
+            "live_variables": {
+                piece: field_name
+                for piece, (field_name, remove_command) in LIVE_PIECES.items()
+                if remove_command
+            },
+        }
 
-    def _config_recommended_extras(self, config_file: TextIO) -> None:
-        _ = config_file.write("# Recommended extras for your configuration\n")
+    @override
+    def _sections(self) -> list[str]:
+        sections: list[str] = []
+
+        if self.runtime_staging:
+            # Before the instant prompt, which is sourced from the resources too
+            sections.append("runtime-staging")
+
+        if self.theme == "powerlevel10k":
+            sections.append("instant-prompt")
+
+        sections += [
+            "lib",
+            "plugin-manager",
+            "theme",
+            "path",
+            "exports",
+            "aliases",
+            "suffix-aliases",
+            "plugins",
+            "plugin-manager-source",
+        ]
 
-        if self.plugin_manager == ZshPluginManagerType.ZINIT:
-            _ = config_file.write("zinit cdreplay -q\n")
+        if self.recommended_extras:
+            sections.append("recommended-extras")
 
-        if "zsh-vi-mode" in self.plugins:
-            _ = config_file.write(
-                "\n# Only changing the escape key to `jk` in insert mode, we still\n# keep using the default keybindings `^[` in other modes\nZVM_VI_INSERT_ESCAPE_BINDKEY=jk\n"
-            )
+        if self.theme == "powerlevel10k":
+            sections.append("p10k-prompt")
 
-            _ = config_file.writelines(
-                [
-                    "ZVM_VI_HIGHLIGHT_BACKGROUND=#ffffff\n",
-                    "ZVM_VI_HIGHLIGHT_FOREGROUND=#000000\n",
-                ]
-            )
+        sections += ["history", "zstyle", "autoloads", "evals"]
 
-        _ = config_file.write("\n")
+        if self.live_reload:
+            sections.append("live-reload")
 
-    def _add_binaries_to_path(self, config_file: TextIO) -> None:
-        _ = config_file.write(
-            "\n# Exporting your installed programs (removing this line will cause the installed programs with the configold tool to brake)\n"
-        )
-        _ = config_file.write(f'export PATH="$PATH:{consts.INSTALL_DIRECTORY}"\n')
-        _ = config_file.write("\n")
+        return sections + ["extra"]
 
     @override
     def _config(self) -> bool:
-        plugin_manager = get_plugin_manager(self.plugin_manager)
-
-        self._copy_resources()
-        with open(self.config_path, "a+") as config_file:
-            if self.theme == "powerlevel10k":
-                self._config_instant_prompt(config_file)
-
-            self._source_lib_files(config_file)
-            self._init_plugin_manager(config_file, plugin_manager)
-            self._config_theme(config_file, plugin_manager)
-            self._add_binaries_to_path(config_file)
-            self._config_exports(config_file)
-            self._config_aliases(config_file)
-            self._config_suffix_aliases(config_file)
-            self._config_plugins(config_file, plugin_manager)
-            self._source_plugin_manager(config_file, plugin_manager)
-
-            if self.recommended_extras:
-                self._config_recommended_extras(config_file)
-
-            if self.theme == "powerlevel10k":
-                self._config_p10k_prompt(config_file)
-
-            self._config_history(config_file)
-            self._config_zstyle(config_file)
-            self._config_autoloads(config_file)
-            self._config_evals(config_file)
-            self._config_extra(config_file)
+        self.deploy_resources()
+        return True
+
+    @override
+    def publish(self) -> bool:
+        # Before the staging stamp is published, so the staged copies include the compiled files
+        if self.zcompile:
+            _ = self.compile_sources()
+        else:
+            _ = remove_compiled(self.zcompile_record_path)
+
+        if self.runtime_staging:
+            _ = self.publish_staging_stamp()
+
+        if self.live_reload:
+            _ = self.publish_live_pieces()
 
         return True
@@ -76,6 +76,24 @@ class ZshConfigWidget(ConfigurationWidget[ZshConfigData]):
                 value=self.config.instant_prompt, animate=False, id="instant-prompt"
             )
 
+        with Horizontal():
+            yield LabelWithTooltip(
+                "Live Reload", str(self.config.descriptions.live_reload)
+            )
+            yield Switch(value=self.config.live_reload, animate=False, id="live-reload")
+
+        with Horizontal():
+            yield LabelWithTooltip(
+                "Runtime Staging", str(self.config.descriptions.runtime_staging)
+            )
+            yield Switch(
+                value=self.config.runtime_staging, animate=False, id="runtime-staging"
+            )
+
+        with Horizontal():
+            yield LabelWithTooltip("Zcompile", str(self.config.descriptions.zcompile))
+            yield Switch(value=self.config.zcompile, animate=False, id="zcompile")
+
         with Horizontal():
             yield LabelWithTooltip("Plugins", str(self.config.descriptions.plugins))
             yield Button("Open Plugins List", id="plugins-button")
@@ -123,6 +141,18 @@ class ZshConfigWidget(ConfigurationWidget[ZshConfigData]):
     def instant_prompt_changed(self, changed: Switch.Changed):
         self.config.instant_prompt = changed.value
 
+    @on(Switch.Changed, "#live-reload")
+    def live_reload_changed(self, changed: Switch.Changed):
+        self.config.live_reload = changed.value
+
+    @on(Switch.Changed, "#runtime-staging")
+    def runtime_staging_changed(self, changed: Switch.Changed):
+        self.config.runtime_staging = changed.value
+
+    @on(Switch.Changed, "#zcompile")
+    def zcompile_changed(self, changed: Switch.Changed):
+        self.config.zcompile = changed.value
+
     @on(TextArea.SelectionChanged, "#extra-label")
     def extra_changed(self, selection_changed: TextArea.SelectionChanged) -> None:
         self.config.extra = selection_changed.text_area.text
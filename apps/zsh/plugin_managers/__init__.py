@@ -1,3 +1,5 @@
+from functools import cache
+
 from .plugin_manager import (
     ZshPluginManager,
     ZshPluginManagerType,
@@ -11,6 +13,7 @@ PLUGIN_MANAGERS: dict[ZshPluginManagerType, type[ZshPluginManager]] = {
 }
 
 
+@cache
 def get_plugin_manager(plugin_manager_type: ZshPluginManagerType):
     return PLUGIN_MANAGERS.get(plugin_manager_type, ZinitPluginManager)()
 
@@ -1,9 +1,7 @@
-from abc import ABC, abstractmethod
 from enum import StrEnum
-from pathlib import PosixPath
-from typing import TextIO
+from typing import Any, ClassVar
 
-from utils.requirements.binary_requirements import BinaryRequirement
+from configuration.templates import template_environment
 
 
 class ZshPluginManagerType(StrEnum):
@@ -11,26 +9,13 @@ class ZshPluginManagerType(StrEnum):
     OMZ = "Oh My Zsh"
 
 
-class ZshPluginManager(ABC):
-    @abstractmethod
-    def config_plugins(
-        self,
-        config_file: TextIO,
-        resource_target_path: PosixPath,
-        plugins: list[str | BinaryRequirement[str]],
-    ) -> None:
-        raise NotImplementedError
+class ZshPluginManager:
+    TEMPLATE_NAME: ClassVar[str] = ""
+    "The template with the plugin manager's macros (`init`, `config_theme`, `config_plugins` and `source`)"
 
-    @abstractmethod
-    def init(self, config_file: TextIO, resource_target_path: PosixPath) -> None:
-        raise NotImplementedError
-
-    @abstractmethod
-    def source(self, config_file: TextIO) -> None:
-        raise NotImplementedError
-
-    @abstractmethod
-    def config_theme(
-        self, config_file: TextIO, resource_target_path: PosixPath, theme: str
-    ) -> None:
-        raise NotImplementedError
+    @property
+    def macros(self) -> Any:  # pyright: ignore[reportExplicitAny]
+        """
+        The plugin manager's macros, the zshrc templates call them to render the plugin manager specific lines
+        """
+        return template_environment().get_template(type(self).TEMPLATE_NAME).module
@@ -0,0 +1,452 @@
+from typing import Any
+
+from tree_sitter import Node
+
+from apps import consts
+from configuration.rc_import import (
+    RcImport,
+    argument_text,
+    command_arguments,
+    node_text,
+    parse_shell,
+    plain_word_value,
+    quotable_value,
+)
+from utils.resource_pack import shipped_resource_pack
+from utils.resources import package_resource
+
+from .plugin_managers import ZshPluginManagerType
+
+HISTORY_VARIABLES: frozenset[str] = frozenset(
+    {"HISTSIZE", "HISTFILE", "SAVEHIST", "HISTDUP"}
+)
+PLUGIN_LOADERS: dict[str, frozenset[str]] = {
+    "zinit": frozenset({"light", "load"}),
+    "antigen": frozenset({"bundle"}),
+    "zplug": frozenset(),
+}
+"The plugin managers' commands that load a plugin (by the subcommand, an empty set when the plugin is the first argument)"
+
+CONFIGOLD_MARKERS: tuple[str, ...] = (
+    "# configold-index:",
+    "# >>> configold ",
+    "# <<< configold ",
+)
+"The comments of the managed regions, a zshrc configold rendered is imported without them"
+
+GENERATED_REGIONS: frozenset[str] = frozenset({"runtime-staging", "live-reload"})
+"The managed regions configold generates from the other fields, their statements are not imported"
+
+PLUGINS_LOADED_GUARD: str = "_configold_plugins_loaded"
+"The variable the rendered zshrc loads the plugins once with, the statements inside of its guard are imported"
+
+LIST_FIELDS: frozenset[str] = frozenset({"plugins", "zstyle", "evals", "autoloads"})
+
+_Update = tuple[str, str | None, Any]  # pyright: ignore[reportExplicitAny]
+"A value to import: the field, the key (for the dictionaries) and the value"
+
+
+def _shipped_themes() -> frozenset[str]:
+    resource_pack = shipped_resource_pack("zsh")
+    if resource_pack is not None:
+        return frozenset(
+            relative_path.split("/")[1]
+            for relative_path in resource_pack.members
+            if relative_path.startswith("themes/")
+        )
+
+    themes_directory = package_resource("apps", "zsh", "resources", "themes")
+    if not themes_directory.is_dir():
+        return frozenset()
+
+    return frozenset(theme.name for theme in themes_directory.iterdir())
+
+
+class _ZshrcImporter:
+    def __init__(self, source: bytes) -> None:
+        # The imported file is the whole configuration, so the collections start empty (instead of the defaults)
+        self.result: RcImport = RcImport(
+            config={
+                "aliases": {},
+                "suffix_aliases": {},
+                "exports": {},
+                "plugins": [],
+                "history_options": {},
+                "zstyle": [],
+                "evals": [],
+                "autoloads": [],
+                "recommended_extras": False,
+            }
+        )
+        self.themes: frozenset[str] = _shipped_themes()
+        self.install_directory: str = consts.INSTALL_DIRECTORY.as_posix()
+        self.source: bytes = source
+        self._extra: list[str] = []
+        self._extra_end_row: int | None = None
+        self._comments: list[Node] = []
+        self._previous: Node | None = None
+        self._previous_updates: list[_Update] | None = None
+        self._region: str | None = None
+
+    def _plugin(self, plugin: str) -> list[_Update]:
+        name = plugin.rstrip("/").rsplit("/", 1)[-1]
+        if name in self.themes:
+            return [("theme", None, name)]
+
+        return [("plugins", None, name)]
+
+    def _alias(self, arguments: list[Node]) -> list[_Update] | None:
+        field_name = "aliases"
+        if len(arguments) != 0 and node_text(arguments[0]) == "-s":
+            field_name = "suffix_aliases"
+            arguments = arguments[1:]
+
+        updates: list[_Update] = []
+        for argument in arguments:
+            if argument.type == "word":
+                # An unquoted alias is a single word (`name=value`)
+                name, separator, raw_value = node_text(argument).partition("=")
+                value = plain_word_value(raw_value)
+                if not name or not separator or value is None:
+                    return None
+
+                updates.append((field_name, name, value))
+                continue
+
+            if argument.type != "concatenation" or len(argument.children) < 2:
+                return None
+
+            name_node, *value_nodes = argument.children
+            name = node_text(name_node)
+            if name_node.type != "word" or not name.endswith("=") or name == "=":
+                return None
+
+            values = [quotable_value(value_node) for value_node in value_nodes]
+            if None in values:
+                return None
+
+            updates.append((field_name, name[:-1], "".join(filter(None, values))))
+
+        return updates or None
+
+    def _export(self, declaration: Node) -> list[_Update] | None:
+        updates: list[_Update] = []
+        for child in declaration.named_children:
+            if child.type != "variable_assignment":
+                return None
+
+            name_node = child.child_by_field_name("name")
+            value_node = child.child_by_field_name("value")
+            if name_node is None or value_node is None:
+                return None
+
+            name = node_text(name_node)
+            value = quotable_value(value_node)
+            if value is None:
+                return None
+
+            if name == "PATH" and self.install_directory in value:
+                # configold adds its install directory to the PATH by itself
+                updates.append(("", None, None))
+            elif name in ("ZSH", "ZINIT_HOME"):
+                # The plugin managers are loaded from the deployed resources
+                updates.append(("", None, None))
+            else:
+                updates.append(("exports", name, value))
+
+        return updates or None
+
+    def _assignment(self, assignment: Node) -> list[_Update] | None:
+        name_node = assignment.child_by_field_name("name")
+        value_node = assignment.child_by_field_name("value")
+        if name_node is None or value_node is None:
+            return None
+
+        name = node_text(name_node)
+        if name in HISTORY_VARIABLES:
+            return [("history_options", name, node_text(value_node))]
+
+        if name == "plugins" and value_node.type == "array":
+            return [("plugin_manager", None, ZshPluginManagerType.OMZ.value)] + [
+                update
+                for plugin in value_node.named_children
+                for update in self._plugin(argument_text(plugin))
+            ]
+
+        if name == "ZSH_THEME":
+            # Oh My Zsh themes are loaded as `<theme>/<theme>` from the deployed themes
+            return [
+                ("plugin_manager", None, ZshPluginManagerType.OMZ.value),
+                ("theme", None, argument_text(value_node).rsplit("/", 1)[-1]),
+            ]
+
+        if name in ("ZSH", "ZINIT_HOME"):
+            return [("", None, None)]
+
+        return None
+
+    def _command(self, command: Node) -> list[_Update] | None:
+        name, arguments = command_arguments(command)
+        words = [argument_text(argument) for argument in arguments]
+
+        if name == "alias":
+            return self._alias(arguments)
+
+        if name == "zstyle":
+            return [("zstyle", None, node_text(command))]
+
+        if name == "autoload":
+            functions = [word for word in words if not word.startswith(("-", "+"))]
+            return [("autoloads", None, function) for function in functions] or None
+
+        if name == "compinit" and len(words) == 0:
+            # Rendered right after it is autoloaded
+            return [("", None, None)]
+
+        if name == "eval" and len(arguments) == 1:
+            substitution = arguments[0].named_children
+            if (
+                arguments[0].type == "string"
+                and len(substitution) == 1
+                and substitution[0].type == "command_substitution"
+            ):
+                return [("evals", None, node_text(substitution[0])[2:-1].strip())]
+
+            return None
+
+        if name == "setopt":
+            if len(words) != 0 and all(
+                "hist" in word.lower().replace("_", "") for word in words
+            ):
+                return [("history_options", "options", " ".join(words))]
+
+            return None
+
+        if name in ("source", "."):
+            sourced = " ".join(words)
+            if sourced.endswith("oh-my-zsh.sh"):
+                return [("plugin_manager", None, ZshPluginManagerType.OMZ.value)]
+
+            if sourced.endswith("zinit.zsh"):
+                return [("plugin_manager", None, ZshPluginManagerType.ZINIT.value)]
+
+            return None
+
+        if name in PLUGIN_LOADERS:
+            subcommands = PLUGIN_LOADERS[name]
+            if name == "zinit" and words[:1] == ["ice"]:
+                # The ice modifiers of the next plugin, configold loads the plugins from the deployed resources
+                return [("", None, None)]
+
+            if len(subcommands) == 0 and len(words) >= 1:
+                plugins = words[:1]
+            elif len(words) >= 2 and words[0] in subcommands:
+                plugins = [word for word in words[1:] if not word.startswith("-")]
+            else:
+                return None
+
+            manager_updates: list[_Update] = (
+                [("plugin_manager", None, ZshPluginManagerType.ZINIT.value)]
+                if name == "zinit"
+                else []
+            )
+            return manager_updates + [
+                update for plugin in plugins for update in self._plugin(plugin)
+            ]
+
+        return None
+
+    def _statement(self, statement: Node) -> list[_Update] | None:
+        """
+        What a top level statement imports, None if it does not fit into any field
+        """
+        if statement.has_error:
+            return None
+
+        if statement.type == "command":
+            return self._command(statement)
+
+        if statement.type == "declaration_command":
+            keyword = statement.children[0].type if statement.children else ""
+            if keyword == "export":
+                return self._export(statement)
+
+            if keyword == "typeset" and node_text(statement).split()[-1].startswith(
+                "_configold_"
+            ):
+                # The state of the rendered zshrc itself (e.g. that the plugins were loaded)
+                return [("", None, None)]
+
+            return None
+
+        if statement.type == "variable_assignment":
+            return self._assignment(statement)
+
+        if (
+            statement.type == "list"
+            and len(statement.children) == 3
+            and statement.children[0].type == "test_command"
+            and statement.children[1].type == "||"
+        ):
+            # A guarded statement (e.g. `[[ ":$PATH:" == *":dir:"* ]] || export PATH="$PATH:dir"`) imports the statement
+            return self._statement(statement.children[2])
+
+        if statement.type == "list":
+            # Only `a && b` lists of commands that are all imported (e.g. `autoload -U compinit && compinit`)
+            updates: list[_Update] = []
+            for child in statement.children:
+                if child.type == "&&":
+                    continue
+
+                child_updates = self._statement(child)
+                if child_updates is None:
+                    return None
+
+                updates += child_updates
+
+            return updates
+
+        return None
+
+    def _apply(self, updates: list[_Update]) -> None:
+        config = self.result.config
+
+        for field_name, key, value in updates:
+            if field_name == "":
+                continue
+
+            if field_name in LIST_FIELDS:
+                if value not in config[field_name]:
+                    config[field_name].append(value)
+            elif key is None:
+                config[field_name] = value
+            else:
+                config[field_name][key] = value
+
+    def _append_extra(self, text: str, start_row: int, end_row: int) -> None:
+        # Statements that were next to each other in the file stay next to each other
+        if self._extra_end_row is not None:
+            self._extra.append("\n" if start_row == self._extra_end_row + 1 else "\n\n")
+
+        self._extra.append(text)
+        self._extra_end_row = end_row
+
+    def _trailing_comment(self, comment: Node) -> None:
+        """
+        A comment at the end of the previous statement's line stays with the statement
+        """
+        assert self._previous is not None
+        trailing_text = self.source[self._previous.end_byte : comment.end_byte].decode(
+            errors="replace"
+        )
+
+        if self._previous_updates is None:
+            self._extra.append(trailing_text)
+        elif [field_name for field_name, _, _ in self._previous_updates] == [
+            "autoloads"
+        ]:
+            # The autoloads are rendered as is, so their comments can be kept
+            autoloads = self.result.config["autoloads"]
+            autoloads[-1] += trailing_text
+
+    def feed(self, statement: Node) -> None:
+        text = node_text(statement)
+        start_row, end_row = statement.start_point.row, statement.end_point.row
+
+        if statement.type == "comment":
+            if text.startswith(CONFIGOLD_MARKERS[1:]):
+                # `# >>> configold <region> >>>` starts a region and `# <<< configold <region> <<<` ends it
+                self._region = (
+                    text.split()[3] if text.startswith(CONFIGOLD_MARKERS[1]) else None
+                )
+
+            if self._previous is not None and start_row == self._previous.end_point.row:
+                self._trailing_comment(statement)
+            elif not text.startswith(CONFIGOLD_MARKERS):
+                if len(self._comments) != 0 and (
+                    start_row != self._comments[-1].end_point.row + 1
+                ):
+                    # Only the comments right above a statement belong to it
+                    self._comments = []
+
+                self._comments.append(statement)
+
+            return
+
+        if statement.type == "if_statement" and any(
+            PLUGINS_LOADED_GUARD in node_text(condition)
+            for condition in statement.children_by_field_name("condition")
+        ):
+            # The plugins are loaded once, the statements inside of the guard are imported like any other statement
+            conditions = statement.children_by_field_name("condition")
+            for child in statement.named_children:
+                if child not in conditions:
+                    self.feed(child)
+
+            return
+
+        if self._region in GENERATED_REGIONS:
+            self.result.statements += 1
+            self.result.dropped.append(text)
+            self._comments = []
+            self._previous = statement
+            self._previous_updates = []
+            return
+
+        comments = (
+            self._comments
+            if len(self._comments) != 0
+            and self._comments[-1].end_point.row + 1 == start_row
+            else []
+        )
+        self.result.statements += 1
+        updates = self._statement(statement)
+
+        if updates is None:
+            # Kept as is, with the comments above it
+            self.result.unsupported.append(text)
+            first_node = comments[0] if len(comments) != 0 else statement
+            self._append_extra(
+                self.source[first_node.start_byte : statement.end_byte].decode(
+                    errors="replace"
+                ),
+                first_node.start_point.row,
+                end_row,
+            )
+        elif all(field_name == "" for field_name, _, _ in updates):
+            self.result.dropped.append(text)
+        else:
+            self.result.imported += 1
+            if updates[0][0] == "zstyle" and len(comments) != 0:
+                # The zstyles are rendered with the comment that describes them
+                updates = [("zstyle", None, f"{node_text(comments[-1])}\n{text}")]
+
+            self._apply(updates)
+
+        self._comments = []
+        self._previous = statement
+        self._previous_updates = updates
+
+    def finish(self) -> RcImport:
+        if len(self._comments) != 0:
+            self._append_extra(
+                "\n".join(node_text(comment) for comment in self._comments),
+                self._comments[0].start_point.row,
+                self._comments[-1].end_point.row,
+            )
+
+        self.result.config["extra"] = "".join(self._extra)
+        return self.result
+
+
+def import_config_file(source: bytes) -> RcImport:
+    """
+    Imports an existing zshrc: the aliases, exports, zstyles, autoloads, evaluations, history options, and the plugins,
+    theme and plugin manager. Everything else is kept as is in `extra` (in its original order)
+    """
+    importer = _ZshrcImporter(source)
+
+    for statement in parse_shell(source).root_node.named_children:
+        importer.feed(statement)
+
+    return importer.finish()
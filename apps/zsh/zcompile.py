@@ -0,0 +1,159 @@
+import itertools
+import json
+import math
+import os
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import PosixPath
+
+from utils.atomic_write import FsyncPolicy, atomic_write
+
+COMPILED_SUFFIX: str = ".zwc"
+"zsh loads `<file>.zwc` instead of parsing `<file>` when it is newer than the file"
+
+SOURCED_SUFFIXES: tuple[str, ...] = (".zsh", ".zsh-theme")
+"The files the shells source (the plugin managers, the plugins, the themes and the prompt)"
+
+SOURCED_FILE_NAMES: frozenset[str] = frozenset({"oh-my-zsh.sh"})
+"Sourced files without one of the suffixes"
+
+_ZCOMPILE_SCRIPT: str = (
+    'for source_file; do zcompile -UR -- "$source_file" 2>/dev/null || print -r -- "$source_file"; done'
+)
+"Compiles the files given as arguments (without expanding aliases, and read instead of mapped as they are scripts), printing the ones that failed"
+
+
+@dataclass
+class CompileResult:
+    compiled: list[str] = field(default_factory=list)
+    "The files that were compiled (again)"
+
+    failed: list[str] = field(default_factory=list)
+    "The files zsh could not compile (they are sourced as they are)"
+
+    unchanged: int = 0
+    "How many files were already compiled"
+
+
+def compiled_path(source: PosixPath) -> PosixPath:
+    return PosixPath(f"{source}{COMPILED_SUFFIX}")
+
+
+def sourced_files(directory: PosixPath) -> list[PosixPath]:
+    """
+    The files under the directory that the shells source (symbolic links are not followed, linked resources are read-only)
+    """
+    sources: list[PosixPath] = []
+    for directory_path, directory_names, file_names in os.walk(directory):
+        directory_names.sort()
+
+        for file_name in sorted(file_names):
+            if file_name.endswith(SOURCED_SUFFIXES) or file_name in SOURCED_FILE_NAMES:
+                file_path = PosixPath(directory_path, file_name)
+                if not file_path.is_symlink():
+                    sources.append(file_path)
+
+    return sources
+
+
+def _load_record(record_path: PosixPath) -> dict[str, list[int]]:
+    try:
+        return json.loads(record_path.read_bytes())
+    except (OSError, ValueError):
+        return {}
+
+
+def _source_identity(source: PosixPath) -> list[int] | None:
+    try:
+        source_stat = source.stat()
+    except OSError:
+        return None
+
+    return [source_stat.st_size, source_stat.st_mtime_ns]
+
+
+def compile_sources(
+    zsh_path: PosixPath,
+    sources: list[PosixPath],
+    record_path: PosixPath,
+    fsync_policy: FsyncPolicy = FsyncPolicy.NONE,
+) -> CompileResult:
+    """
+    Compiles the sources with zsh (in parallel batches, one zsh process per core), only the files that changed since they
+    were compiled. The record keeps the size and the modification time every file was compiled at: zsh itself only
+    compares modification times, and deployed resources keep the (older) modification times they are shipped with.
+    Compiled files of sources that are no longer given are removed
+    """
+    result = CompileResult()
+    record = _load_record(record_path)
+    new_record: dict[str, list[int]] = {}
+
+    stale_sources: list[PosixPath] = []
+    for source in sources:
+        identity = _source_identity(source)
+        if identity is None:
+            continue
+
+        if record.get(str(source)) == identity and compiled_path(source).is_file():
+            result.unchanged += 1
+            new_record[str(source)] = identity
+        else:
+            stale_sources.append(source)
+
+    def compile_batch(batch: tuple[PosixPath, ...]) -> list[str]:
+        process = subprocess.run(
+            [zsh_path, "-f", "-c", _ZCOMPILE_SCRIPT, "zcompile", *batch],
+            capture_output=True,
+            text=True,
+        )
+        return process.stdout.splitlines()
+
+    if len(stale_sources) != 0:
+        batch_size = math.ceil(len(stale_sources) / (os.cpu_count() or 1))
+        with ThreadPoolExecutor() as executor:
+            for failed in executor.map(
+                compile_batch, itertools.batched(stale_sources, batch_size)
+            ):
+                result.failed += failed
+
+    failed_sources = set(result.failed)
+    for source in stale_sources:
+        identity = _source_identity(source)
+        if (
+            str(source) in failed_sources
+            or identity is None
+            or not compiled_path(source).is_file()
+        ):
+            if str(source) not in failed_sources:
+                result.failed.append(str(source))
+
+            # A compiled file of an older version would be loaded instead of the source
+            compiled_path(source).unlink(missing_ok=True)
+            continue
+
+        new_record[str(source)] = identity
+        result.compiled.append(str(source))
+
+    for source in record.keys() - new_record.keys():
+        compiled_path(PosixPath(source)).unlink(missing_ok=True)
+
+    if new_record != record:
+        record_path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write(
+            record_path, json.dumps(new_record, sort_keys=True).encode(), fsync_policy
+        )
+
+    return result
+
+
+def remove_compiled(record_path: PosixPath) -> int:
+    """
+    Removes the compiled files of the record (and the record itself), returns how many were removed
+    """
+    record = _load_record(record_path)
+    for source in record:
+        compiled_path(PosixPath(source)).unlink(missing_ok=True)
+
+    record_path.unlink(missing_ok=True)
+    return len(record)
@@ -0,0 +1,58 @@
+"""
+Measures the fleet rendering throughput (users per second) for a growing number of processes.
+
+Usage: python -m benchmarks.fleet_render [--users 1000] [--jobs 1 2 4 8]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import PosixPath
+
+from configuration.fleet import FleetProfile, render_fleet
+
+BASE_RAW_CONFIGS: dict[str, dict[str, object]] = {"zsh": {}, "tmux": {}, "zellij": {}}
+
+
+def create_profiles(root: PosixPath, users: int) -> list[FleetProfile]:
+    return [
+        FleetProfile(
+            name=f"user{index}",
+            home=PosixPath(root, f"user{index}"),
+            # Every tenth user has its own configuration, so the overrides path is measured as well
+            overrides=(
+                {"tmux": {"prefix": "C-a"}, "zsh": {"aliases": {"g": "git"}}}
+                if index % 10 == 0
+                else {}
+            ),
+        )
+        for index in range(users)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    _ = parser.add_argument("--users", type=int, default=1000)
+    _ = parser.add_argument(
+        "--jobs", type=int, nargs="+", default=[1, os.cpu_count() or 1]
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="configold-fleet-") as root:
+        profiles = create_profiles(PosixPath(root), args.users)
+
+        for jobs in args.jobs:
+            start_time = time.perf_counter()
+            results = render_fleet(BASE_RAW_CONFIGS, profiles, jobs=jobs)
+            duration = time.perf_counter() - start_time
+
+            failures = sum(not result["ok"] for result in results)
+            print(
+                f"jobs={jobs:<3} users={len(results):<6} failures={failures:<4} "
+                f"duration={duration:.3f}s users/s={len(results) / duration:.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Measures how fast existing configuration files are imported (parsed and mapped into the configuration fields).
+
+By default a large zshrc is generated: the aliases, exports, plugins and zstyles of a hand written zshrc, followed by
+every Oh My Zsh plugin script shipped in the resources (thousands of lines of real world zsh code).
+
+Usage: python -m benchmarks.rc_import [--repeat 5] [--files ~/.zshrc ...]
+"""
+
+import argparse
+import time
+from collections.abc import Callable
+from pathlib import PosixPath
+
+from apps.tmux import TmuxConfigData
+from apps.zsh import ZshConfigData
+from configuration.rc_import import RcImport
+from utils.resources import package_resource
+
+
+def generate_zshrc(entries: int) -> bytes:
+    lines: list[str] = []
+
+    for index in range(entries):
+        lines += [
+            f"# Entry {index}",
+            f"alias a{index}='git log --oneline -n {index}'",
+            f'export VARIABLE_{index}="$HOME/.local/share/{index}"',
+            f"zstyle ':completion:{index}:*' menu no",
+            f'eval "$(tool{index} init zsh)"',
+        ]
+
+    plugins_directory = package_resource("apps", "zsh", "resources", "plugins")
+    if plugins_directory.is_dir():
+        for plugin in sorted(
+            plugins_directory.iterdir(), key=lambda plugin: plugin.name
+        ):
+            plugin_script = plugin.joinpath(f"{plugin.name}.plugin.zsh")
+            if plugin_script.is_file():
+                lines.append(plugin_script.read_text(errors="replace"))
+
+    return "\n".join(lines).encode()
+
+
+def generate_tmux_conf(entries: int) -> bytes:
+    lines = ["set -g prefix C-a", "set -g mouse on"]
+
+    for index in range(entries):
+        lines += [
+            f"bind -n M-{index} select-window -t {index}",
+            f"set -g @plugin 'tmux-plugins/plugin-{index}'",
+            f"set -g status-right '#[fg=colour{index % 256}]#H'",
+        ]
+
+    return "\n".join(lines).encode()
+
+
+def measure(
+    name: str, importer: Callable[[bytes], RcImport], source: bytes, repeat: int
+) -> None:
+    durations: list[float] = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        result = importer(source)
+        durations.append(time.perf_counter() - start_time)
+
+    best = min(durations)
+    lines = source.count(b"\n") + 1
+    print(
+        f"{name:<24} lines={lines:<7} statements={result.statements:<6} imported={result.imported:<6} "
+        + f"best={best * 1000:.1f}ms lines/s={lines / best:,.0f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    _ = parser.add_argument("--entries", type=int, default=1000)
+    _ = parser.add_argument("--repeat", type=int, default=5)
+    _ = parser.add_argument(
+        "--files",
+        type=PosixPath,
+        nargs="*",
+        default=[],
+        help="Real configuration files to measure as well (tmux files are the ones with tmux in their name)",
+    )
+    args = parser.parse_args()
+
+    measure(
+        "generated zshrc",
+        ZshConfigData.import_config_file,
+        generate_zshrc(args.entries),
+        args.repeat,
+    )
+    measure(
+        "generated tmux.conf",
+        TmuxConfigData.import_config_file,
+        generate_tmux_conf(args.entries),
+        args.repeat,
+    )
+
+    for path in args.files:
+        importer = (
+            TmuxConfigData.import_config_file
+            if "tmux" in path.name
+            else ZshConfigData.import_config_file
+        )
+        measure(path.name, importer, path.read_bytes(), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Measures how fast the shipped resources are deployed: a full copy of the tree (what configuring used to do every time),
+a first sync into an empty directory, and a sync of resources that are already up to date.
+The same syncs are measured from a resource pack (the way the zipapp ships the resources).
+
+Usage: python -m benchmarks.resource_sync [--app zsh] [--repeat 5]
+"""
+
+import argparse
+import shutil
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import PosixPath
+
+from utils.resource_pack import ResourcePack, build_resource_pack, sync_resource_pack
+from utils.resource_sync import sync_resource_tree
+from utils.resources import package_resource
+
+
+def measure(name: str, deploy: Callable[[], object], repeat: int) -> None:
+    durations: list[float] = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        _ = deploy()
+        durations.append(time.perf_counter() - start_time)
+
+    print(
+        f"{name:<24} best={min(durations) * 1000:.1f}ms worst={max(durations) * 1000:.1f}ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    _ = parser.add_argument("--app", default="zsh")
+    _ = parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    resources = package_resource("apps", args.app, "resources")
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        copy_target = PosixPath(temporary_directory, "copy")
+        sync_target = PosixPath(temporary_directory, "sync")
+
+        measure(
+            "full copy",
+            lambda: shutil.copytree(resources, copy_target, dirs_exist_ok=True),
+            args.repeat,
+        )
+
+        def first_sync() -> None:
+            shutil.rmtree(sync_target, ignore_errors=True)
+            _ = sync_resource_tree(resources, sync_target)
+
+        measure("first sync", first_sync, args.repeat)
+        measure(
+            "up to date sync",
+            lambda: sync_resource_tree(resources, sync_target),
+            args.repeat,
+        )
+
+        pack_path = PosixPath(temporary_directory, "resources.pack")
+        _ = build_resource_pack(PosixPath(str(resources)), pack_path)
+        pack_target = PosixPath(temporary_directory, "pack")
+
+        def first_pack_sync() -> None:
+            shutil.rmtree(pack_target, ignore_errors=True)
+            # Including reading the index
+            _ = sync_resource_pack(ResourcePack(pack_path), pack_target)
+
+        measure("first sync (pack)", first_pack_sync, args.repeat)
+        measure(
+            "up to date sync (pack)",
+            lambda: sync_resource_pack(ResourcePack(pack_path), pack_target),
+            args.repeat,
+        )
+
+
+if __name__ == "__main__":
+    main()
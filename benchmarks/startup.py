@@ -0,0 +1,371 @@
+"""
+Measures what a configuration costs when the tools start. The configurations are rendered (and their resources deployed)
+into a throwaway home directory, the bundled binaries are unpacked into it, and every tool is started again and again:
+`zsh -i -c exit` (under a pseudo terminal, the way a terminal emulator starts it), `tmux -f <tmux.conf> start-server \\;
+kill-server` and `nvim --headless +qa` (neovim is not bundled, the one in the PATH is used). The median, the 95th
+percentile and the variance of the startup times are reported, and compared against a baseline saved by an earlier run.
+
+Usage: python -m benchmarks.startup [--config team.yaml] [--apps zsh,tmux,nvim] [--repeat 20] [--save results.json]
+       [--baseline results.json] [--threshold 5] [--fail-on-regression]
+
+For example, to compare the plugin managers:
+
+    python -m benchmarks.startup --config omz.yaml --apps zsh --save omz.json
+    python -m benchmarks.startup --config zinit.yaml --apps zsh --baseline omz.json
+"""
+
+import argparse
+import json
+import math
+import os
+import select
+import shutil
+import statistics
+import subprocess
+import tarfile
+import tempfile
+import threading
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from pathlib import PosixPath
+
+from apps.registry import get_app_descriptor
+from apps.tarball import TarballApp
+from cli.apply import load_config_file
+from configuration import ConfigurationData
+
+
+@dataclass
+class StartupStats:
+    samples: list[float] = field(default_factory=list)
+    "The startup times in milliseconds"
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.samples)
+
+    @property
+    def p95(self) -> float:
+        # The nearest rank, so it is always one of the samples
+        return sorted(self.samples)[math.ceil(len(self.samples) * 0.95) - 1]
+
+    @property
+    def variance(self) -> float:
+        return statistics.variance(self.samples) if len(self.samples) > 1 else 0.0
+
+    def to_json(self) -> dict[str, object]:
+        return {
+            "median_ms": round(self.median, 3),
+            "p95_ms": round(self.p95, 3),
+            "variance_ms2": round(self.variance, 3),
+            "samples_ms": [round(sample, 3) for sample in self.samples],
+        }
+
+    @classmethod
+    def from_json(cls, raw_stats: dict[str, list[float]]) -> "StartupStats":
+        return cls(list(raw_stats["samples_ms"]))
+
+
+def install_bundled_binary(app_name: str, home: PosixPath) -> PosixPath | None:
+    """
+    Unpacks the binary bundled with an application into the home directory (the way installing it does),
+    None if the application does not bundle one
+    """
+    app = get_app_descriptor(app_name).create()
+    if not isinstance(app, TarballApp) or not app.archive.is_file():
+        return None
+
+    install_directory = PosixPath(home, ".local", "bin")
+    unarchive_path = PosixPath(install_directory, f"{app_name}-dir")
+    unarchive_path.mkdir(parents=True, exist_ok=True)
+
+    with app.archive.open("rb") as archive_file:
+        with tarfile.open(fileobj=archive_file, mode="r|gz") as archive:
+            for member in archive:
+                if app.strip_components:
+                    member.name = member.name.partition("/")[2]
+                    if member.name == "":
+                        continue
+
+                archive.extract(member, unarchive_path, filter="tar")
+
+    binary_path = PosixPath(install_directory, type(app).BINARY_NAME)
+    binary_path.symlink_to(PosixPath(unarchive_path, app.link_path))
+    return binary_path
+
+
+def prepare_home(
+    home: PosixPath, configurations: Sequence[ConfigurationData]
+) -> list[ConfigurationData]:
+    """
+    Renders the configurations into the home directory (and deploys their resources), returns them as they were rendered
+    """
+    rendered_configurations: list[ConfigurationData] = []
+    for configuration in configurations:
+        home_configuration = configuration.with_home(home)
+        if not home_configuration.config():
+            raise RuntimeError(
+                f"Failed to configure {type(configuration).CONFIG_NAME} in {home}"
+            )
+
+        rendered_configurations.append(home_configuration)
+
+    return rendered_configurations
+
+
+def startup_environment(home: PosixPath) -> dict[str, str]:
+    """
+    The environment the tools are started with: the throwaway home directory, without the caller's terminal multiplexer
+    and XDG directories (so nothing of the caller's own configuration is loaded)
+    """
+    runtime_directory = PosixPath(home, ".run")
+    runtime_directory.mkdir(mode=0o700, exist_ok=True)
+
+    environment = {
+        name: value
+        for name, value in os.environ.items()
+        if not name.startswith(("TMUX", "XDG_", "ZDOTDIR"))
+    }
+    environment.update(
+        HOME=str(home),
+        PATH=f"{PosixPath(home, '.local', 'bin')}:{os.environ.get('PATH', '')}",
+        TERM=os.environ.get("TERM", "xterm-256color"),
+        XDG_RUNTIME_DIR=str(runtime_directory),
+        TMUX_TMPDIR=str(runtime_directory),
+    )
+    return environment
+
+
+def _drain(primary: int, stop: threading.Event) -> None:
+    # A shell that fills up the terminal's buffer would block, before it exits
+    while not stop.is_set():
+        ready, _, _ = select.select([primary], [], [], 0.05)
+        if len(ready) != 0:
+            try:
+                if len(os.read(primary, 65536)) == 0:
+                    return
+            except OSError:
+                return
+
+
+def time_command(
+    command: list[str], environment: dict[str, str], use_pty: bool = False
+) -> float:
+    """
+    How long the command takes until it exits, in milliseconds
+    """
+    if not use_pty:
+        start_time = time.perf_counter()
+        _ = subprocess.run(
+            command,
+            env=environment,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        return (time.perf_counter() - start_time) * 1000
+
+    primary, secondary = os.openpty()
+    stop = threading.Event()
+    drainer = threading.Thread(target=_drain, args=(primary, stop), daemon=True)
+    drainer.start()
+
+    try:
+        start_time = time.perf_counter()
+        process = subprocess.Popen(
+            command,
+            env=environment,
+            stdin=secondary,
+            stdout=secondary,
+            stderr=secondary,
+            start_new_session=True,
+        )
+        _ = process.wait()
+        duration = (time.perf_counter() - start_time) * 1000
+    finally:
+        stop.set()
+        drainer.join()
+        os.close(secondary)
+        os.close(primary)
+
+    return duration
+
+
+def install_binaries(home: PosixPath, app_names: list[str]) -> dict[str, str]:
+    """
+    Unpacks the bundled binaries of the tools into the home directory (the installed ones are used for the tools that
+    are not bundled), tools that are neither bundled nor installed are left out
+    """
+    binaries: dict[str, str] = {}
+    for app_name in app_names:
+        binary_path = install_bundled_binary(app_name, home)
+        binary = str(binary_path) if binary_path is not None else shutil.which(app_name)
+        if binary is None:
+            print(f"{app_name} is not bundled or installed, it is not measured")
+            continue
+
+        binaries[app_name] = binary
+
+    return binaries
+
+
+def startup_command(
+    app_name: str, binary: str, configurations: Sequence[ConfigurationData]
+) -> tuple[list[str], bool]:
+    """
+    The command that starts the tool, and whether it needs a terminal
+    """
+    if app_name == "zsh":
+        return [binary, "-i", "-c", "exit"], True
+
+    if app_name == "tmux":
+        config_path = next(
+            (
+                configuration.config_path
+                for configuration in configurations
+                if type(configuration).CONFIG_NAME == "tmux"
+            ),
+            PosixPath("/dev/null"),
+        )
+        return [
+            binary,
+            "-L",
+            "configold-benchmark",
+            "-f",
+            str(config_path),
+            "start-server",
+            ";",
+            "kill-server",
+        ], False
+
+    if app_name == "nvim":
+        return [binary, "--headless", "+qa"], False
+
+    raise ValueError(f"The startup of {app_name} can not be measured")
+
+
+def measure_startup(
+    configurations: Sequence[ConfigurationData],
+    app_names: list[str],
+    repeat: int = 20,
+    warmup: int = 2,
+) -> dict[str, StartupStats]:
+    """
+    Renders the configurations into a throwaway home directory and measures the startup of each of the tools.
+    The first runs only warm up (e.g. the caches the plugins and the prompt write on the first start)
+    """
+    with tempfile.TemporaryDirectory(prefix="configold-startup-") as temporary_home:
+        home = PosixPath(temporary_home)
+        environment = startup_environment(home)
+        # Installed before rendering, so the zshrc is compiled with the bundled zsh
+        binaries = install_binaries(home, app_names)
+        rendered_configurations = prepare_home(home, configurations)
+
+        results: dict[str, StartupStats] = {}
+        for app_name, binary in binaries.items():
+            command, use_pty = startup_command(
+                app_name, binary, rendered_configurations
+            )
+            for _ in range(warmup):
+                _ = time_command(command, environment, use_pty)
+
+            results[app_name] = StartupStats(
+                [time_command(command, environment, use_pty) for _ in range(repeat)]
+            )
+
+        return results
+
+
+def compare(
+    results: dict[str, StartupStats],
+    baseline: dict[str, StartupStats],
+    threshold: float,
+) -> list[str]:
+    """
+    Prints how the results changed since the baseline, returns the tools whose median got slower than the threshold (percent)
+    """
+    regressions: list[str] = []
+    for app_name, stats in results.items():
+        baseline_stats = baseline.get(app_name)
+        if baseline_stats is None:
+            continue
+
+        median_change = (stats.median / baseline_stats.median - 1) * 100
+        p95_change = (stats.p95 / baseline_stats.p95 - 1) * 100
+        verdict = "unchanged"
+        if median_change > threshold:
+            verdict = "slower"
+            regressions.append(app_name)
+        elif median_change < -threshold:
+            verdict = "faster"
+
+        print(
+            f"{app_name:<6} median {baseline_stats.median:.1f}ms -> {stats.median:.1f}ms ({median_change:+.1f}%) "
+            + f"p95 {baseline_stats.p95:.1f}ms -> {stats.p95:.1f}ms ({p95_change:+.1f}%) {verdict}"
+        )
+
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    _ = parser.add_argument(
+        "--config",
+        type=PosixPath,
+        help="A YAML file with the configuration of each application (the same as for apply)",
+    )
+    _ = parser.add_argument(
+        "--apps",
+        type=lambda apps: [app.strip() for app in apps.split(",") if app.strip()],
+        default=["zsh", "tmux", "nvim"],
+    )
+    _ = parser.add_argument("--repeat", type=int, default=20)
+    _ = parser.add_argument("--warmup", type=int, default=2)
+    _ = parser.add_argument("--save", type=PosixPath)
+    _ = parser.add_argument("--baseline", type=PosixPath)
+    _ = parser.add_argument(
+        "--threshold",
+        type=float,
+        default=5.0,
+        help="How many percent the median may change before it counts as a change",
+    )
+    _ = parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    raw_configs = {} if args.config is None else load_config_file(args.config)
+    configurations: list[ConfigurationData] = []
+    for app_name in args.apps:
+        config_class = get_app_descriptor(app_name).load_config_class()
+        if config_class is not None:
+            configurations.append(
+                config_class.model_validate(raw_configs.get(app_name, {}))
+            )
+
+    results = measure_startup(configurations, args.apps, args.repeat, args.warmup)
+    for app_name, stats in results.items():
+        print(
+            f"{app_name:<6} median={stats.median:.1f}ms p95={stats.p95:.1f}ms "
+            + f"variance={stats.variance:.2f}ms² runs={len(stats.samples)}"
+        )
+
+    if args.save is not None:
+        _ = args.save.write_text(
+            json.dumps(
+                {app_name: stats.to_json() for app_name, stats in results.items()},
+                indent=2,
+            )
+        )
+
+    if args.baseline is not None:
+        baseline = {
+            app_name: StartupStats.from_json(raw_stats)
+            for app_name, raw_stats in json.loads(args.baseline.read_text()).items()
+        }
+        regressions = compare(results, baseline, args.threshold)
+        if args.fail_on_regression and len(regressions) != 0:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Builds configold as a single file executable (a zipapp) that does not depend on a checkout or the working directory:
+
+    python build_zipapp.py --output dist/configold
+    ./dist/configold apply --config team.yaml
+
+The archive contains the first party packages with their resources and precompiled bytecode, the third party
+dependencies (requirements.txt) are expected to be installed for the interpreter that runs it.
+The resources of every application are packed into a single indexed file (utils/resource_pack.py), which is faster
+to read from the archive than thousands of small members and only extracted as far as a configuration needs it.
+"""
+
+import argparse
+import compileall
+import os
+import re
+import shutil
+import sys
+import tempfile
+import zipfile
+from pathlib import PosixPath
+
+from utils.resource_pack import PACK_FILE_NAME, build_resource_pack
+
+PACKAGES: list[str] = ["apps", "cli", "components", "configuration", "utils"]
+MODULES: list[str] = ["main.py"]
+
+# Already compressed files are stored as is, compressing them again only slows down reading them
+STORED_SUFFIXES: set[str] = {
+    ".gz",
+    ".png",
+    ".gif",
+    ".webp",
+    ".jpg",
+    ".zip",
+    ".zwc",
+    ".pack",
+}
+
+MAIN_MODULE: str = """import sys
+
+from cli import main
+
+sys.exit(main())
+"""
+
+
+def stage(source_directory: PosixPath, staging_directory: PosixPath) -> None:
+    for package in PACKAGES:
+        # Symbolic links are followed, the same as when configuring from a checkout
+        _ = shutil.copytree(
+            PosixPath(source_directory, package),
+            PosixPath(staging_directory, package),
+            ignore=shutil.ignore_patterns("__pycache__", "*.pyc"),
+        )
+
+    for module in MODULES:
+        _ = shutil.copy2(
+            PosixPath(source_directory, module), PosixPath(staging_directory, module)
+        )
+
+    for resources in sorted(PosixPath(staging_directory, "apps").glob("*/resources")):
+        _ = build_resource_pack(resources, PosixPath(resources.parent, PACK_FILE_NAME))
+        shutil.rmtree(resources)
+
+    _ = PosixPath(staging_directory, "__main__.py").write_text(MAIN_MODULE)
+
+    # Legacy (sourceless layout) bytecode is placed next to the sources, which is where zipimport looks for it
+    _ = compileall.compile_dir(
+        staging_directory,
+        quiet=1,
+        legacy=True,
+        rx=re.compile(r"/resources/"),
+    )
+
+
+def write_archive(
+    staging_directory: PosixPath, output_path: PosixPath, interpreter: str
+) -> None:
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    with open(output_path, "wb") as output_file:
+        _ = output_file.write(f"#!{interpreter}\n".encode())
+
+        with zipfile.ZipFile(output_file, "w") as archive:
+            for directory, directory_names, file_names in os.walk(staging_directory):
+                directory_names.sort()
+
+                for file_name in sorted(file_names):
+                    file_path = PosixPath(directory, file_name)
+                    archive.write(
+                        file_path,
+                        file_path.relative_to(staging_directory).as_posix(),
+                        compress_type=(
+                            zipfile.ZIP_STORED
+                            if file_path.suffix in STORED_SUFFIXES
+                            else zipfile.ZIP_DEFLATED
+                        ),
+                    )
+
+    output_path.chmod(0o755)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Build configold as a zipapp")
+    _ = parser.add_argument(
+        "--output", type=PosixPath, default=PosixPath("dist", "configold")
+    )
+    _ = parser.add_argument(
+        "--python",
+        default="/usr/bin/env python3",
+        help="The interpreter of the shebang line (the bytecode is compiled for the interpreter running this script)",
+    )
+    args = parser.parse_args()
+
+    source_directory = PosixPath(__file__).parent.resolve()
+
+    with tempfile.TemporaryDirectory() as staging_directory:
+        stage(source_directory, PosixPath(staging_directory))
+        write_archive(PosixPath(staging_directory), args.output, args.python)
+
+    print(f"Built {args.output} ({args.output.stat().st_size / 1024 / 1024:.1f} MiB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
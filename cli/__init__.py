@@ -0,0 +1,43 @@
+import argparse
+import os
+
+from . import apply, backup, import_config, profile, render, serve, ui, watch
+
+COMMANDS = [ui, apply, render, serve, backup, profile, watch, import_config]
+
+
+def create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="configold",
+        description="Like gold, you configuration should be precious but malleable",
+    )
+    # Without a command the user interface is opened
+    parser.set_defaults(run=ui.run)
+    subparsers = parser.add_subparsers(dest="command")
+
+    for command in COMMANDS:
+        command.add_parser(subparsers)
+
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    # Non interactive environments (like cloud-init) don't always set HOME, and every default path is relative to it
+    if os.getenv("HOME") is None:
+        os.environ["HOME"] = os.path.expanduser("~")
+
+    args = create_parser().parse_args(argv)
+    try:
+        return args.run(args)
+    except Exception as error:
+        # Imported only on failure, the requirements import pydantic
+        from utils.requirements.binary_requirements import MissingBinariesError
+
+        if not isinstance(error, MissingBinariesError):
+            raise
+
+        # The missing binaries were already logged
+        return 1
+
+
+__all__ = ["create_parser", "main"]
@@ -0,0 +1,222 @@
+import argparse
+import logging
+import sys
+import time
+from pathlib import PosixPath
+from typing import TYPE_CHECKING, Any
+
+from .output import print_result
+
+if TYPE_CHECKING:
+    from apps.journal import ApplyJournal
+    from apps.registry import AppDescriptor
+
+EXIT_SUCCESS: int = 0
+EXIT_FAILURE: int = 1
+EXIT_USAGE: int = 2
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+def add_parser(
+    subparsers: "argparse._SubParsersAction[argparse.ArgumentParser]",
+) -> None:
+    parser = subparsers.add_parser(
+        "apply",
+        help="Install and configure applications without the UI",
+        description="Install and configure applications without the UI, the results are printed as JSON",
+    )
+    _ = parser.add_argument(
+        "--config",
+        type=PosixPath,
+        help="A YAML file with the configuration of each application, keyed by the application's name",
+    )
+    _ = parser.add_argument(
+        "--apps",
+        type=lambda apps: [app.strip() for app in apps.split(",") if app.strip()],
+        help="Comma separated applications to apply (defaults to the applications in the configuration file, or all of them)",
+    )
+    _ = parser.add_argument(
+        "--skip-install", action="store_true", help="Only configure the applications"
+    )
+    _ = parser.add_argument(
+        "--skip-configure", action="store_true", help="Only install the applications"
+    )
+    _ = parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Apply every application, even if nothing changed since its last apply",
+    )
+    parser.set_defaults(run=run)
+
+
+def load_config_file(
+    path: PosixPath,
+) -> dict[str, dict[str, Any]]:
+    import yaml
+
+    with open(path, "r") as config_file:
+        config: object = yaml.safe_load(config_file)
+
+    if config is None:
+        return {}
+
+    if not isinstance(config, dict) or not all(
+        isinstance(app_config, dict | None) for app_config in config.values()
+    ):
+        raise ValueError(
+            f"The configuration file must map application names to their configuration ({path})"
+        )
+
+    return {str(name): app_config or {} for name, app_config in config.items()}
+
+
+async def apply_app(
+    descriptor: "AppDescriptor",
+    raw_config: dict[str, Any] | None,
+    install: bool = True,
+    configure: bool = True,
+    journal: "ApplyJournal | None" = None,
+    force: bool = False,
+) -> dict[str, Any]:
+    from utils.requirements.binary_requirements import MissingBinariesError
+
+    result: dict[str, Any] = {
+        "app": descriptor.name,
+        "ok": False,
+        "skipped": False,
+        "installed": None,
+        "configured": None,
+        "config_status": None,
+        "error": None,
+    }
+    start_time = time.perf_counter()
+
+    try:
+        config_class = descriptor.load_config_class()
+        if raw_config is not None and config_class is None:
+            raise ValueError(f"{descriptor.name} does not have a configuration")
+
+        config_data = (
+            None
+            if raw_config is None or config_class is None
+            else config_class.model_validate(raw_config)
+        )
+        installable_app = descriptor.create(config_data)
+
+        prepare = True
+        if journal is not None:
+            plan = journal.plan(
+                installable_app, install=install, configure=configure, force=force
+            )
+            install, configure, prepare = plan.install, plan.configure, plan.prepare
+            result["skipped"] = plan.skipped
+
+        if install:
+            result["installed"] = await installable_app.install()
+
+        if configure:
+            result["configured"] = installable_app.configure(prepare=prepare)
+
+            if installable_app.configuration is not None:
+                config_data = installable_app.configuration.config_data
+                # Whether the configuration file was written, or already had the rendered content
+                result["config_status"] = config_data.status
+
+                if not result["configured"] and config_data.is_linked_to_profile:
+                    result["error"] = (
+                        f"{config_data.config_path} is linked to the active profile, build the profile to change it (or deactivate the profile with `profile deactivate`)"
+                    )
+
+        result["ok"] = (
+            result["installed"] is not False and result["configured"] is not False
+        )
+
+        if journal is not None:
+            journal.record(
+                installable_app,
+                installed=install,
+                configured=result["configured"] is True,
+            )
+    except MissingBinariesError as error:
+        # Missing binaries are fatal for the application, but should not stop the other applications
+        result["error"] = str(error)
+    except Exception as error:
+        logger.exception("Failed to apply %s", descriptor.name)
+        result["error"] = f"{type(error).__name__}: {error}"
+
+    result["duration"] = round(time.perf_counter() - start_time, 6)
+    return result
+
+
+async def apply_apps(
+    apps: list[tuple["AppDescriptor", dict[str, Any] | None]],
+    install: bool = True,
+    configure: bool = True,
+    journal: "ApplyJournal | None" = None,
+    force: bool = False,
+) -> list[dict[str, Any]]:
+    results = [
+        await apply_app(
+            descriptor,
+            raw_config,
+            install=install,
+            configure=configure,
+            journal=journal,
+            force=force,
+        )
+        for descriptor, raw_config in apps
+    ]
+
+    if journal is not None:
+        journal.save()
+
+    return results
+
+
+def run(args: argparse.Namespace) -> int:
+    import asyncio
+    import contextlib
+
+    from apps.journal import ApplyJournal
+    from apps.registry import APPS, get_app_descriptor
+    from utils import setup_logger
+
+    start_time = time.perf_counter()
+
+    try:
+        config = {} if args.config is None else load_config_file(args.config)
+        app_names: list[str] = (
+            args.apps
+            if args.apps
+            else (list(config) if config else [descriptor.name for descriptor in APPS])
+        )
+        apps = [(get_app_descriptor(name), config.get(name)) for name in app_names]
+    except (OSError, ValueError, KeyError) as error:
+        print_result({"ok": False, "error": str(error), "apps": []})
+        return EXIT_USAGE
+
+    setup_logger(console=False)
+
+    # The installers write to stdout, and stdout is reserved for the JSON results
+    with contextlib.redirect_stdout(sys.stderr):
+        results = asyncio.run(
+            apply_apps(
+                apps,
+                install=not args.skip_install,
+                configure=not args.skip_configure,
+                journal=ApplyJournal(),
+                force=args.force,
+            )
+        )
+
+    ok = all(result["ok"] for result in results)
+    print_result(
+        {
+            "ok": ok,
+            "duration": round(time.perf_counter() - start_time, 6),
+            "apps": results,
+        }
+    )
+
+    return EXIT_SUCCESS if ok else EXIT_FAILURE
@@ -0,0 +1,97 @@
+import argparse
+from pathlib import PosixPath
+from typing import TYPE_CHECKING
+
+from .apply import EXIT_FAILURE, EXIT_SUCCESS, EXIT_USAGE, load_config_file
+from .output import print_result
+
+if TYPE_CHECKING:
+    from configuration.backup import BackupStore
+
+
+def add_parser(
+    subparsers: "argparse._SubParsersAction[argparse.ArgumentParser]",
+) -> None:
+    parser = subparsers.add_parser(
+        "backup",
+        help="List and restore the backups of the configuration files",
+        description="List and restore the backups of the configuration files, the results are printed as JSON",
+    )
+    _ = parser.add_argument(
+        "--config",
+        type=PosixPath,
+        help="A YAML file with the configuration of each application (for a custom backup directory)",
+    )
+    backup_subparsers = parser.add_subparsers(dest="backup_command", required=True)
+
+    list_parser = backup_subparsers.add_parser(
+        "list", help="List the backup generations of an application"
+    )
+    _ = list_parser.add_argument("app", help="The name of the application")
+
+    restore_parser = backup_subparsers.add_parser(
+        "restore", help="Restore a backup generation of an application"
+    )
+    _ = restore_parser.add_argument("app", help="The name of the application")
+    _ = restore_parser.add_argument(
+        "generation",
+        type=int,
+        nargs="?",
+        default=-1,
+        help="The generation to restore (negative numbers count back from the latest, defaults to the latest)",
+    )
+    _ = restore_parser.add_argument(
+        "--target",
+        type=PosixPath,
+        default=None,
+        help="Restore into this file instead of the backed up file",
+    )
+    parser.set_defaults(run=run)
+
+
+def _load_backup_store(app_name: str, config_path: PosixPath | None) -> "BackupStore":
+    from apps.registry import get_app_descriptor
+
+    config_class = get_app_descriptor(app_name).load_config_class()
+    if config_class is None:
+        raise ValueError(f"{app_name} does not have a configuration")
+
+    raw_config = {} if config_path is None else load_config_file(config_path)
+    return config_class.model_validate(raw_config.get(app_name, {})).backup_store
+
+
+def run(args: argparse.Namespace) -> int:
+    from dataclasses import asdict
+    from datetime import datetime
+
+    try:
+        backup_store = _load_backup_store(args.app, args.config)
+    except (OSError, ValueError, KeyError) as error:
+        print_result({"ok": False, "error": str(error)})
+        return EXIT_USAGE
+
+    if args.backup_command == "list":
+        print_result(
+            {
+                "ok": True,
+                "generations": [
+                    {
+                        **asdict(generation),
+                        "time": datetime.fromtimestamp(generation.timestamp)
+                        .astimezone()
+                        .isoformat(timespec="seconds"),
+                    }
+                    for generation in backup_store.generations()
+                ],
+            }
+        )
+        return EXIT_SUCCESS
+
+    try:
+        generation = backup_store.restore(args.generation, args.target)
+    except (OSError, LookupError) as error:
+        print_result({"ok": False, "error": str(error)})
+        return EXIT_FAILURE
+
+    print_result({"ok": True, "restored": asdict(generation)})
+    return EXIT_SUCCESS
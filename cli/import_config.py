@@ -0,0 +1,97 @@
+import argparse
+import time
+from dataclasses import asdict
+from pathlib import PosixPath
+from typing import Any
+
+from .apply import EXIT_FAILURE, EXIT_SUCCESS, EXIT_USAGE
+from .output import print_result
+
+
+def add_parser(
+    subparsers: "argparse._SubParsersAction[argparse.ArgumentParser]",
+) -> None:
+    parser = subparsers.add_parser(
+        "import",
+        help="Import an existing configuration file (e.g. your .zshrc) into your profile",
+        description="Import an existing configuration file into your profile, the results are printed as JSON",
+    )
+    _ = parser.add_argument(
+        "app", help="The name of the application (zsh or tmux are supported)"
+    )
+    _ = parser.add_argument(
+        "--file",
+        type=PosixPath,
+        default=None,
+        help="The configuration file to import (defaults to the application's configuration file, e.g. ~/.zshrc)",
+    )
+    _ = parser.add_argument(
+        "--profile",
+        type=PosixPath,
+        default=None,
+        help="The profile to import into (defaults to your saved profile)",
+    )
+    _ = parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Print the imported configuration instead of saving it",
+    )
+    parser.set_defaults(run=run)
+
+
+def run(args: argparse.Namespace) -> int:
+    from pydantic import ValidationError
+
+    from apps.registry import get_app_descriptor
+    from configuration.profile import ConfigurationProfile
+
+    try:
+        config_class = get_app_descriptor(args.app).load_config_class()
+    except KeyError as error:
+        print_result({"ok": False, "error": str(error)})
+        return EXIT_USAGE
+
+    if config_class is None:
+        print_result(
+            {"ok": False, "error": f"{args.app} does not have a configuration"}
+        )
+        return EXIT_USAGE
+
+    if config_class.CONFIG_FILE_IMPORTER is None:
+        print_result(
+            {"ok": False, "error": f"Importing {args.app} files is not supported"}
+        )
+        return EXIT_USAGE
+
+    config_path: PosixPath = args.file or config_class().config_path
+
+    start_time = time.perf_counter()
+    try:
+        rc_import = config_class.import_config_file(config_path.read_bytes())
+        config_data = config_class.model_validate(rc_import.config)
+    except (OSError, ValidationError) as error:
+        print_result({"ok": False, "error": str(error)})
+        return EXIT_FAILURE
+
+    result: dict[str, Any] = {
+        "ok": True,
+        "app": args.app,
+        "file": config_path.as_posix(),
+        **asdict(rc_import),
+        "duration": round(time.perf_counter() - start_time, 6),
+    }
+    if args.dry_run:
+        result["config"] = config_data.model_dump(mode="json", exclude={"logger"})
+    else:
+        del result["config"]
+        profile = ConfigurationProfile(args.profile)
+        try:
+            profile.save({args.app: config_data})
+        except OSError as error:
+            print_result({"ok": False, "error": str(error)})
+            return EXIT_FAILURE
+
+        result["profile"] = profile.path.as_posix()
+
+    print_result(result)
+    return EXIT_SUCCESS
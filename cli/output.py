@@ -0,0 +1,11 @@
+import json
+import sys
+from typing import Any
+
+
+def print_result(result: dict[str, Any]) -> None:
+    """
+    Prints the result of a command as JSON (the commands are meant to be scripted)
+    """
+    _ = sys.stdout.write(json.dumps(result, indent=2) + "\n")
+    sys.stdout.flush()
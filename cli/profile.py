@@ -0,0 +1,112 @@
+import argparse
+import time
+from pathlib import PosixPath
+
+from .apply import EXIT_FAILURE, EXIT_SUCCESS, EXIT_USAGE
+from .output import print_result
+
+
+def add_parser(
+    subparsers: "argparse._SubParsersAction[argparse.ArgumentParser]",
+) -> None:
+    parser = subparsers.add_parser(
+        "profile",
+        help="Build named profiles ahead of time and switch between them",
+        description="Build named profiles ahead of time and switch between them instantly, the results are printed as JSON",
+    )
+    profile_subparsers = parser.add_subparsers(dest="profile_command", required=True)
+
+    build_parser = profile_subparsers.add_parser(
+        "build",
+        help="Render a profile's configuration files (from ~/.config/configold/profiles/<name>.yaml)",
+    )
+    _ = build_parser.add_argument("name", help="The name of the profile")
+    _ = build_parser.add_argument(
+        "--source",
+        type=PosixPath,
+        default=None,
+        help="Render the profile from this configuration file instead",
+    )
+
+    switch_parser = profile_subparsers.add_parser(
+        "switch", help="Make a built profile the active one"
+    )
+    _ = switch_parser.add_argument("name", help="The name of the profile")
+
+    _ = profile_subparsers.add_parser(
+        "list", help="List the built profiles and the active one"
+    )
+    _ = profile_subparsers.add_parser(
+        "deactivate",
+        help="Replace the links through the active profile with real files, so apply can change them again",
+    )
+    parser.set_defaults(run=run)
+
+
+def _build(args: argparse.Namespace) -> int:
+    from configuration.profile_build import build_profile
+    from utils import setup_logger
+
+    setup_logger(console=False)
+
+    try:
+        files = build_profile(args.name, args.source)
+    except ValueError as error:
+        print_result({"ok": False, "error": str(error)})
+        return EXIT_USAGE
+    except (OSError, LookupError) as error:
+        print_result({"ok": False, "error": str(error)})
+        return EXIT_FAILURE
+
+    ok = all(rendered_file["prepared"] for rendered_file in files)
+    print_result({"ok": ok, "profile": args.name, "files": files})
+    return EXIT_SUCCESS if ok else EXIT_FAILURE
+
+
+def run(args: argparse.Namespace) -> int:
+    # Only building a profile loads the configuration models, switching is kept light enough for a login hook
+    from utils.profile_links import (
+        active_profile,
+        deactivate_profile,
+        list_profiles,
+        switch_profile,
+    )
+
+    if args.profile_command == "build":
+        return _build(args)
+
+    if args.profile_command == "list":
+        print_result(
+            {"ok": True, "active": active_profile(), "profiles": list_profiles()}
+        )
+        return EXIT_SUCCESS
+
+    if args.profile_command == "deactivate":
+        name = active_profile()
+        try:
+            files = deactivate_profile()
+        except (OSError, LookupError) as error:
+            print_result({"ok": False, "error": str(error)})
+            return EXIT_FAILURE
+
+        print_result({"ok": True, "deactivated": name, "files": files})
+        return EXIT_SUCCESS
+
+    start_time = time.perf_counter()
+    try:
+        switch_profile(args.name)
+    except ValueError as error:
+        print_result({"ok": False, "error": str(error)})
+        return EXIT_USAGE
+    except (OSError, LookupError) as error:
+        print_result({"ok": False, "error": str(error)})
+        return EXIT_FAILURE
+
+    print_result(
+        {
+            "ok": True,
+            "active": args.name,
+            "duration": round(time.perf_counter() - start_time, 6),
+        }
+    )
+    return EXIT_SUCCESS
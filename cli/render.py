@@ -0,0 +1,122 @@
+import argparse
+import time
+from pathlib import PosixPath
+from typing import TYPE_CHECKING
+
+from .apply import EXIT_FAILURE, EXIT_SUCCESS, EXIT_USAGE, load_config_file
+from .output import print_result
+
+if TYPE_CHECKING:
+    from configuration.fleet import FleetProfile
+
+DEFAULT_APPS: list[str] = ["zsh", "tmux", "zellij"]
+
+
+def add_parser(
+    subparsers: "argparse._SubParsersAction[argparse.ArgumentParser]",
+) -> None:
+    parser = subparsers.add_parser(
+        "render",
+        help="Render the configuration files of many users",
+        description="Render the configuration files of many users from a shared base configuration, the results are printed as JSON",
+    )
+    _ = parser.add_argument(
+        "--config",
+        type=PosixPath,
+        help="A YAML file with the base configuration of each application, keyed by the application's name",
+    )
+    _ = parser.add_argument(
+        "--profiles",
+        type=PosixPath,
+        required=True,
+        help="A YAML file with a list of users, each with a name, a home (the target root) and optional overrides",
+    )
+    _ = parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="The number of processes to render with (defaults to the number of CPUs)",
+    )
+    _ = parser.add_argument(
+        "--no-backup",
+        action="store_true",
+        help="Replace the existing configuration files without backing them up first",
+    )
+    parser.set_defaults(run=run)
+
+
+def load_profiles_file(path: PosixPath) -> list["FleetProfile"]:
+    import yaml
+
+    from configuration.fleet import FleetProfile
+
+    with open(path, "r") as profiles_file:
+        raw_profiles: object = yaml.safe_load(profiles_file)
+
+    if not isinstance(raw_profiles, list):
+        raise ValueError(f"The profiles file must contain a list of profiles ({path})")
+
+    profiles: list[FleetProfile] = []
+    for raw_profile in raw_profiles:
+        if not isinstance(raw_profile, dict) or "home" not in raw_profile:
+            raise ValueError(f"Every profile must have a home ({path})")
+
+        home = PosixPath(raw_profile["home"]).expanduser()
+        profiles.append(
+            FleetProfile(
+                name=str(raw_profile.get("name", home.name)),
+                home=home,
+                overrides=raw_profile.get("overrides") or {},
+            )
+        )
+
+    return profiles
+
+
+def run(args: argparse.Namespace) -> int:
+    from configuration import ConfigStatus
+    from configuration.fleet import render_fleet
+    from utils import setup_logger
+
+    try:
+        base_raw_configs = (
+            {app_name: {} for app_name in DEFAULT_APPS}
+            if args.config is None
+            else load_config_file(args.config)
+        )
+        profiles = load_profiles_file(args.profiles)
+    except (OSError, ValueError) as error:
+        print_result({"ok": False, "error": str(error), "profiles": []})
+        return EXIT_USAGE
+
+    setup_logger(console=False)
+
+    start_time = time.perf_counter()
+    try:
+        results = render_fleet(
+            base_raw_configs, profiles, jobs=args.jobs, backup=not args.no_backup
+        )
+    except (KeyError, ValueError) as error:
+        print_result({"ok": False, "error": str(error), "profiles": []})
+        return EXIT_USAGE
+    duration = time.perf_counter() - start_time
+
+    ok = all(result["ok"] for result in results)
+    statuses = [
+        rendered_file["status"]
+        for result in results
+        for rendered_file in result["files"]
+    ]
+    print_result(
+        {
+            "ok": ok,
+            "users": len(results),
+            "written": statuses.count(ConfigStatus.WRITTEN),
+            "unchanged": statuses.count(ConfigStatus.UNCHANGED),
+            "duration": round(duration, 6),
+            "users_per_second": round(len(results) / duration, 2) if duration else None,
+            "failures": [result for result in results if not result["ok"]],
+        }
+    )
+
+    return EXIT_SUCCESS if ok else EXIT_FAILURE
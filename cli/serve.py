@@ -0,0 +1,194 @@
+import argparse
+import gc
+import importlib
+import json
+import logging
+import os
+import shlex
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+from pathlib import PosixPath
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+SESSION_SOCKET_NAME: str = "sessions.sock"
+MAX_ENVIRONMENT_SIZE: int = 256 * 1024
+
+# The command textual-serve runs for every session, it only imports the standard library and hands its stdio (and
+# environment) over to the warm session server, which forks a process that runs the UI on them
+SESSION_CLIENT: str = """
+import json, os, socket, sys
+connection = socket.socket(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+connection.connect(sys.argv[1])
+socket.send_fds(connection, [json.dumps(dict(os.environ)).encode()], [0, 1, 2])
+os.close(0)
+os.close(1)
+exit_code = connection.recv(16)
+sys.exit(int(exit_code) if exit_code else 1)
+"""
+
+
+def add_parser(
+    subparsers: "argparse._SubParsersAction[argparse.ArgumentParser]",
+) -> None:
+    parser = subparsers.add_parser(
+        "serve",
+        help="Serve the configold user interface in the browser",
+        description="Serve the configold user interface in the browser, every session is forked from a warm process",
+    )
+    _ = parser.add_argument("--host", default="localhost")
+    _ = parser.add_argument("--port", type=int, default=8000)
+    _ = parser.add_argument(
+        "--public-url",
+        default=None,
+        help="The URL the server is reachable at (when it is behind a proxy)",
+    )
+    parser.set_defaults(run=run)
+
+
+def warm_up() -> None:
+    """
+    Imports everything a session needs (the UI, the applications, their models and their widgets),
+    so the forked sessions share it instead of importing it again
+    """
+    import textual.drivers.web_driver  # pyright: ignore[reportUnusedImport]
+
+    import main  # pyright: ignore[reportUnusedImport]
+    from apps.registry import APPS
+
+    for descriptor in APPS:
+        installable_app = descriptor.create()
+        if installable_app.configuration is None:
+            continue
+
+        _ = installable_app.configuration.load_widget_class()
+        _ = installable_app.configuration.config_data.config_schema()
+        _ = installable_app.configuration.config_data.descriptions
+
+
+def _run_session(connection: socket.socket) -> int:
+    """
+    Runs the UI on the stdio of a session client (inside of the session's forked process)
+    """
+    import textual.constants
+
+    from main import MainApp
+
+    raw_environment, file_descriptors, _, _ = socket.recv_fds(
+        connection, MAX_ENVIRONMENT_SIZE, 3
+    )
+    if len(file_descriptors) != 3:
+        return 1
+
+    for target_descriptor, file_descriptor in enumerate(file_descriptors):
+        os.dup2(file_descriptor, target_descriptor)
+        os.close(file_descriptor)
+
+    os.environ.clear()
+    os.environ.update(json.loads(raw_environment))
+    # textual reads its configuration (the driver, the color system, ...) from the environment when it is imported
+    _ = importlib.reload(textual.constants)
+
+    app = MainApp()
+    app.run()
+
+    return app.return_code or 0
+
+
+def _serve_sessions(listener: socket.socket, parent_pid: int) -> None:
+    """
+    The loop of the warm session server, it forks a process for every session client that connects
+    """
+    # The sessions report their exit code to their client, so they are reaped automatically
+    _ = signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    _ = signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    # Everything imported so far is never freed, keeping it out of the collector keeps the memory shared with the sessions
+    gc.collect()
+    gc.freeze()
+
+    listener.settimeout(1)
+    while os.getppid() == parent_pid:
+        try:
+            connection, _ = listener.accept()
+        except TimeoutError:
+            continue
+
+        sys.stdout.flush()
+        sys.stderr.flush()
+        pid = os.fork()
+        if pid != 0:
+            connection.close()
+            continue
+
+        listener.close()
+        _ = signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        _ = signal.signal(signal.SIGINT, signal.SIG_DFL)
+
+        exit_code = 1
+        try:
+            exit_code = _run_session(connection)
+        except Exception:
+            logger.exception("The session failed")
+        finally:
+            try:
+                connection.sendall(str(exit_code).encode())
+            except OSError:
+                pass
+
+            os._exit(exit_code)
+
+
+def start_session_server(socket_path: PosixPath) -> int:
+    """
+    Forks the warm session server, returns its pid
+    """
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+    listener.bind(socket_path.as_posix())
+    listener.listen()
+
+    parent_pid = os.getpid()
+    sys.stdout.flush()
+    sys.stderr.flush()
+    pid = os.fork()
+    if pid != 0:
+        listener.close()
+        return pid
+
+    try:
+        _serve_sessions(listener, parent_pid)
+    finally:
+        os._exit(0)
+
+
+def run(args: argparse.Namespace) -> int:
+    from utils import setup_logger
+
+    setup_logger(console=False)
+    warm_up()
+
+    # The socket is only reachable by the current user
+    socket_directory = PosixPath(tempfile.mkdtemp(prefix="configold-serve-"))
+    socket_path = PosixPath(socket_directory, SESSION_SOCKET_NAME)
+    session_server_pid = start_session_server(socket_path)
+
+    from textual_serve.server import Server
+
+    server = Server(
+        shlex.join([sys.executable, "-c", SESSION_CLIENT, socket_path.as_posix()]),
+        host=args.host,
+        port=args.port,
+        title="configold",
+        public_url=args.public_url,
+    )
+
+    try:
+        server.serve()
+    finally:
+        os.kill(session_server_pid, signal.SIGTERM)
+        shutil.rmtree(socket_directory, ignore_errors=True)
+
+    return 0
@@ -0,0 +1,19 @@
+import argparse
+
+
+def add_parser(
+    subparsers: "argparse._SubParsersAction[argparse.ArgumentParser]",
+) -> None:
+    parser = subparsers.add_parser(
+        "ui", help="Open the configold user interface (the default)"
+    )
+    parser.set_defaults(run=run)
+
+
+def run(args: argparse.Namespace) -> int:
+    import asyncio
+
+    from main import main as run_ui
+
+    asyncio.run(run_ui())
+    return 0
@@ -0,0 +1,347 @@
+import argparse
+import json
+import logging
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path, PosixPath
+from typing import TYPE_CHECKING, Any
+
+from .apply import EXIT_SUCCESS, EXIT_USAGE, load_config_file
+
+if TYPE_CHECKING:
+    from apps.journal import ApplyJournal
+    from apps.registry import AppDescriptor
+    from configuration import ConfigurationData
+    from configuration.incremental_render import IncrementalRenderer
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+def add_parser(
+    subparsers: "argparse._SubParsersAction[argparse.ArgumentParser]",
+) -> None:
+    parser = subparsers.add_parser(
+        "watch",
+        help="Re-render the configuration files whenever their configuration, templates or resources change",
+        description="Watch the configuration, the templates and the resources, and re-render only what a change affects. "
+        + "Every change is printed as a line of JSON",
+    )
+    _ = parser.add_argument(
+        "--config",
+        type=PosixPath,
+        default=None,
+        help="The configuration file to watch (defaults to your saved profile)",
+    )
+    _ = parser.add_argument(
+        "--apps",
+        type=lambda apps: [app.strip() for app in apps.split(",") if app.strip()],
+        help="Comma separated applications to watch (defaults to the applications in the configuration, or all of them)",
+    )
+    _ = parser.add_argument(
+        "--debounce",
+        type=float,
+        default=0.2,
+        help="How many seconds a burst of changes has to be quiet for before it is rendered",
+    )
+    _ = parser.add_argument(
+        "--poll",
+        action="store_true",
+        help="Poll for changes instead of using inotify (e.g. on network filesystems)",
+    )
+    _ = parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=1.0,
+        help="How many seconds to wait between polls",
+    )
+    parser.set_defaults(run=run)
+
+
+@dataclass
+class WatchedApp:
+    descriptor: "AppDescriptor"
+    config_class: "type[ConfigurationData]"
+    renderer: "IncrementalRenderer"
+    config_data: "ConfigurationData | None" = None
+    templates_directories: list[PosixPath] = field(default_factory=list)
+    "The user's template overrides, and the shipped templates (when they are files on the disk)"
+
+    resources_directory: PosixPath | None = None
+    "The shipped resources (when they are files on the disk)"
+
+
+def _print_event(event: dict[str, Any]) -> None:
+    # One line per event, so the output can be followed as a stream
+    _ = sys.stdout.write(json.dumps(event) + "\n")
+    sys.stdout.flush()
+
+
+def _create_watched_app(descriptor: "AppDescriptor") -> WatchedApp:
+    from configuration.incremental_render import IncrementalRenderer
+    from configuration.templates import user_templates_directory
+    from utils.resources import package_resource
+
+    config_class = descriptor.load_config_class()
+    if config_class is None:
+        raise ValueError(f"{descriptor.name} does not have a configuration")
+
+    watched_app = WatchedApp(descriptor, config_class, IncrementalRenderer())
+    watched_app.templates_directories.append(
+        user_templates_directory(config_class.CONFIG_NAME)
+    )
+
+    # Inside of the zipapp the shipped templates and resources can not change
+    shipped_templates = package_resource("apps", config_class.CONFIG_NAME, "templates")
+    if isinstance(shipped_templates, Path):
+        watched_app.templates_directories.append(PosixPath(shipped_templates))
+
+    resources = package_resource("apps", config_class.CONFIG_NAME, "resources")
+    if isinstance(resources, Path) and resources.is_dir():
+        watched_app.resources_directory = PosixPath(resources)
+
+    return watched_app
+
+
+def _load_configurations(
+    config_path: PosixPath | None, watched_apps: list[WatchedApp]
+) -> dict[str, "ConfigurationData"]:
+    from configuration.profile import ConfigurationProfile
+
+    if config_path is None:
+        # A new profile instance reads the profile file again
+        profile = ConfigurationProfile()
+        return {
+            watched_app.descriptor.name: profile.load(
+                watched_app.descriptor.name, watched_app.config_class
+            )
+            or watched_app.config_class()
+            for watched_app in watched_apps
+        }
+
+    config = load_config_file(config_path)
+    return {
+        watched_app.descriptor.name: watched_app.config_class.model_validate(
+            config.get(watched_app.descriptor.name) or {}
+        )
+        for watched_app in watched_apps
+    }
+
+
+def _classify_changes(
+    changed_paths: set[PosixPath], watched_app: WatchedApp
+) -> tuple[set[str], list[str]]:
+    """
+    The sections whose templates changed, and the resources that changed (relative to the resources directory)
+    """
+    changed_templates: set[str] = set()
+    changed_resources: list[str] = []
+
+    for changed_path in changed_paths:
+        for templates_directory in watched_app.templates_directories:
+            if changed_path.is_relative_to(templates_directory):
+                relative_path = changed_path.relative_to(templates_directory)
+                # Only the templates of the sections are named after them, the rest are picked up by reloading the templates
+                if len(relative_path.parts) == 1 and relative_path.suffix == ".j2":
+                    changed_templates.add(relative_path.stem)
+
+        resources_directory = watched_app.resources_directory
+        if resources_directory is not None and changed_path.is_relative_to(
+            resources_directory
+        ):
+            changed_resources.append(
+                changed_path.relative_to(resources_directory).as_posix()
+            )
+
+    return changed_templates, changed_resources
+
+
+def _refresh_app(
+    watched_app: WatchedApp,
+    config_data: "ConfigurationData",
+    journal: "ApplyJournal",
+    changed_templates: set[str] | None,
+    changed_resources: list[str] | None,
+) -> dict[str, Any] | None:
+    """
+    Re-renders (and writes) the configuration of an application, None if the changes did not affect it.
+    `None` changes mean that anything might have changed (the resources are copied again and every section is rendered)
+    """
+    from utils.requirements.binary_requirements import MissingBinariesError
+
+    start_time = time.perf_counter()
+    result: dict[str, Any] = {
+        "app": watched_app.descriptor.name,
+        "ok": False,
+        "sections": [],
+        "resources": [],
+        "config_status": None,
+        "error": None,
+    }
+
+    try:
+        sections, result["sections"] = watched_app.renderer.render(
+            config_data, changed_templates
+        )
+
+        prepare = changed_resources is None or not config_data.resources_deployed()
+        if not prepare:
+            result["resources"] = config_data.sync_resources(changed_resources or [])
+
+        if (
+            watched_app.config_data is not None
+            and not prepare
+            and len(result["sections"]) == 0
+            and len(result["resources"]) == 0
+        ):
+            watched_app.config_data = config_data
+            return None
+
+        configured = config_data.config(prepare=prepare, sections=sections)
+        result["ok"] = configured
+        result["config_status"] = config_data.status
+        watched_app.config_data = config_data
+
+        journal.record(
+            watched_app.descriptor.create(config_data),
+            installed=False,
+            configured=configured,
+        )
+        journal.save()
+    except MissingBinariesError as error:
+        # Missing binaries are fatal for the application, but should not stop the watch (they might be installed later)
+        watched_app.renderer.reset()
+        result["error"] = str(error)
+    except Exception as error:
+        logger.exception("Failed to render %s", watched_app.descriptor.name)
+        # The sections are rendered from scratch the next time, the failure might have left them half updated
+        watched_app.renderer.reset()
+        result["error"] = f"{type(error).__name__}: {error}"
+
+    result["duration"] = round(time.perf_counter() - start_time, 6)
+    return result
+
+
+def _refresh(
+    config_path: PosixPath | None,
+    watched_apps: list[WatchedApp],
+    journal: "ApplyJournal",
+    changed_paths: set[PosixPath] | None,
+) -> list[dict[str, Any]]:
+    import yaml
+
+    from configuration.templates import reload_templates
+
+    if changed_paths is None or any(
+        changed_path.suffix == ".j2" for changed_path in changed_paths
+    ):
+        reload_templates()
+
+    try:
+        configurations = _load_configurations(config_path, watched_apps)
+    except (OSError, ValueError, yaml.YAMLError) as error:
+        # Probably saved in the middle of an edit, the next save is rendered
+        return [{"ok": False, "error": str(error)}]
+
+    results: list[dict[str, Any]] = []
+    for watched_app in watched_apps:
+        changed_templates, changed_resources = (
+            (None, None)
+            if changed_paths is None
+            else _classify_changes(changed_paths, watched_app)
+        )
+        result = _refresh_app(
+            watched_app,
+            configurations[watched_app.descriptor.name],
+            journal,
+            changed_templates,
+            changed_resources,
+        )
+        if result is not None:
+            results.append(result)
+
+    return results
+
+
+def run(args: argparse.Namespace) -> int:
+    from apps.journal import ApplyJournal
+    from apps.registry import APPS, get_app_descriptor
+    from configuration.profile import ConfigurationProfile
+    from utils import setup_logger
+    from utils.file_watcher import FileWatcher
+
+    config_path: PosixPath = (
+        ConfigurationProfile().path if args.config is None else args.config
+    )
+
+    try:
+        if args.apps:
+            app_names: list[str] = args.apps
+        else:
+            config = load_config_file(config_path) if config_path.exists() else {}
+            app_names = (
+                list(config)
+                if config
+                else [descriptor.name for descriptor in APPS if descriptor.configurable]
+            )
+
+        watched_apps = [
+            _create_watched_app(get_app_descriptor(name)) for name in app_names
+        ]
+    except (OSError, ValueError, KeyError) as error:
+        _print_event({"ok": False, "error": str(error)})
+        return EXIT_USAGE
+
+    setup_logger(console=False)
+
+    journal = ApplyJournal()
+    # A failing first render is still watched, so it can be fixed while watching
+    _print_event(
+        {
+            "event": "rendered",
+            "apps": _refresh(args.config, watched_apps, journal, None),
+        }
+    )
+
+    watched_paths = [config_path]
+    for watched_app in watched_apps:
+        watched_paths += watched_app.templates_directories
+        if watched_app.resources_directory is not None:
+            watched_paths.append(watched_app.resources_directory)
+
+    watcher = FileWatcher(
+        watched_paths,
+        debounce=args.debounce,
+        poll_interval=args.poll_interval,
+        use_inotify=not args.poll,
+    )
+    _print_event(
+        {
+            "event": "watching",
+            "inotify": watcher.uses_inotify,
+            "paths": sorted({path.as_posix() for path in watcher.paths}),
+        }
+    )
+
+    try:
+        while True:
+            changed_paths = watcher.wait()
+            start_time = time.perf_counter()
+            results = _refresh(args.config, watched_apps, journal, changed_paths)
+
+            _print_event(
+                {
+                    "event": "changed",
+                    "paths": (
+                        None
+                        if changed_paths is None
+                        else sorted(path.as_posix() for path in changed_paths)
+                    ),
+                    "duration": round(time.perf_counter() - start_time, 6),
+                    "apps": results,
+                }
+            )
+    except KeyboardInterrupt:
+        return EXIT_SUCCESS
+    finally:
+        watcher.close()
@@ -1,5 +1,10 @@
-from .widget import ConfigurationWidget
-from .data import ConfigurationData
+from .data import ConfigStatus, ConfigurationData, ResourceDeployMode, WriteMode
 from .configuration import Configuration
 
-__all__ = ["ConfigurationWidget", "ConfigurationData", "Configuration"]
+__all__ = [
+    "ConfigStatus",
+    "ConfigurationData",
+    "Configuration",
+    "ResourceDeployMode",
+    "WriteMode",
+]
@@ -0,0 +1,208 @@
+import gzip
+import hashlib
+import json
+import logging
+import time
+from dataclasses import asdict, dataclass
+from pathlib import PosixPath
+from typing import Any
+
+from utils.atomic_write import FsyncPolicy, atomic_write
+
+INDEX_FILE_NAME: str = "index.json"
+OBJECTS_DIRECTORY_NAME: str = "objects"
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class BackupGeneration:
+    """
+    A single backup of a configuration file, its content is kept (compressed) in the store's objects by its hash
+    """
+
+    generation: int
+    "The number of the backup, every backup gets the next number"
+
+    timestamp: float
+    "When the backup was taken (seconds since the epoch)"
+
+    digest: str
+    "The sha256 of the backed up content"
+
+    size: int
+    "The size of the backed up content (uncompressed)"
+
+    source_path: str
+    "The file that was backed up"
+
+
+class BackupStore:
+    """
+    A content addressed, compressed history of backups of a single configuration file.
+    Identical content is stored once, and the index keeps the generations in order (oldest first)
+    """
+
+    def __init__(
+        self,
+        directory: PosixPath,
+        keep_last: int | None = None,
+        max_age: float | None = None,
+    ) -> None:
+        """
+        The retention: keep at most `keep_last` generations, and drop generations older than `max_age` seconds
+        (the latest generation is always kept)
+        """
+        self.directory: PosixPath = directory
+        self.keep_last: int | None = keep_last
+        self.max_age: float | None = max_age
+
+    @property
+    def index_path(self) -> PosixPath:
+        return PosixPath(self.directory, INDEX_FILE_NAME)
+
+    @property
+    def objects_directory(self) -> PosixPath:
+        return PosixPath(self.directory, OBJECTS_DIRECTORY_NAME)
+
+    def _object_path(self, digest: str) -> PosixPath:
+        return PosixPath(self.objects_directory, f"{digest}.gz")
+
+    def generations(self) -> list[BackupGeneration]:
+        """
+        The generations in the index, a corrupted index is ignored (the objects are kept, only the history is lost)
+        """
+        try:
+            with open(self.index_path, "r") as index_file:
+                raw_index: dict[str, Any] = json.load(index_file)
+
+            return [
+                BackupGeneration(**raw_generation)
+                for raw_generation in raw_index["generations"]
+            ]
+        except FileNotFoundError:
+            return []
+        except (ValueError, KeyError, TypeError):
+            logger.warning(
+                "The backup index is corrupted, starting a new one (%s)",
+                self.index_path,
+            )
+            return []
+
+    def _write_index(self, generations: list[BackupGeneration]) -> None:
+        raw_index = {"generations": [asdict(generation) for generation in generations]}
+        atomic_write(
+            self.index_path, json.dumps(raw_index, indent=2).encode(), FsyncPolicy.FILE
+        )
+
+    def get(self, generation: int = -1) -> BackupGeneration:
+        """
+        Gets a generation by its number (negative numbers count back from the latest generation).
+        The generations are consecutive, so the generation is found by its offset from the oldest one
+        """
+        generations = self.generations()
+        if len(generations) == 0:
+            raise LookupError(f"There are no backups in {self.directory}")
+
+        if generation < 0:
+            offset = generation
+            is_kept = -len(generations) <= offset
+        else:
+            # Generations older than the oldest one were pruned
+            offset = generation - generations[0].generation
+            is_kept = 0 <= offset < len(generations)
+
+        if not is_kept:
+            raise LookupError(f"There is no backup generation {generation}")
+
+        return generations[offset]
+
+    def read(self, generation: int = -1) -> bytes:
+        with open(self._object_path(self.get(generation).digest), "rb") as object_file:
+            return gzip.decompress(object_file.read())
+
+    def backup(
+        self, path: PosixPath, source_path: PosixPath | None = None
+    ) -> BackupGeneration:
+        """
+        Backs up the file, unless the latest generation already has the same content.
+        The source path is where the file is restored to (the file's own path by default)
+        """
+        with open(path, "rb") as source_file:
+            data = source_file.read()
+
+        digest = hashlib.sha256(data).hexdigest()
+        generations = self.generations()
+        if len(generations) != 0 and generations[-1].digest == digest:
+            return generations[-1]
+
+        object_path = self._object_path(digest)
+        if not object_path.exists():
+            self.objects_directory.mkdir(parents=True, exist_ok=True)
+            atomic_write(object_path, gzip.compress(data, mtime=0), FsyncPolicy.FILE)
+
+        backup_generation = BackupGeneration(
+            generation=generations[-1].generation + 1 if len(generations) != 0 else 0,
+            timestamp=time.time(),
+            digest=digest,
+            size=len(data),
+            source_path=(source_path or path).as_posix(),
+        )
+        generations.append(backup_generation)
+
+        kept_generations = self._apply_retention(generations)
+        self._write_index(kept_generations)
+        self._remove_dropped_objects(generations, kept_generations)
+        return backup_generation
+
+    def restore(
+        self,
+        generation: int = -1,
+        target_path: PosixPath | None = None,
+        fsync_policy: FsyncPolicy = FsyncPolicy.FILE,
+    ) -> BackupGeneration:
+        """
+        Restores a generation to its source path (or to the target path), the current file is backed up first
+        so the restore itself can be undone
+        """
+        backup_generation = self.get(generation)
+        data = self.read(backup_generation.generation)
+        target_path = target_path or PosixPath(backup_generation.source_path)
+
+        if target_path.exists():
+            _ = self.backup(target_path)
+
+        target_path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write(target_path, data, fsync_policy)
+        return backup_generation
+
+    def _apply_retention(
+        self, generations: list[BackupGeneration]
+    ) -> list[BackupGeneration]:
+        if self.keep_last is not None:
+            generations = generations[-max(self.keep_last, 1) :]
+
+        if self.max_age is not None:
+            oldest_timestamp = time.time() - self.max_age
+            generations = [
+                generation
+                for generation in generations[:-1]
+                if generation.timestamp >= oldest_timestamp
+            ] + generations[-1:]
+
+        return generations
+
+    def _remove_dropped_objects(
+        self,
+        generations: list[BackupGeneration],
+        kept_generations: list[BackupGeneration],
+    ) -> None:
+        """
+        Removes the objects only the dropped generations referenced. Objects the index does not know about
+        (left by a corrupted index) are never removed
+        """
+        kept_digests = {generation.digest for generation in kept_generations}
+
+        for generation in generations:
+            if generation.digest not in kept_digests:
+                self._object_path(generation.digest).unlink(missing_ok=True)
@@ -1,17 +1,51 @@
-from configuration import ConfigurationData, ConfigurationWidget
+import importlib
+from typing import TYPE_CHECKING
+
+from configuration.data import ConfigurationData
+
+if TYPE_CHECKING:
+    from configuration.widget import ConfigurationWidget
 
 
 class Configuration:
     def __init__(
-        self, config_data: ConfigurationData, widget: ConfigurationWidget | None = None
+        self,
+        config_data: ConfigurationData,
+        widget: "ConfigurationWidget | str | None" = None,
     ) -> None:
+        """
+        The widget can be given as the import path of its class (`module:Class`),
+        so the UI (and textual) is only imported when the widget is actually needed
+        """
         self.config_data: ConfigurationData = config_data
-        self.widget: ConfigurationWidget | None = widget
+        self._widget: "ConfigurationWidget | str | None" = widget
 
-        if self.widget is None:
+        if self._widget is None or isinstance(self._widget, str):
             return
 
-        self.widget.config = self.config_data
+        self._widget.config = self.config_data
+
+    def load_widget_class(self) -> "type[ConfigurationWidget] | None":
+        """
+        Imports the class of the widget without creating it (used to warm up the UI's imports ahead of time)
+        """
+        if self._widget is None:
+            return None
+
+        if not isinstance(self._widget, str):
+            return type(self._widget)
+
+        module_path, class_name = self._widget.split(":")
+        return getattr(importlib.import_module(module_path), class_name)
+
+    @property
+    def widget(self) -> "ConfigurationWidget | None":
+        if isinstance(self._widget, str):
+            widget_class = self.load_widget_class()
+            self._widget = widget_class()  # pyright: ignore[reportOptionalCall]
+            self._widget.config = self.config_data
+
+        return self._widget
 
-    def config(self) -> bool:
-        return self.config_data.config()
+    def config(self, prepare: bool = True) -> bool:
+        return self.config_data.config(prepare)
@@ -1,19 +1,70 @@
 from dataclasses import make_dataclass
+from enum import StrEnum
+from functools import cache
+import hashlib
+import importlib
+import io
+import json
+from importlib.resources.abc import Traversable
 import logging
 import os
-from pathlib import PosixPath
-from pprint import pformat
 import shutil
-from typing import Any, ClassVar, Self, override
-from pydantic import BaseModel, ConfigDict, Field, SkipValidation
+from collections.abc import Iterable
+from pathlib import Path, PosixPath
+from pprint import pformat
+from typing import TYPE_CHECKING, Any, ClassVar, Self, TextIO, override
+import pydantic
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr
 
 import warnings
 
 from pydantic.json_schema import PydanticJsonSchemaWarning
 
+from configuration.backup import BackupStore
+from configuration.managed_regions import merge_regions, render_regions
+from configuration.templates import template_environment, templates_version
+from utils.atomic_write import FsyncPolicy, atomic_write
+from utils.cache import cache_directory, module_source_hash, write_cache_file
+from utils.profile_links import is_linked
+from utils.resource_pack import ResourcePack, shipped_resource_pack, sync_resource_pack
+from utils.resource_sync import (
+    ResourceSelection,
+    link_resource_tree,
+    sync_resource_tree,
+    unlink_resource_tree,
+)
+from utils.resources import copy_resource_file, package_resource, resource_tree_version
+
+if TYPE_CHECKING:
+    from configuration.rc_import import RcImport
+
 warnings.filterwarnings("ignore", category=PydanticJsonSchemaWarning)
 
 
+class ConfigStatus(StrEnum):
+    WRITTEN = "written"
+    "The configuration file was (re)written"
+
+    UNCHANGED = "unchanged"
+    "The configuration file already had the rendered content, so nothing was written"
+
+
+class WriteMode(StrEnum):
+    OVERWRITE = "overwrite"
+    "The configuration file is replaced, anything that was written by hand is dropped (it is kept in the backups)"
+
+    MERGE = "merge"
+    "Only the regions of the configuration file that configold manages are replaced, everything else is kept"
+
+
+class ResourceDeployMode(StrEnum):
+    COPY = "copy"
+    "Every user gets a copy of the resources (only the changed files are copied again)"
+
+    LINK = "link"
+    "The resources are links into a shared read-only resource tree, only the resources the applications write to are real directories"
+
+
 class ConfigurationData(BaseModel):
     """
     Holds the data of the configuration
@@ -21,23 +72,189 @@ class ConfigurationData(BaseModel):
 
     CONFIG_NAME: ClassVar[str] = ""
     CONFIG_FILE_NAME: ClassVar[str] = ""
+    COMMENT_PREFIX: ClassVar[str] = "#"
+    "How a line comment starts in the configuration file, the managed regions are marked by comments"
+    RENDERER_MODULES: ClassVar[tuple[str, ...]] = ()
+    "Extra modules the rendering relies on, a change to their code changes the fingerprint of the configuration"
+    CONFIG_FILE_IMPORTER: ClassVar[str | None] = None
+    "The module that imports existing configuration files (with an `import_config_file` function), None if it is not supported"
+    MUTABLE_RESOURCES: ClassVar[tuple[str, ...]] = ()
+    "The resources the application writes to (relative to the resources), they are real directories even when the resources are linked"
 
     model_config = ConfigDict(use_attribute_docstrings=True)
     backup_directory_path: PosixPath = Field(
         default_factory=lambda: PosixPath(os.getenv("HOME", "~"), ".local", "backups")
     )
+    backup_keep_last: int | None = Field(default=20)
+    "How many backups of the configuration file are kept (all of them if empty)"
+    backup_max_age_days: float | None = Field(default=None)
+    "How many days the backups of the configuration file are kept for (forever if empty)"
+    write_mode: WriteMode = Field(default=WriteMode.OVERWRITE)
+    "Whether the configuration file is replaced, or only the regions configold manages in it"
+    fsync_policy: FsyncPolicy = Field(default=FsyncPolicy.FILE)
+    "How much the configuration file is flushed to the disk when it is written"
+    resource_deploy_mode: ResourceDeployMode = Field(default=ResourceDeployMode.COPY)
+    "Whether the resources are copied for you, or linked to a shared resource tree (e.g. one copy for all of the users of a host)"
+    shared_resources_path: PosixPath | None = Field(default=None)
+    "The shared resource tree the resources are linked to (defaults to the shipped resources, when they are not inside of the zipapp)"
     logger: Any = logging.Logger("")
 
-    descriptions: SkipValidation[Self] = {}  # pyright: ignore[reportAssignmentType]
+    _home: PosixPath | None = PrivateAttr(default=None)
+    _config_directory: PosixPath | None = PrivateAttr(default=None)
+    _status: ConfigStatus | None = PrivateAttr(default=None)
 
     @property
-    def resources_path(self) -> PosixPath:
-        return PosixPath(
-            os.getcwd(), "apps", type(self).CONFIG_NAME, "resources"
-        ).resolve()
+    def resources_path(self) -> Traversable:
+        return package_resource("apps", type(self).CONFIG_NAME, "resources")
+
+    @property
+    def resource_pack(self) -> ResourcePack | None:
+        """
+        The packed resources shipped with the configuration (in the zipapp), None if they are shipped as a directory
+        """
+        return shipped_resource_pack(type(self).CONFIG_NAME)
+
+    @property
+    def resources_version(self) -> str | None:
+        """
+        The version of the resources shipped with the configuration (None if it does not have resources)
+        """
+        resource_pack = self.resource_pack
+        if resource_pack is not None:
+            return resource_pack.version
+
+        if not self.resources_path.is_dir():
+            return None
+
+        return resource_tree_version(self.resources_path)
+
+    def resources_deployed(self) -> bool:
+        """
+        Whether the resources the configuration file relies on are in place
+        """
+        return True
+
+    @property
+    def deployed_resources_path(self) -> PosixPath | None:
+        """
+        Where the resources are copied to (None if the configuration does not copy its resources)
+        """
+        return None
+
+    @property
+    def linked_resources_path(self) -> PosixPath | None:
+        """
+        The resource tree the resources are linked to, None if they can not be linked (the shipped resources are inside of the zipapp)
+        """
+        if self.shared_resources_path is not None:
+            return PosixPath(os.path.abspath(self.shared_resources_path))
+
+        if isinstance(self.resources_path, Path):
+            return PosixPath(os.path.abspath(self.resources_path))
+
+        return None
+
+    def resource_selection(self) -> ResourceSelection | None:
+        """
+        The resources the configuration uses, None if all of them are deployed
+        """
+        return None
+
+    def deploy_resources(self) -> None:
+        """
+        Deploys the resources to where the configuration file expects them, by copying only what changed or by linking them
+        """
+        target_directory = self.deployed_resources_path
+        if target_directory is None:
+            return
+
+        linked_resources_path = self.linked_resources_path
+        if self.resource_deploy_mode == ResourceDeployMode.LINK:
+            if linked_resources_path is None:
+                self.logger.warning(
+                    "The shipped resources are inside of the zipapp and can not be linked, set `shared_resources_path` to link them. "
+                    + "Copying them instead"
+                )
+            elif not linked_resources_path.is_dir():
+                # Checked before anything is linked, the deployed copy is kept
+                self.logger.warning(
+                    f"The shared resources ([{linked_resources_path}]) do not exist and can not be linked. Copying them instead"
+                )
+            else:
+                link_result = link_resource_tree(
+                    linked_resources_path,
+                    target_directory,
+                    type(self).MUTABLE_RESOURCES,
+                )
+                self.logger.debug(
+                    f"Linked the resources ([{target_directory}] to [{linked_resources_path}], {len(link_result.linked)} linked, "
+                    + f"{len(link_result.copied)} copied, {len(link_result.deleted)} deleted)"
+                )
+                return
+
+        if linked_resources_path is not None:
+            unlink_resource_tree(linked_resources_path, target_directory)
+
+        resource_pack = self.resource_pack
+        if resource_pack is not None:
+            sync_result = sync_resource_pack(
+                resource_pack, target_directory, selection=self.resource_selection()
+            )
+        else:
+            sync_result = sync_resource_tree(
+                self.resources_path,
+                target_directory,
+                selection=self.resource_selection(),
+            )
+        self.logger.debug(
+            f"Synced the resources ([{target_directory}], {len(sync_result.copied)} copied, "
+            + f"{len(sync_result.deleted)} deleted, {sync_result.unchanged} unchanged)"
+        )
+
+    def sync_resources(self, relative_paths: Iterable[str]) -> list[str]:
+        """
+        Copies the given resources (relative to the resources directory) to where they are deployed, and removes the ones
+        that no longer exist. Returns the resources that were synced
+        """
+        target_directory = self.deployed_resources_path
+        if target_directory is None or not self.resources_deployed():
+            return []
+
+        if self.resource_deploy_mode == ResourceDeployMode.LINK:
+            # The links already lead to the changed resources
+            return []
+
+        selection = self.resource_selection()
+        synced_paths: list[str] = []
+        for relative_path in sorted(set(relative_paths)):
+            if selection is not None and not selection.includes(relative_path):
+                continue
+
+            source = self.resources_path.joinpath(*relative_path.split("/"))
+            target_path = PosixPath(target_directory, relative_path)
+
+            if source.is_file():
+                target_path.parent.mkdir(parents=True, exist_ok=True)
+                copy_resource_file(source, target_path)
+            elif source.is_dir():
+                # New directories are synced by their files
+                continue
+            elif target_path.is_dir() and not target_path.is_symlink():
+                shutil.rmtree(target_path)
+            elif target_path.is_symlink() or target_path.exists():
+                target_path.unlink()
+            else:
+                continue
+
+            synced_paths.append(relative_path)
+
+        return synced_paths
 
     @property
     def home_path(self):
+        if self._home is not None:
+            return self._home.as_posix()
+
         home_path = os.getenv("HOME")
         if home_path is None:
             home_path = "~"
@@ -45,7 +262,129 @@ class ConfigurationData(BaseModel):
 
     @property
     def config_path(self) -> PosixPath:
-        return PosixPath(self.home_path, type(self).CONFIG_FILE_NAME)
+        return PosixPath(
+            self._config_directory or self.home_path, type(self).CONFIG_FILE_NAME
+        )
+
+    def config_file_companions(self) -> list[PosixPath]:
+        """
+        Files next to the configuration file that are derived from it (e.g. a compiled version of it),
+        profiles link them through the active profile along with the configuration file
+        """
+        return []
+
+    @property
+    def is_linked_to_profile(self) -> bool:
+        """
+        Whether the configuration file is a link through the active profile (building a profile links it)
+        """
+        try:
+            relative_path = self.config_path.relative_to(self.home_path).as_posix()
+        except ValueError:
+            return False
+
+        return is_linked(self.config_path, relative_path)
+
+    @property
+    def status(self) -> ConfigStatus | None:
+        """
+        What the last `config` did to the configuration file (None if it was not configured yet)
+        """
+        return self._status
+
+    @property
+    def descriptions(self) -> Self:
+        """
+        The descriptions of the properties of the model, accessed by the names of the properties (with type hinting).
+        NOTE: The types of the properties themselves in the descriptions property should be ignored, they are all strings
+        """
+        return type(self)._descriptions()
+
+    @classmethod
+    @cache
+    def _descriptions(cls) -> Self:
+        """
+        This ugly thing is because we want to have access to the descriptions of the properties of the model, and have type hinting on that, so we create a dynamic dataclass type and instantiate it.
+        The descriptions are taken from the attribute docstrings of the model's fields, and are only computed once per class.
+
+        The type hinting system does not like this...
+        """
+        descriptions_class: type = make_dataclass(
+            f"{cls.__name__}Descriptions",
+            ((field_name, str) for field_name in cls.model_fields),
+            frozen=True,
+        )
+        return descriptions_class(
+            **{
+                field_name: field_info.description
+                for field_name, field_info in cls.model_fields.items()
+            }
+        )
+
+    @classmethod
+    @cache
+    def config_schema(cls) -> dict[str, Any]:  # pyright: ignore[reportExplicitAny]
+        """
+        The JSON schema of the configuration, computed once per class.
+        The schema is persisted in the cache directory keyed by the hash of the model's source, so following runs skip generating it
+        """
+        schema_cache_path = cls._schema_cache_path()
+
+        if schema_cache_path is not None and schema_cache_path.exists():
+            try:
+                return json.loads(schema_cache_path.read_bytes())
+            except (OSError, ValueError):
+                pass
+
+        schema = cls.model_json_schema()
+
+        if schema_cache_path is not None:
+            write_cache_file(schema_cache_path, json.dumps(schema).encode())
+
+        return schema
+
+    @classmethod
+    def model_source_hash(cls, *extra_modules: str) -> str | None:
+        """
+        A hash of the source of the model (and of the models it extends), used to invalidate the caches of the model
+        """
+        return module_source_hash(
+            *(
+                klass.__module__
+                for klass in cls.__mro__
+                if issubclass(klass, ConfigurationData)
+            ),
+            *extra_modules,
+        )
+
+    @classmethod
+    def _schema_cache_path(cls) -> PosixPath | None:
+        schema_cache_directory = cache_directory("schemas")
+        if schema_cache_directory is None:
+            return None
+
+        source_hash = cls.model_source_hash()
+        if source_hash is None:
+            return None
+
+        return PosixPath(
+            schema_cache_directory,
+            f"{cls.__name__}-{pydantic.VERSION}-{source_hash[:16]}.json",
+        )
+
+    @classmethod
+    def import_config_file(cls, source: bytes) -> "RcImport":
+        """
+        Imports an existing (hand written) configuration file into the raw fields of the configuration
+        """
+        if cls.CONFIG_FILE_IMPORTER is None:
+            raise NotImplementedError(
+                f"Importing {cls.CONFIG_FILE_NAME or cls.__name__} files is not supported"
+            )
+
+        return importlib.import_module(cls.CONFIG_FILE_IMPORTER).import_config_file(
+            source
+        )
 
     @override
     def model_post_init(self, context: Any, /) -> None:
@@ -55,66 +394,277 @@ class ConfigurationData(BaseModel):
             f"{__name__}.{type(self).__name__}"
         )
 
+    def with_home(self, home: PosixPath) -> Self:
         """
-        This ugly thing is because we want to have access to the descriptions of the properties of the model, and have type hinting on that, so we create a dynamic dataclass type and instantiate it.
-        We basically convert all of the model to json and extract only the description to set it in the description dict which is marked as Self to allow type hinting with the names
-        of the properties
-        NOTE: The types of the properties themselves in the descriptions property should be ignored, they are all strings
-
-        I should create a better way for this, but for now this is it.
-        The type hinting system does not like this...
+        Creates a copy of the configuration for another home directory (used to render the configuration for other users).
+        The paths that are inside of the current home directory are moved to the new home directory
         """
-        schema_defs: dict[str, dict[str, Any]] = self.model_json_schema().get("$defs")  # pyright: ignore[reportAssignmentType,reportExplicitAny]
-        data_key: str = list(schema_defs.keys())[0]
-        properties: dict[str, dict[str, str]] = schema_defs.get(data_key, {}).get(
-            "properties"
-        )  # pyright: ignore[reportAssignmentType]
-
-        descriptions_class: type = make_dataclass(
-            "descriptions",
-            ((property_name, str) for property_name in properties),
+        configuration = self.model_copy(
+            update={
+                field_name: self._rebase_path(field_value, self.home_path, home)
+                for field_name, field_value in self
+                if isinstance(field_value, PosixPath)
+            }
         )
-        self.descriptions = descriptions_class(
-            **{
-                property_name: property_value.get("description")
-                for property_name, property_value in properties.items()
+        configuration._home = home
+        return configuration
+
+    def in_profile(self, directory: PosixPath) -> Self:
+        """
+        Creates a copy of the configuration that is rendered into a profile's directory (which mirrors the home directory).
+        The configuration file and the paths that are inside of the home directory (e.g. the deployed resources) are moved
+        into the profile's directory, so every profile has its own. The backups and the installed programs stay in place
+        """
+        configuration = self.model_copy(
+            update={
+                field_name: self._rebase_path(field_value, self.home_path, directory)
+                for field_name, field_value in self
+                if isinstance(field_value, PosixPath)
+                and field_name != "backup_directory_path"
             }
         )
+        configuration._config_directory = directory
+        return configuration
 
-    def _config(self) -> bool:
+    @staticmethod
+    def _rebase_path(
+        path: PosixPath, source_home: str | PosixPath, target_home: str | PosixPath
+    ) -> PosixPath:
+        """
+        Moves a path that is inside of the source home directory to the target home directory
+        """
+        try:
+            return PosixPath(target_home, path.relative_to(source_home))
+        except ValueError:
+            return path
+
+    def _sections(self) -> list[str]:
+        """
+        The names of the sections of the configuration file in order (each becomes a managed region),
+        every section is rendered from its own template (`<config name>/<section name>.j2`)
+        """
         raise NotImplementedError
 
-    def _backup_config(self) -> None:
-        self.backup_directory_path.mkdir(parents=True, exist_ok=True)
+    def section_names(self) -> list[str]:
+        return self._sections()
+
+    def _template_context(self) -> dict[str, Any]:  # pyright: ignore[reportExplicitAny]
+        """
+        The variables the templates are rendered with, the fields of the configuration (and the configuration itself)
+        """
+        return {**dict(self), "config": self}
+
+    def template_inputs(self) -> dict[str, Any]:  # pyright: ignore[reportExplicitAny]
+        """
+        The variables the templates are rendered with in a comparable form (the fields as JSON), so two versions of the
+        configuration can be compared variable by variable. The configuration itself and the logger are left out
+        """
+        fields = self.model_dump(mode="json", exclude={"logger"})
+        return {
+            name: fields.get(name, value)
+            for name, value in self._template_context().items()
+            if name not in ("config", "logger")
+        }
+
+    def render_sections(self, names: list[str] | None = None) -> list[tuple[str, str]]:
+        """
+        Renders the sections of the configuration file (or only the given ones) into `(name, content)` pairs
+        """
+        environment = template_environment()
+        # The context is shared by all of the sections, instead of being copied for every template
+        context = {**environment.globals, **self._template_context()}
+
+        rendered_sections: list[tuple[str, str]] = []
+        for name in self._sections() if names is None else names:
+            template = environment.get_template(f"{type(self).CONFIG_NAME}/{name}.j2")
+            try:
+                content = (
+                    environment.concat(  # pyright: ignore[reportUnknownMemberType]
+                        template.root_render_func(
+                            template.new_context(context, shared=True)
+                        )
+                    )
+                )
+            except Exception:
+                # Like `Template.render`, the error is raised with the template's lines in its traceback
+                environment.handle_exception()
+
+            rendered_sections.append((name, content))
+
+        return rendered_sections
 
-        target_backup_directory_path = PosixPath(
-            self.backup_directory_path, type(self).CONFIG_NAME
+    def _render(
+        self, config_file: TextIO, sections: list[tuple[str, str]] | None = None
+    ) -> None:
+        _ = config_file.write(
+            render_regions(
+                type(self).COMMENT_PREFIX,
+                self.render_sections() if sections is None else sections,
+            ).decode()
         )
 
-        self.logger.debug(
-            "backup path: %s, config_path: %s",
-            target_backup_directory_path,
-            self.config_path,
+    def render(self, sections: list[tuple[str, str]] | None = None) -> str:
+        """
+        Renders the content of the configuration file (from the sections, if they were already rendered), without touching the disk
+        """
+        config_file = io.StringIO()
+        self._render(config_file, sections)
+        return config_file.getvalue()
+
+    def render_config_file(self, sections: list[tuple[str, str]] | None = None) -> str:
+        """
+        Renders the content the configuration file should have, depending on the write mode
+        (in merge mode the managed regions are patched into the current file)
+        """
+        if self.write_mode != WriteMode.MERGE:
+            return self.render(sections)
+
+        try:
+            with open(self.config_path, "rb") as config_file:
+                existing = config_file.read()
+        except FileNotFoundError:
+            return self.render(sections)
+
+        return merge_regions(
+            type(self).COMMENT_PREFIX,
+            existing,
+            self.render_sections() if sections is None else sections,
+        ).decode()
+
+    def fingerprint(self) -> str:
+        """
+        A hash of everything the rendered configuration file depends on: the configuration itself, where it is written
+        and the code and the templates that render it
+        """
+        raw_fingerprint = {
+            "class": f"{type(self).__module__}.{type(self).__qualname__}",
+            "config_path": self.config_path.as_posix(),
+            "code": module_source_hash(
+                __name__, type(self).__module__, *type(self).RENDERER_MODULES
+            ),
+            "templates": templates_version(type(self).CONFIG_NAME),
+            "data": self.model_dump(mode="json", exclude={"logger"}),
+        }
+        return hashlib.sha256(
+            json.dumps(raw_fingerprint, sort_keys=True).encode()
+        ).hexdigest()
+
+    def config_file_digest(self) -> str | None:
+        """
+        The sha256 of the configuration file on the disk (None if it does not exist)
+        """
+        try:
+            with open(self.config_path, "rb") as config_file:
+                return hashlib.file_digest(config_file, "sha256").hexdigest()
+        except OSError:
+            return None
+
+    def is_config_unchanged(self, content: str) -> bool:
+        """
+        Whether the configuration file already has the content (compared by size, then by hash)
+        """
+        data = content.encode()
+
+        try:
+            if self.config_path.stat().st_size != len(data):
+                return False
+
+            with open(self.config_path, "rb") as config_file:
+                file_hash = hashlib.file_digest(config_file, "sha256")
+        except OSError:
+            return False
+
+        return file_hash.digest() == hashlib.sha256(data).digest()
+
+    def write_config(self, content: str) -> None:
+        """
+        Replaces the configuration file with the content, atomically (the file is either the old or the new one)
+        """
+        self.config_path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write(self.config_path, content.encode(), self.fsync_policy)
+
+    def _config(self) -> bool:
+        """
+        Prepares everything the configuration file relies on (e.g. resources), before the file itself is written
+        """
+        return True
+
+    def prepare(self) -> bool:
+        """
+        Prepares everything the configuration file relies on, without writing the configuration file itself
+        """
+        return self._config()
+
+    def publish(self) -> bool:
+        """
+        Publishes what is derived from the written configuration file (e.g. compiled files, or the state running
+        applications reload), after the file is written
+        """
+        return True
+
+    @property
+    def backup_store(self) -> BackupStore:
+        return BackupStore(
+            PosixPath(self.backup_directory_path, type(self).CONFIG_NAME),
+            keep_last=self.backup_keep_last,
+            max_age=(
+                None
+                if self.backup_max_age_days is None
+                else self.backup_max_age_days * 24 * 60 * 60
+            ),
         )
 
-        target_backup_directory_path.mkdir(parents=True, exist_ok=True)
+    def backup_config(self) -> None:
+        """
+        Keeps the current configuration file as a new generation in the backup store
+        """
+        backup_store = self.backup_store
 
-        _ = shutil.copy(
-            self.config_path,
-            target_backup_directory_path,
+        # Older versions kept a single copy of the configuration file next to the store, it becomes the first generation
+        legacy_backup_path = PosixPath(
+            backup_store.directory, type(self).CONFIG_FILE_NAME
         )
+        if legacy_backup_path.is_file() and len(backup_store.generations()) == 0:
+            _ = backup_store.backup(legacy_backup_path, source_path=self.config_path)
+            legacy_backup_path.unlink()
+
+        backup_generation = backup_store.backup(self.config_path)
         self.logger.debug(
-            f"Backed up the config ([{self.config_path}] to [{self.backup_directory_path}])"
+            f"Backed up the config ([{self.config_path}] to [{backup_store.directory}], generation {backup_generation.generation})"
         )
 
-    def config(self) -> bool:
+    def config(
+        self, prepare: bool = True, sections: list[tuple[str, str]] | None = None
+    ) -> bool:
+        """
+        Writes the configuration file, `prepare` can be turned off when the resources are known to be in place already.
+        The sections can be given when they were already rendered (e.g. by an `IncrementalRenderer`)
+        """
         self.logger.debug("Configuration: %s", pformat(dict(self)))
 
+        # Writing through the link would replace the active profile's pre-rendered file
+        if self.is_linked_to_profile:
+            self.logger.error(
+                f"The configuration file is linked to the active profile ({self.config_path}), build the profile to change it (or deactivate the profile with `profile deactivate`)"
+            )
+            return False
+
+        # Rendering first, so a failing render leaves the current configuration file untouched
+        content = self.render_config_file(sections)
+
+        if self.is_config_unchanged(content):
+            self.logger.debug(f"Configuration file is unchanged ({self.config_path})")
+            self._status = ConfigStatus.UNCHANGED
+            return (not prepare or self._config()) and self.publish()
+
         if self.config_path.exists():
             self.logger.debug(f"Configuration file exists ({self.config_path})")
-            self._backup_config()
+            self.backup_config()
 
-            self.config_path.unlink()
-            self.logger.debug(f"Removed config file ({self.config_path})")
+        if prepare and not self._config():
+            return False
 
-        return self._config()
+        self.write_config(content)
+        self._status = ConfigStatus.WRITTEN
+        self.logger.debug(f"Wrote config file ({self.config_path})")
+        return self.publish()
@@ -0,0 +1,151 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import PosixPath
+from typing import Any
+
+from apps.registry import get_app_descriptor
+from configuration.data import ConfigStatus, ConfigurationData
+from utils.requirements.binary_requirements import MissingBinariesError
+
+
+@dataclass(frozen=True)
+class FleetProfile:
+    """
+    A single user to render the configuration files for
+    """
+
+    name: str
+    "The name of the user (only used for reporting)"
+
+    home: PosixPath
+    "The directory the configuration files are rendered into (the user's home directory)"
+
+    overrides: dict[str, dict[str, Any]] = field(default_factory=dict)
+    """
+    Per application configuration that is merged over the base configuration, keyed by the application's name.
+    Mappings (e.g. the aliases) are merged key by key, any other field (including lists) is replaced as a whole
+    """
+
+
+# The state of each worker process, the base configuration is validated once per worker and reused for every profile
+_base_raw_configs: dict[str, dict[str, Any]] = {}
+_base_configurations: dict[str, ConfigurationData] = {}
+_backup: bool = True
+
+
+def initialize_worker(
+    base_raw_configs: dict[str, dict[str, Any]], backup: bool = True
+) -> None:
+    """
+    Loads the applications' models and validates the base configuration (in the current process)
+    """
+    global _backup
+
+    _base_raw_configs.clear()
+    _base_configurations.clear()
+    _backup = backup
+
+    for app_name, raw_config in base_raw_configs.items():
+        config_class = get_app_descriptor(app_name).load_config_class()
+        if config_class is None:
+            raise ValueError(f"{app_name} does not have a configuration")
+
+        _base_raw_configs[app_name] = raw_config
+        _base_configurations[app_name] = config_class.model_validate(raw_config)
+
+
+def merge_override(base: dict[str, Any], override: dict[str, Any]) -> dict[str, Any]:
+    """
+    Merges the override over the base configuration, mappings that are in both are merged recursively
+    """
+    merged = dict(base)
+    for key, value in override.items():
+        base_value = merged.get(key)
+        if isinstance(base_value, dict) and isinstance(value, dict):
+            merged[key] = merge_override(base_value, value)
+        else:
+            merged[key] = value
+
+    return merged
+
+
+def _profile_configuration(profile: FleetProfile, app_name: str) -> ConfigurationData:
+    base_configuration = _base_configurations[app_name]
+    override = profile.overrides.get(app_name)
+    if not override:
+        return base_configuration.with_home(profile.home)
+
+    return (
+        type(base_configuration)
+        .model_validate(merge_override(_base_raw_configs[app_name], override))
+        .with_home(profile.home)
+    )
+
+
+def render_profile(profile: FleetProfile) -> dict[str, Any]:
+    """
+    Renders (and writes) the configuration files of a single profile, the worker must be initialized beforehand.
+    Existing configuration files are backed up (into the profile's home directory) before they are replaced
+    """
+    result: dict[str, Any] = {
+        "profile": profile.name,
+        "ok": False,
+        "files": [],
+        "error": None,
+    }
+    start_time = time.perf_counter()
+
+    try:
+        for app_name in _base_configurations:
+            configuration = _profile_configuration(profile, app_name)
+            content = configuration.render_config_file()
+
+            status = ConfigStatus.UNCHANGED
+            if not configuration.is_config_unchanged(content):
+                if _backup and configuration.config_path.exists():
+                    configuration.backup_config()
+
+                configuration.write_config(content)
+                status = ConfigStatus.WRITTEN
+
+            result["files"].append(
+                {"path": configuration.config_path.as_posix(), "status": status}
+            )
+
+        result["ok"] = True
+    except MissingBinariesError as error:
+        # Missing binaries are fatal for the profile, but should not stop the other profiles
+        result["error"] = str(error)
+    except Exception as error:
+        result["error"] = f"{type(error).__name__}: {error}"
+
+    result["duration"] = round(time.perf_counter() - start_time, 6)
+    return result
+
+
+def render_fleet(
+    base_raw_configs: dict[str, dict[str, Any]],
+    profiles: list[FleetProfile],
+    jobs: int | None = None,
+    backup: bool = True,
+) -> list[dict[str, Any]]:
+    """
+    Renders the configuration files of many profiles from a shared base configuration, across a pool of processes.
+    With a single job the profiles are rendered in the current process
+    """
+    jobs = jobs or os.cpu_count() or 1
+
+    if jobs == 1 or len(profiles) <= 1:
+        initialize_worker(base_raw_configs, backup)
+        return [render_profile(profile) for profile in profiles]
+
+    # Big chunks keep the inter process communication cheap, while still leaving some room for balancing
+    chunksize = max(1, len(profiles) // (jobs * 4))
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=initialize_worker,
+        initargs=(base_raw_configs, backup),
+    ) as executor:
+        return list(executor.map(render_profile, profiles, chunksize=chunksize))
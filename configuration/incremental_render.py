@@ -0,0 +1,99 @@
+from typing import Any
+
+from configuration.data import ConfigurationData
+from configuration.templates import template_variables
+
+_MISSING: object = object()
+
+
+class IncrementalRenderer:
+    """
+    Keeps the last rendered sections of a configuration, so a new version of the configuration (or of its templates)
+    only re-renders the sections whose variables changed
+    """
+
+    def __init__(self) -> None:
+        self._inputs: dict[str, Any] | None = None  # pyright: ignore[reportExplicitAny]
+        self._sections: dict[str, str] = {}
+
+    def reset(self) -> None:
+        """
+        Forgets the rendered sections, so the next render renders everything
+        """
+        self._inputs = None
+        self._sections = {}
+
+    def _changed_variables(
+        self, inputs: dict[str, Any]  # pyright: ignore[reportExplicitAny]
+    ) -> set[str] | None:
+        if self._inputs is None:
+            return None
+
+        changed_variables = {
+            name
+            for name in inputs.keys() | self._inputs.keys()
+            if inputs.get(name, _MISSING) != self._inputs.get(name, _MISSING)
+        }
+        if len(changed_variables) != 0:
+            # The templates can reach every field through the configuration itself
+            changed_variables.add("config")
+
+        return changed_variables
+
+    def _is_affected(
+        self,
+        template_name: str,
+        changed_variables: set[str],
+        changed_templates: set[str],
+    ) -> bool:
+        variables = template_variables(template_name)
+        if variables is None:
+            return len(changed_variables) != 0 or len(changed_templates) != 0
+
+        return not variables.isdisjoint(changed_variables)
+
+    def render(
+        self,
+        config_data: ConfigurationData,
+        changed_templates: set[str] | None = None,
+    ) -> tuple[list[tuple[str, str]], list[str]]:
+        """
+        Renders the sections of the configuration, reusing the sections that are not affected by the changes.
+        `changed_templates` are the names of the sections whose templates changed (None if any template might have changed).
+        Returns all of the sections, and the names of the sections whose content changed
+        """
+        inputs = config_data.template_inputs()
+        changed_variables = self._changed_variables(inputs)
+
+        section_names = config_data.section_names()
+        stale_names = [
+            name
+            for name in section_names
+            if changed_variables is None
+            or changed_templates is None
+            or name not in self._sections
+            or name in changed_templates
+            or self._is_affected(
+                f"{type(config_data).CONFIG_NAME}/{name}.j2",
+                changed_variables,
+                changed_templates,
+            )
+        ]
+
+        rendered_sections = dict(config_data.render_sections(stale_names))
+        changed_names = [
+            name
+            for name, content in rendered_sections.items()
+            if self._sections.get(name) != content
+        ]
+        if set(self._sections) != set(section_names):
+            # A removed section changes the configuration file as well
+            changed_names += sorted(set(self._sections) - set(section_names))
+
+        self._sections = {
+            name: rendered_sections.get(name, self._sections.get(name, ""))
+            for name in section_names
+        }
+        self._inputs = inputs
+
+        return list(self._sections.items()), changed_names
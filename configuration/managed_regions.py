@@ -0,0 +1,254 @@
+import re
+from dataclasses import dataclass
+
+INDEX_MARKER: str = "configold-index:"
+OFFSET_WIDTH: int = 10
+"The offsets in the index have a fixed width, so the length of the header does not depend on the offsets"
+
+
+@dataclass(frozen=True)
+class ManagedRegion:
+    """
+    A region of a configuration file that is owned by configold (including its begin and end markers)
+    """
+
+    name: str
+    start: int
+    "The byte offset of the region's begin marker"
+
+    end: int
+    "The byte offset right after the region's end marker"
+
+
+def begin_marker(comment_prefix: str, name: str) -> bytes:
+    return f"{comment_prefix} >>> configold {name} >>>\n".encode()
+
+
+def end_marker(comment_prefix: str, name: str) -> bytes:
+    return f"{comment_prefix} <<< configold {name} <<<\n".encode()
+
+
+def _index_prefix(comment_prefix: str) -> bytes:
+    return f"{comment_prefix} {INDEX_MARKER}".encode()
+
+
+def _header(comment_prefix: str, regions: list[ManagedRegion]) -> bytes:
+    entries = " ".join(
+        f"{region.name}={region.start:0{OFFSET_WIDTH}d}+{region.end - region.start:0{OFFSET_WIDTH}d}"
+        for region in regions
+    )
+    return _index_prefix(comment_prefix) + f" {entries}\n".encode()
+
+
+def _split_header(comment_prefix: str, data: bytes) -> tuple[bytes, bytes]:
+    """
+    Splits the index header (if there is one) from the rest of the file
+    """
+    if not data.startswith(_index_prefix(comment_prefix)):
+        return b"", data
+
+    header_end = data.find(b"\n") + 1 or len(data)
+    return data[:header_end], data[header_end:]
+
+
+def _without_index_headers(comment_prefix: str, content: bytes) -> bytes:
+    """
+    Drops the index headers from user content, they are stale (e.g. a header that was pushed off the first line)
+    """
+    return re.sub(
+        rb"^" + re.escape(_index_prefix(comment_prefix)) + rb".*(\n|$)",
+        b"",
+        content,
+        flags=re.MULTILINE,
+    )
+
+
+def _regions_from_header(
+    comment_prefix: str, header: bytes, data: bytes
+) -> list[ManagedRegion] | None:
+    """
+    Reads the regions from the index header, None if the header does not match the file (e.g. it was edited by hand)
+    """
+    regions: list[ManagedRegion] = []
+
+    for entry in header[len(_index_prefix(comment_prefix)) :].split():
+        name, _, raw_span = entry.decode().partition("=")
+        raw_start, _, raw_length = raw_span.partition("+")
+        if not raw_start.isdigit() or not raw_length.isdigit():
+            return None
+
+        region = ManagedRegion(
+            name=name, start=int(raw_start), end=int(raw_start) + int(raw_length)
+        )
+        if not data.startswith(
+            begin_marker(comment_prefix, name), region.start
+        ) or not data[: region.end].endswith(end_marker(comment_prefix, name)):
+            return None
+
+        regions.append(region)
+
+    return regions
+
+
+def _scan_regions(comment_prefix: str, data: bytes) -> list[ManagedRegion]:
+    begin_pattern = re.compile(
+        rb"^" + re.escape(comment_prefix.encode()) + rb" >>> configold (\S+) >>>\n",
+        re.MULTILINE,
+    )
+
+    regions: list[ManagedRegion] = []
+    position = 0
+    while (begin_match := begin_pattern.search(data, position)) is not None:
+        name = begin_match.group(1).decode()
+        end_index = data.find(end_marker(comment_prefix, name), begin_match.end())
+        if end_index == -1:
+            # An unterminated region is left as user content
+            position = begin_match.end()
+            continue
+
+        end = end_index + len(end_marker(comment_prefix, name))
+        regions.append(ManagedRegion(name=name, start=begin_match.start(), end=end))
+        position = end
+
+    return regions
+
+
+def find_regions(comment_prefix: str, data: bytes) -> list[ManagedRegion]:
+    """
+    Finds the managed regions of a file, through the index header when it is valid (without scanning the file)
+    """
+    header, _ = _split_header(comment_prefix, data)
+    if header:
+        regions = _regions_from_header(comment_prefix, header, data)
+        if regions is not None:
+            return regions
+
+    return _scan_regions(comment_prefix, data)
+
+
+def read_region(comment_prefix: str, path: str, name: str) -> str | None:
+    """
+    Reads the content of a single managed region, seeking straight to it through the index header
+    """
+    with open(path, "rb") as config_file:
+        header = config_file.readline()
+        if not header.startswith(_index_prefix(comment_prefix)):
+            return None
+
+        for entry in header[len(_index_prefix(comment_prefix)) :].split():
+            entry_name, _, raw_span = entry.decode().partition("=")
+            if entry_name != name:
+                continue
+
+            raw_start, _, raw_length = raw_span.partition("+")
+            _ = config_file.seek(int(raw_start))
+            region = config_file.read(int(raw_length))
+
+            begin = begin_marker(comment_prefix, name)
+            end = end_marker(comment_prefix, name)
+            if not region.startswith(begin) or not region.endswith(end):
+                return None
+
+            return region[len(begin) : -len(end)].decode()
+
+    return None
+
+
+def _region_bytes(comment_prefix: str, name: str, content: str) -> bytes:
+    data = content.encode()
+    if data and not data.endswith(b"\n"):
+        data += b"\n"
+
+    return begin_marker(comment_prefix, name) + data + end_marker(comment_prefix, name)
+
+
+def _with_header(comment_prefix: str, blocks: list[tuple[str | None, bytes]]) -> bytes:
+    """
+    Joins the blocks (user content has no name) and prepends the index header of the managed regions
+    """
+    region_names = [name for name, _ in blocks if name is not None]
+    header_length = len(
+        _header(
+            comment_prefix,
+            [ManagedRegion(name=name, start=0, end=0) for name in region_names],
+        )
+    )
+
+    regions: list[ManagedRegion] = []
+    position = header_length
+    for name, block in blocks:
+        if name is not None:
+            regions.append(
+                ManagedRegion(name=name, start=position, end=position + len(block))
+            )
+        position += len(block)
+
+    return _header(comment_prefix, regions) + b"".join(block for _, block in blocks)
+
+
+def render_regions(comment_prefix: str, sections: list[tuple[str, str]]) -> bytes:
+    """
+    Renders a file made only of managed regions
+    """
+    return _with_header(
+        comment_prefix,
+        [
+            (name, _region_bytes(comment_prefix, name, content))
+            for name, content in sections
+        ],
+    )
+
+
+def merge_regions(
+    comment_prefix: str, existing: bytes, sections: list[tuple[str, str]]
+) -> bytes:
+    """
+    Patches the managed regions of an existing file: regions are replaced in place, regions that are no longer
+    rendered are removed and new regions are inserted after the region that precedes them.
+    Everything outside of the managed regions is kept as is
+    """
+    rendered = {
+        name: _region_bytes(comment_prefix, name, content) for name, content in sections
+    }
+
+    _, body = _split_header(comment_prefix, existing)
+    header_length = len(existing) - len(body)
+
+    blocks: list[tuple[str | None, bytes]] = []
+    position = 0
+    for region in find_regions(comment_prefix, existing):
+        start, end = region.start - header_length, region.end - header_length
+        if start > position:
+            blocks.append(
+                (None, _without_index_headers(comment_prefix, body[position:start]))
+            )
+
+        if region.name in rendered and region.name not in dict(blocks):
+            blocks.append((region.name, rendered[region.name]))
+
+        position = end
+
+    if position < len(body):
+        blocks.append((None, _without_index_headers(comment_prefix, body[position:])))
+
+    # User content that was only stale headers
+    blocks = [(name, block) for name, block in blocks if name is not None or block]
+
+    existing_names = {name for name, _ in blocks if name is not None}
+    insert_index = 0
+    for name, _ in sections:
+        if name in existing_names:
+            insert_index = (
+                next(
+                    index
+                    for index, (block_name, _) in enumerate(blocks)
+                    if block_name == name
+                )
+                + 1
+            )
+            continue
+
+        blocks.insert(insert_index, (name, rendered[name]))
+        insert_index += 1
+
+    return _with_header(comment_prefix, blocks)
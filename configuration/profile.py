@@ -0,0 +1,310 @@
+import fcntl
+import hashlib
+import logging
+import sys
+from collections.abc import Iterator
+from contextlib import contextmanager
+from enum import Enum
+from functools import cache
+from pathlib import PosixPath
+from typing import Any
+
+import msgpack
+from pydantic import BaseModel
+
+from configuration.data import ConfigurationData
+from utils.atomic_write import FsyncPolicy, atomic_write
+from utils.cache import cache_directory, write_cache_file
+from utils.requirements.binary_requirements import BinaryRequirement
+from utils.state import config_directory
+
+PROFILE_FILE_NAME: str = "profile.yaml"
+PROFILE_LOCK_SUFFIX: str = ".lock"
+
+# The types msgpack does not know are packed as extension types, tagged by these codes
+PATH_EXT_CODE: int = 1
+REQUIREMENT_EXT_CODE: int = 2
+ENUM_EXT_CODE: int = 3
+MODEL_EXT_CODE: int = 4
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+def _resolve_class(module_name: str, qualified_name: str) -> type:
+    """
+    Finds a class that was packed, only from modules that are already imported (the cache never imports code)
+    """
+    module = sys.modules.get(module_name)
+    if module is None:
+        raise ValueError(f"The module of a cached value is not loaded ({module_name})")
+
+    resolved: Any = module
+    for name in qualified_name.split("."):
+        resolved = getattr(resolved, name)
+
+    if not isinstance(resolved, type):
+        raise ValueError(f"A cached value is not a class ({qualified_name})")
+
+    return resolved
+
+
+def _pack_value(value: object) -> msgpack.ExtType | list[Any]:
+    if isinstance(value, PosixPath):
+        return msgpack.ExtType(PATH_EXT_CODE, value.as_posix().encode())
+
+    if isinstance(value, BinaryRequirement):
+        return msgpack.ExtType(
+            REQUIREMENT_EXT_CODE,
+            _packb([value.value, value.binaries, value.must_have]),
+        )
+
+    if isinstance(value, Enum):
+        return msgpack.ExtType(
+            ENUM_EXT_CODE,
+            _packb([type(value).__module__, type(value).__qualname__, value.value]),
+        )
+
+    if isinstance(value, BaseModel):
+        return msgpack.ExtType(
+            MODEL_EXT_CODE,
+            _packb(
+                [type(value).__module__, type(value).__qualname__, _model_fields(value)]
+            ),
+        )
+
+    if isinstance(value, tuple):
+        return list(value)
+
+    raise TypeError(f"Can not pack {type(value).__name__} values")
+
+
+def _unpack_ext(code: int, data: bytes) -> object:
+    if code == PATH_EXT_CODE:
+        return PosixPath(data.decode())
+
+    if code == REQUIREMENT_EXT_CODE:
+        value, binaries, must_have = _unpackb(data)
+        return BinaryRequirement(value, binaries, must_have=must_have)
+
+    if code == ENUM_EXT_CODE:
+        module_name, qualified_name, value = _unpackb(data)
+        return _resolve_class(module_name, qualified_name)(value)
+
+    if code == MODEL_EXT_CODE:
+        module_name, qualified_name, fields = _unpackb(data)
+        model_class = _resolve_class(module_name, qualified_name)
+        if not issubclass(model_class, BaseModel):
+            raise ValueError(f"A cached model is not a model ({qualified_name})")
+
+        return model_class.model_construct(**fields)
+
+    return msgpack.ExtType(code, data)
+
+
+def _packb(value: object) -> bytes:
+    # Strict types keep the subclasses of the builtin types (e.g. string enums) from being packed as the builtin type
+    return msgpack.packb(value, default=_pack_value, strict_types=True)
+
+
+def _unpackb(data: bytes) -> Any:
+    return msgpack.unpackb(data, ext_hook=_unpack_ext, strict_map_key=False)
+
+
+def _model_fields(model: BaseModel) -> dict[str, Any]:
+    return {
+        field_name: field_value
+        for field_name, field_value in model
+        if field_name != "logger"
+    }
+
+
+@cache
+def _code_hash(config_class: type[ConfigurationData]) -> str | None:
+    """
+    The code the cached configurations depend on: the model, and how its values are packed
+    """
+    return config_class.model_source_hash(__name__, BinaryRequirement.__module__)
+
+
+class ConfigurationProfile:
+    """
+    The saved configuration of every application (keyed by the application's name).
+    The profile file (YAML, in the same format as `apply --config`) is the source of truth, and is meant to be edited by hand.
+    The validated configurations are kept in a binary cache next to it, which is trusted (loaded without validation)
+    as long as the profile file and the models' code did not change
+    """
+
+    def __init__(self, path: PosixPath | None = None) -> None:
+        self.path: PosixPath = path or config_directory(PROFILE_FILE_NAME)
+        self._source: bytes | None = None
+        self._raw_profile: dict[str, dict[str, Any]] | None = None
+        self._cache: dict[str, Any] | None = None
+
+    @property
+    def cache_path(self) -> PosixPath | None:
+        profiles_cache_directory = cache_directory("profiles")
+        if profiles_cache_directory is None:
+            return None
+
+        path_hash = hashlib.sha256(self.path.as_posix().encode()).hexdigest()
+        return PosixPath(profiles_cache_directory, f"{path_hash[:16]}.msgpack")
+
+    def _read_source(self) -> bytes:
+        if self._source is None:
+            try:
+                self._source = self.path.read_bytes()
+            except FileNotFoundError:
+                self._source = b""
+
+        return self._source
+
+    @property
+    def source_digest(self) -> str:
+        return hashlib.sha256(self._read_source()).hexdigest()
+
+    def raw(self) -> dict[str, dict[str, Any]]:
+        """
+        The profile as written in the profile file
+        """
+        if self._raw_profile is None:
+            import yaml
+
+            try:
+                raw_profile: object = yaml.safe_load(self._read_source())
+            except yaml.YAMLError as error:
+                raise ValueError(
+                    f"The profile is not valid YAML ({self.path})"
+                ) from error
+
+            if raw_profile is None:
+                raw_profile = {}
+
+            if not isinstance(raw_profile, dict) or not all(
+                isinstance(app_config, dict | None)
+                for app_config in raw_profile.values()
+            ):
+                raise ValueError(
+                    f"The profile must map application names to their configuration ({self.path})"
+                )
+
+            self._raw_profile = {
+                str(name): app_config or {} for name, app_config in raw_profile.items()
+            }
+
+        return self._raw_profile
+
+    def _read_cache(self) -> dict[str, Any]:
+        if self._cache is not None:
+            return self._cache
+
+        self._cache = {"source": self.source_digest, "apps": {}}
+        cache_path = self.cache_path
+        if cache_path is None:
+            return self._cache
+
+        try:
+            cache: Any = msgpack.unpackb(cache_path.read_bytes())
+        except (OSError, ValueError):
+            return self._cache
+
+        if isinstance(cache, dict) and cache.get("source") == self.source_digest:
+            self._cache = cache
+
+        return self._cache
+
+    def load(
+        self, app_name: str, config_class: type[ConfigurationData]
+    ) -> ConfigurationData | None:
+        """
+        Loads the saved configuration of an application (None if the profile does not have it).
+        A cache hit constructs the model straight from the cached fields, skipping the validation
+        """
+        if self._read_source() == b"":
+            return None
+
+        code_hash = _code_hash(config_class)
+        cached_app = self._read_cache()["apps"].get(app_name)
+        if code_hash is not None and cached_app is not None:
+            if cached_app.get("code") == code_hash:
+                try:
+                    # The logger is not cached (and can not be copied from the default), it is set after the construction
+                    return config_class.model_construct(
+                        **_unpackb(cached_app["data"]), logger=None
+                    )
+                except (ValueError, TypeError, AttributeError):
+                    logger.warning(
+                        "The cached profile of %s is corrupted, ignoring it", app_name
+                    )
+
+        raw_config = self.raw().get(app_name)
+        if raw_config is None:
+            return None
+
+        config_data = config_class.model_validate(raw_config)
+        if code_hash is not None:
+            self._write_cache(app_name, code_hash, config_data)
+
+        return config_data
+
+    def _write_cache(
+        self, app_name: str, code_hash: str, config_data: ConfigurationData
+    ) -> None:
+        cache_path = self.cache_path
+        if cache_path is None:
+            return
+
+        try:
+            data = _packb(_model_fields(config_data))
+        except TypeError as error:
+            logger.debug("Not caching the profile of %s: %s", app_name, error)
+            return
+
+        cache = self._read_cache()
+        cache["apps"][app_name] = {"code": code_hash, "data": data}
+        write_cache_file(cache_path, msgpack.packb(cache))
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """
+        Holds an exclusive lock on the profile (a lock file next to it, the profile itself is replaced when it is written)
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        lock_path = self.path.with_name(f"{self.path.name}{PROFILE_LOCK_SUFFIX}")
+        with open(lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def save(self, configurations: dict[str, ConfigurationData]) -> None:
+        """
+        Saves the configurations of the applications into the profile, the applications that are not given keep their saved configuration.
+        The profile is read again under the lock, so concurrent saves of other applications are kept.
+        Only the values that differ from the defaults are written
+        """
+        import yaml
+
+        with self._locked():
+            self._source = None
+            self._raw_profile = None
+            try:
+                raw_profile = dict(self.raw())
+            except ValueError:
+                logger.warning(
+                    "The profile is not valid, overwriting it (%s)", self.path
+                )
+                raw_profile = {}
+
+            for app_name, config_data in configurations.items():
+                raw_profile[app_name] = config_data.model_dump(
+                    mode="json", exclude={"logger"}, exclude_defaults=True
+                )
+
+            source = yaml.safe_dump(raw_profile, sort_keys=False).encode()
+            atomic_write(self.path, source, FsyncPolicy.FILE)
+
+        self._source = source
+        self._raw_profile = raw_profile
+        # The cache is rebuilt from the new profile (with validation) the next time it is loaded
+        self._cache = None
@@ -0,0 +1,136 @@
+import json
+import os
+from pathlib import PosixPath
+from typing import Any
+
+from apps.registry import get_app_descriptor
+from configuration.data import ConfigStatus, ConfigurationData
+from configuration.profile import ConfigurationProfile
+from utils.atomic_write import FsyncPolicy, atomic_write
+from utils.profile_links import (
+    MANIFEST_FILE_NAME,
+    active_link_path,
+    active_profile,
+    is_linked,
+    linked_path,
+    profile_directory,
+    profile_source_path,
+    replace_symlink,
+)
+
+PROFILE_APPS: list[str] = ["zsh", "tmux", "zellij"]
+"The applications every profile renders (the ones not in the profile's configuration are rendered with their defaults)"
+
+
+def _write_artifact(path: PosixPath, content: str) -> ConfigStatus:
+    data = content.encode()
+
+    try:
+        with open(path, "rb") as artifact_file:
+            if artifact_file.read() == data:
+                return ConfigStatus.UNCHANGED
+    except FileNotFoundError:
+        pass
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    atomic_write(path, data, FsyncPolicy.FILE)
+    return ConfigStatus.WRITTEN
+
+
+def _link_config_file(config_data: ConfigurationData, relative_path: str) -> bool:
+    """
+    Replaces the configuration file with a link through the active profile (backing up the file first),
+    returns whether the link was created
+    """
+    config_path = config_data.config_path
+    if is_linked(config_path, relative_path):
+        return False
+
+    if config_path.exists():
+        _ = config_data.backup_store.backup(config_path)
+
+    config_path.parent.mkdir(parents=True, exist_ok=True)
+    replace_symlink(config_path, linked_path(relative_path))
+    return True
+
+
+def _link_config_file_companions(config_data: ConfigurationData) -> None:
+    """
+    Links the files derived from the configuration file through the active profile, a profile that does not have one
+    leaves a dangling link (which the application ignores). They are derived, so they are replaced without a backup
+    """
+    for companion_path in config_data.config_file_companions():
+        relative_path = companion_path.relative_to(config_data.home_path).as_posix()
+        if not is_linked(companion_path, relative_path):
+            replace_symlink(companion_path, linked_path(relative_path))
+
+
+def build_profile(
+    name: str, source_path: PosixPath | None = None
+) -> list[dict[str, Any]]:
+    """
+    Renders a profile's configuration files into the profile's directory, and prepares their resources (every profile
+    deploys its own, into its directory). The configuration files are linked through the active profile (the first
+    profile that is built becomes the active one), so switching profiles later on does not render anything
+    """
+    source_path = source_path or profile_source_path(name)
+    if not source_path.is_file():
+        raise LookupError(
+            f"There is no configuration for the profile {name} ({source_path})"
+        )
+
+    profile = ConfigurationProfile(source_path)
+    directory = profile_directory(name)
+    app_names = PROFILE_APPS + [
+        app_name for app_name in profile.raw() if app_name not in PROFILE_APPS
+    ]
+
+    results: list[dict[str, Any]] = []
+    manifest: dict[str, str] = {}
+    configurations: list[tuple[ConfigurationData, str]] = []
+    for app_name in app_names:
+        config_class = get_app_descriptor(app_name).load_config_class()
+        if config_class is None:
+            raise ValueError(f"{app_name} does not have a configuration")
+
+        config_data = profile.load(app_name, config_class) or config_class()
+        relative_path = config_data.config_path.relative_to(
+            config_data.home_path
+        ).as_posix()
+
+        profile_config_data = config_data.in_profile(directory)
+        prepared = profile_config_data.prepare()
+        status = _write_artifact(
+            profile_config_data.config_path, profile_config_data.render()
+        )
+        results.append(
+            {
+                "app": app_name,
+                "path": config_data.config_path.as_posix(),
+                "status": status,
+                "prepared": prepared and profile_config_data.publish(),
+            }
+        )
+        manifest[config_data.config_path.as_posix()] = relative_path
+        for companion_path in config_data.config_file_companions():
+            manifest[companion_path.as_posix()] = companion_path.relative_to(
+                config_data.home_path
+            ).as_posix()
+
+        configurations.append((config_data, relative_path))
+
+    atomic_write(
+        PosixPath(directory, MANIFEST_FILE_NAME),
+        json.dumps({"files": manifest}, indent=2).encode(),
+        FsyncPolicy.FILE,
+    )
+
+    # The configuration files are linked through the active profile, so there has to be one before they are linked
+    if active_profile() is None or not os.path.isdir(active_link_path()):
+        replace_symlink(active_link_path(), name)
+
+    for (config_data, relative_path), result in zip(configurations, results):
+        result["linked"] = _link_config_file(config_data, relative_path)
+        _link_config_file_companions(config_data)
+
+    return results
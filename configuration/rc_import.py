@@ -0,0 +1,120 @@
+import re
+from dataclasses import dataclass, field
+from functools import cache
+from typing import Any
+
+import tree_sitter_bash
+from tree_sitter import Language, Node, Parser, Tree
+
+from configuration.templates import escape_string
+
+# Unquoted words with only these characters mean the same inside of a double quoted string
+_PLAIN_WORD_PATTERN: re.Pattern[str] = re.compile(r"[\w@%+=:,./${}-]*")
+
+
+@dataclass
+class RcImport:
+    """
+    The result of importing an existing configuration file into the raw fields of a configuration
+    """
+
+    config: dict[str, Any] = field(default_factory=dict)
+    "The raw fields of the configuration (to be validated by the configuration model)"
+
+    statements: int = 0
+    "How many statements the configuration file has"
+
+    imported: int = 0
+    "How many statements were imported into the fields"
+
+    dropped: list[str] = field(default_factory=list)
+    "Statements that configold renders by itself (e.g. loading the plugin manager), so they are not imported"
+
+    unsupported: list[str] = field(default_factory=list)
+    "Statements that do not fit into any field (the configurations with an `extra` field keep them there)"
+
+
+@cache
+def shell_parser() -> Parser:
+    return Parser(Language(tree_sitter_bash.language()))
+
+
+def parse_shell(source: bytes) -> Tree:
+    return shell_parser().parse(source)
+
+
+def node_text(node: Node) -> str:
+    return (node.text or b"").decode(errors="replace")
+
+
+def _unescape_double_quoted(text: str) -> str | None:
+    """
+    The value of the content of a double quoted string, None if it has escapes that can not be quoted back the same way
+    """
+    value = text.replace("\\\\", "\0").replace('\\"', '"')
+    if "\\" in value:
+        return None
+
+    return value.replace("\0", "\\")
+
+
+def plain_word_value(text: str) -> str | None:
+    """
+    The value of an unquoted word, None if it would mean something else inside of double quotes (e.g. `~` or globs)
+    """
+    return text if _PLAIN_WORD_PATTERN.fullmatch(text) else None
+
+
+def quotable_value(node: Node) -> str | None:
+    """
+    The value of a shell word that configold writes back inside of a double quoted string (e.g. alias and export values).
+    None if the word would mean something else inside of the double quotes (so it is kept as is instead)
+    """
+    text = node_text(node)
+
+    if node.type == "string":
+        value = _unescape_double_quoted(text[1:-1])
+    elif node.type == "raw_string":
+        value = text[1:-1]
+        if any(character in value for character in "$`\\"):
+            return None
+    elif node.type in ("word", "number"):
+        value = plain_word_value(text)
+    elif node.type in ("simple_expansion", "expansion", "command_substitution"):
+        value = text
+    elif node.type == "concatenation":
+        parts = [quotable_value(child) for child in node.children]
+        value = None if None in parts else "".join(filter(None, parts))
+    else:
+        value = None
+
+    if value is None:
+        return None
+
+    # The values are escaped when they are rendered, it has to be the same escaping the shell would undo
+    if escape_string(value) != value.replace("\\", "\\\\").replace('"', '\\"'):
+        return None
+
+    return value
+
+
+def command_arguments(command: Node) -> tuple[str, list[Node]]:
+    """
+    The name of a command and its arguments (the redirections and the environment assignments are not arguments)
+    """
+    name_node = command.child_by_field_name("name")
+    return (
+        "" if name_node is None else node_text(name_node),
+        command.children_by_field_name("argument"),
+    )
+
+
+def argument_text(argument: Node) -> str:
+    """
+    The literal text of an argument (quotes removed), for arguments that are compared rather than written back
+    """
+    text = node_text(argument)
+    if argument.type in ("string", "raw_string") and len(text) >= 2:
+        return text[1:-1]
+
+    return text
@@ -0,0 +1,165 @@
+import hashlib
+import json
+import os
+from functools import cache
+from importlib.resources.abc import Traversable
+from pathlib import Path, PosixPath
+from typing import Callable
+
+from jinja2 import (
+    BaseLoader,
+    BytecodeCache,
+    Environment,
+    FileSystemBytecodeCache,
+    StrictUndefined,
+    TemplateNotFound,
+    meta,
+)
+
+from utils.cache import cache_directory
+from utils.resources import package_resource, resource_tree_version
+from utils.state import config_directory
+
+TEMPLATES_DIRECTORY_ENV: str = "CONFIGOLD_TEMPLATES_DIR"
+DEFAULT_TEMPLATES_PREFIX: str = "default/"
+"Template names with this prefix always load the shipped template, so an override can include the template it replaces"
+
+
+def user_templates_directory(*parts: str) -> PosixPath:
+    """
+    The directory the user's template overrides are looked up in (before the shipped templates)
+    """
+    base_directory = os.getenv(TEMPLATES_DIRECTORY_ENV)
+    if base_directory:
+        return PosixPath(base_directory, *parts)
+
+    return config_directory("templates", *parts)
+
+
+def shipped_template(name: str) -> Traversable:
+    """
+    The template shipped with an application, `<app>/<path>` is the `templates/<path>` resource of the application
+    """
+    app_name, _, template_path = name.partition("/")
+    return package_resource("apps", app_name, "templates", *template_path.split("/"))
+
+
+def _uptodate(path: Traversable) -> Callable[[], bool]:
+    # Inside of the zipapp the templates only change with the zipapp itself
+    if not isinstance(path, Path):
+        return lambda: True
+
+    modification_time = path.stat().st_mtime_ns
+
+    def uptodate() -> bool:
+        try:
+            return path.stat().st_mtime_ns == modification_time
+        except OSError:
+            return False
+
+    return uptodate
+
+
+class TemplateLoader(BaseLoader):
+    """
+    Loads the user's template overrides first, then the templates shipped with the applications
+    """
+
+    def get_source(
+        self, environment: Environment, template: str
+    ) -> tuple[str, str | None, Callable[[], bool] | None]:
+        if template.startswith(DEFAULT_TEMPLATES_PREFIX):
+            candidates: list[Traversable] = [
+                shipped_template(template.removeprefix(DEFAULT_TEMPLATES_PREFIX))
+            ]
+        else:
+            candidates = [
+                user_templates_directory(template),
+                shipped_template(template),
+            ]
+
+        for candidate in candidates:
+            if not candidate.is_file():
+                continue
+
+            return candidate.read_text(), str(candidate), _uptodate(candidate)
+
+        raise TemplateNotFound(template)
+
+
+def escape_string(value: object) -> str:
+    """
+    Escapes a value to be placed inside of a double quoted string
+    """
+    return json.dumps(str(value))[1:-1]
+
+
+def _bytecode_cache() -> BytecodeCache | None:
+    templates_cache_directory = cache_directory("templates")
+    if templates_cache_directory is None:
+        return None
+
+    try:
+        templates_cache_directory.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        return None
+
+    return FileSystemBytecodeCache(templates_cache_directory.as_posix())
+
+
+@cache
+def template_environment() -> Environment:
+    """
+    The environment the configuration files are rendered with, created once per process so every template is only
+    loaded and compiled once (and the compiled templates are kept in the cache directory for the following runs).
+    Changes to the templates are picked up by the next run
+    """
+    environment = Environment(
+        loader=TemplateLoader(),
+        bytecode_cache=_bytecode_cache(),
+        undefined=StrictUndefined,
+        autoescape=False,
+        trim_blocks=True,
+        lstrip_blocks=True,
+        keep_trailing_newline=True,
+        cache_size=-1,
+        auto_reload=False,
+    )
+    environment.filters["escape_string"] = escape_string
+    return environment
+
+
+@cache
+def template_variables(name: str) -> frozenset[str] | None:
+    """
+    The variables a template renders, None if it includes (or imports) other templates and might render any variable
+    """
+    environment = template_environment()
+    source, _, _ = TemplateLoader().get_source(environment, name)
+    template_ast = environment.parse(source)
+
+    if any(True for _ in meta.find_referenced_templates(template_ast)):
+        return None
+
+    return frozenset(meta.find_undeclared_variables(template_ast))
+
+
+def reload_templates() -> None:
+    """
+    Drops the loaded templates so the changed ones are loaded again (the unchanged ones are loaded from the bytecode cache)
+    """
+    template_environment.cache_clear()
+    template_variables.cache_clear()
+
+
+def templates_version(app_name: str) -> str:
+    """
+    A version of an application's templates (the shipped ones and the user's overrides), that changes whenever any of them changes
+    """
+    versions = [resource_tree_version(package_resource("apps", app_name, "templates"))]
+
+    overrides_directory = user_templates_directory(app_name)
+    if overrides_directory.is_dir():
+        versions.append(resource_tree_version(overrides_directory))
+
+    return hashlib.sha256("\n".join(versions).encode()).hexdigest()
@@ -50,6 +50,9 @@ class ConfigurationWidget(Static, Generic[T]):
     }
     """
 
+    config: T
+    "The configuration data that is rendered, set by the `Configuration` holding this widget"
+
     def __init__(
         self,
         content: VisualType = "",
@@ -75,5 +78,3 @@ class ConfigurationWidget(Static, Generic[T]):
         self.logger: logging.Logger = logging.getLogger(
             f"{__name__}.{type(self).__name__}"
         )
-
-        self.config: T = ConfigurationData()  # pyright: ignore[reportArgumentType]
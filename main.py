@@ -1,4 +1,5 @@
 import asyncio
+import logging
 from textual.driver import Driver
 from textual.types import CSSPathType
 from textual.widgets import Button, Footer, Header
@@ -6,15 +7,10 @@ from typing import override
 from textual.app import App, ComposeResult
 from textual.binding import Binding, BindingType
 
-from apps.eza import EzaApp
-from apps.fd import FDApp
-from apps.fzf import FZFApp
-from apps.installable_app import InstallableApp
-from apps.nvim import NVIMApp
-from apps.ripgrep import RipGrepApp
-from apps.zellij import ZellijApp
-from apps.zoxide import ZoxideApp
-from apps.zsh import ZshApp
+from apps.app_widget import AppWidget
+from apps.journal import ApplyJournal
+from apps.registry import APPS
+from configuration.profile import ConfigurationProfile
 from utils import setup_logger
 
 class MainApp(App):
@@ -38,15 +34,10 @@ class MainApp(App):
     ):
         super().__init__(driver_class, css_path, watch_css, ansi_color)
 
-        self.apps: list[InstallableApp] = [
-            ZshApp(),
-            ZellijApp(),
-            NVIMApp(),
-            FDApp(),
-            FZFApp(),
-            RipGrepApp(),
-            ZoxideApp(),
-            EzaApp(),
+        # The configurations edited in the UI are saved into the profile, and loaded from it the next time
+        self.profile: ConfigurationProfile = ConfigurationProfile()
+        self.apps: list[AppWidget] = [
+            AppWidget(descriptor, profile=self.profile) for descriptor in APPS if descriptor.show_in_ui
         ]
 
     @override
@@ -63,14 +54,47 @@ class MainApp(App):
         if button.id != "finish":
             return
 
-        for app in self.apps:
-            _ = await app.install()
+        self.save_profile()
+        installable_apps = [app.load() for app in self.apps if app.should_install]
 
-        for app in self.apps:
-            _ = app.configure()
+        # Only the applications (and the steps) whose inputs changed since their last apply are run
+        journal = ApplyJournal()
+        plans = [journal.plan(installable_app) for installable_app in installable_apps]
+
+        for installable_app, plan in zip(installable_apps, plans):
+            if plan.install:
+                _ = await installable_app.install()
+
+        for installable_app, plan in zip(installable_apps, plans):
+            did_configure = plan.configure and installable_app.configure(prepare=plan.prepare)
+            journal.record(installable_app, installed=plan.install, configured=did_configure)
+
+        journal.save()
 
         self.exit()
 
+    def save_profile(self) -> None:
+        """
+        Saves the configurations of the applications that were loaded (only those could have been edited)
+        """
+        configurations = {
+            app.descriptor.name: app.installable_app.configuration.config_data
+            for app in self.apps
+            if app.installable_app is not None and app.installable_app.configuration is not None
+        }
+        if len(configurations) == 0:
+            return
+
+        try:
+            self.profile.save(configurations)
+        except OSError:
+            logging.getLogger(__name__).exception("Failed to save the profile (%s)", self.profile.path)
+
+    @override
+    async def action_quit(self) -> None:
+        self.save_profile()
+        await super().action_quit()
+
 
 async def main():
     setup_logger(console=False)
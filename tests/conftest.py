@@ -0,0 +1,29 @@
+from pathlib import PosixPath
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def home(tmp_path: PosixPath, monkeypatch: pytest.MonkeyPatch) -> PosixPath:
+    """
+    Every test gets a home directory of its own, so nothing is read from (or written to) the real one
+    """
+    home_path = PosixPath(tmp_path, "home")
+    home_path.mkdir()
+    monkeypatch.setenv("HOME", home_path.as_posix())
+
+    for name in (
+        "XDG_CONFIG_HOME",
+        "XDG_DATA_HOME",
+        "XDG_STATE_HOME",
+        "XDG_CACHE_HOME",
+        "CONFIGOLD_CONFIG_DIR",
+        "CONFIGOLD_DATA_DIR",
+        "CONFIGOLD_STATE_DIR",
+        "CONFIGOLD_CACHE_DIR",
+        "CONFIGOLD_NO_CACHE",
+        "CONFIGOLD_TEMPLATES_DIR",
+    ):
+        monkeypatch.delenv(name, raising=False)
+
+    return home_path
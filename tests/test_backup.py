@@ -0,0 +1,103 @@
+import time
+from pathlib import PosixPath
+
+import pytest
+
+from configuration.backup import BackupStore
+
+
+def _backup_versions(store: BackupStore, path: PosixPath, count: int) -> None:
+    for version in range(count):
+        _ = path.write_text(f"version {version}\n")
+        _ = store.backup(path)
+
+
+def test_identical_content_is_backed_up_once(tmp_path: PosixPath) -> None:
+    store = BackupStore(PosixPath(tmp_path, "backups"))
+    path = PosixPath(tmp_path, ".zshrc")
+    _ = path.write_text("content\n")
+
+    first = store.backup(path)
+    second = store.backup(path)
+
+    assert first == second
+    assert len(store.generations()) == 1
+
+
+def test_keep_last(tmp_path: PosixPath) -> None:
+    store = BackupStore(PosixPath(tmp_path, "backups"), keep_last=2)
+    path = PosixPath(tmp_path, ".zshrc")
+
+    _backup_versions(store, path, 5)
+
+    assert [generation.generation for generation in store.generations()] == [3, 4]
+    # The objects of the dropped generations are removed
+    assert len(list(store.objects_directory.iterdir())) == 2
+
+
+def test_max_age_keeps_the_latest_generation(
+    tmp_path: PosixPath, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    store = BackupStore(PosixPath(tmp_path, "backups"), max_age=60)
+    path = PosixPath(tmp_path, ".zshrc")
+    _backup_versions(store, path, 2)
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 3600)
+    _ = path.write_text("newer\n")
+    latest = store.backup(path)
+
+    assert store.generations() == [latest]
+
+
+def test_get(tmp_path: PosixPath) -> None:
+    store = BackupStore(PosixPath(tmp_path, "backups"), keep_last=3)
+    path = PosixPath(tmp_path, ".zshrc")
+    _backup_versions(store, path, 5)
+
+    assert store.get().generation == 4
+    assert store.get(-3).generation == 2
+    assert store.get(3).generation == 3
+    assert store.read(2) == b"version 2\n"
+
+    for pruned_or_missing in (1, 5, -4):
+        with pytest.raises(LookupError):
+            _ = store.get(pruned_or_missing)
+
+
+def test_get_without_backups(tmp_path: PosixPath) -> None:
+    with pytest.raises(LookupError):
+        _ = BackupStore(PosixPath(tmp_path, "backups")).get()
+
+
+def test_restore_backs_up_the_current_file(tmp_path: PosixPath) -> None:
+    store = BackupStore(PosixPath(tmp_path, "backups"))
+    path = PosixPath(tmp_path, ".zshrc")
+    _backup_versions(store, path, 2)
+    _ = path.write_text("edited\n")
+
+    _ = store.restore(0)
+
+    assert path.read_text() == "version 0\n"
+    assert store.read() == b"edited\n"
+
+
+@pytest.mark.parametrize(
+    "index", ["{garbled", '{"generations": [{"unknown": 1}]}', "{}", "[]"]
+)
+def test_corrupted_index_starts_a_new_one(tmp_path: PosixPath, index: str) -> None:
+    store = BackupStore(PosixPath(tmp_path, "backups"))
+    path = PosixPath(tmp_path, ".zshrc")
+    _backup_versions(store, path, 2)
+    objects = set(store.objects_directory.iterdir())
+
+    _ = store.index_path.write_text(index)
+    assert store.generations() == []
+
+    _ = path.write_text("after the corruption\n")
+    generation = store.backup(path)
+
+    assert generation.generation == 0
+    assert store.read() == b"after the corruption\n"
+    # The objects of the lost index are kept
+    assert objects < set(store.objects_directory.iterdir())
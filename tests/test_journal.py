@@ -0,0 +1,91 @@
+import shutil
+from pathlib import PosixPath
+
+import pytest
+
+from apps.installable_app import InstallableApp
+from apps.journal import ApplyJournal
+from apps.registry import get_app_descriptor
+from apps.tmux.config_data import TmuxConfigData
+
+
+@pytest.fixture
+def journal(tmp_path: PosixPath) -> ApplyJournal:
+    return ApplyJournal(PosixPath(tmp_path, "journal.json"))
+
+
+def _configured_app(
+    journal: ApplyJournal, config_data: TmuxConfigData
+) -> InstallableApp:
+    installable_app = get_app_descriptor("tmux").create(config_data)
+    assert config_data.config()
+    journal.record(installable_app, installed=False, configured=True)
+    return installable_app
+
+
+def test_unknown_application_runs_every_step(journal: ApplyJournal) -> None:
+    plan = journal.plan(get_app_descriptor("tmux").create(TmuxConfigData()))
+
+    assert plan.install and plan.configure and plan.prepare
+
+
+def test_unchanged_application_is_skipped(journal: ApplyJournal) -> None:
+    installable_app = _configured_app(journal, TmuxConfigData())
+
+    assert journal.plan(installable_app, install=False).skipped
+
+
+def test_journal_is_saved(journal: ApplyJournal) -> None:
+    installable_app = _configured_app(journal, TmuxConfigData())
+    journal.save()
+
+    assert ApplyJournal(journal.path).plan(installable_app, install=False).skipped
+
+
+def test_changed_configuration_is_configured_again(journal: ApplyJournal) -> None:
+    _ = _configured_app(journal, TmuxConfigData())
+
+    plan = journal.plan(
+        get_app_descriptor("tmux").create(TmuxConfigData(prefix="C-a")),
+        install=False,
+    )
+
+    assert plan.configure
+    assert not plan.prepare
+
+
+def test_configuration_file_edited_by_hand_is_configured_again(
+    journal: ApplyJournal,
+) -> None:
+    config_data = TmuxConfigData()
+    installable_app = _configured_app(journal, config_data)
+
+    with open(config_data.config_path, "a") as config_file:
+        _ = config_file.write("set -g mouse off\n")
+
+    assert journal.plan(installable_app, install=False).configure
+
+
+def test_missing_resources_are_prepared_again(journal: ApplyJournal) -> None:
+    config_data = TmuxConfigData()
+    installable_app = _configured_app(journal, config_data)
+
+    shutil.rmtree(config_data.resource_target_path)
+    plan = journal.plan(installable_app, install=False)
+
+    assert plan.configure and plan.prepare
+
+
+def test_force(journal: ApplyJournal) -> None:
+    installable_app = _configured_app(journal, TmuxConfigData())
+
+    plan = journal.plan(installable_app, install=False, force=True)
+
+    assert plan.configure and plan.prepare
+    assert not plan.install
+
+
+def test_corrupted_journal_is_ignored(journal: ApplyJournal) -> None:
+    _ = journal.path.write_text("{garbled")
+
+    assert ApplyJournal(journal.path).fingerprints == {}
@@ -0,0 +1,106 @@
+from pathlib import PosixPath
+
+from configuration.managed_regions import (
+    find_regions,
+    merge_regions,
+    read_region,
+    render_regions,
+)
+
+SECTIONS: list[tuple[str, str]] = [
+    ("aliases", "alias ll='ls -l'"),
+    ("prompt", "PS1='$ '"),
+]
+
+
+def _region_contents(data: bytes) -> dict[str, bytes]:
+    return {
+        region.name: data[region.start : region.end]
+        for region in find_regions("#", data)
+    }
+
+
+def test_render_regions_header_points_at_the_regions() -> None:
+    data = render_regions("#", SECTIONS)
+
+    assert data.startswith(b"# configold-index:")
+    assert [region.name for region in find_regions("#", data)] == ["aliases", "prompt"]
+    assert _region_contents(data)["prompt"].startswith(b"# >>> configold prompt >>>\n")
+
+
+def test_read_region_seeks_to_the_region(tmp_path: PosixPath) -> None:
+    config_path = PosixPath(tmp_path, "config")
+    _ = config_path.write_bytes(render_regions("#", SECTIONS))
+
+    assert read_region("#", config_path.as_posix(), "aliases") == "alias ll='ls -l'\n"
+    assert read_region("#", config_path.as_posix(), "missing") is None
+
+
+def test_merge_keeps_the_user_content() -> None:
+    existing = (
+        b"# my own settings\nexport FOO=1\n"
+        + render_regions("#", SECTIONS)
+        + b"bindkey -v\n"
+    )
+
+    merged = merge_regions(
+        "#", existing, [("aliases", "alias la='ls -A'"), ("prompt", "PS1='% '")]
+    )
+
+    assert b"# my own settings\nexport FOO=1\n" in merged
+    assert merged.endswith(b"bindkey -v\n")
+    assert b"alias la='ls -A'" in merged
+    assert b"alias ll='ls -l'" not in merged
+    assert [region.name for region in find_regions("#", merged)] == [
+        "aliases",
+        "prompt",
+    ]
+
+
+def test_merge_removes_and_inserts_regions() -> None:
+    existing = render_regions("#", SECTIONS)
+
+    merged = merge_regions(
+        "#", existing, [("aliases", "alias ll='ls -l'"), ("exports", "export A=1")]
+    )
+
+    assert [region.name for region in find_regions("#", merged)] == [
+        "aliases",
+        "exports",
+    ]
+    assert b"PS1" not in merged
+
+
+def test_merge_is_stable() -> None:
+    existing = b"before\n" + render_regions("#", SECTIONS) + b"after\n"
+    merged = merge_regions("#", existing, SECTIONS)
+
+    assert merge_regions("#", merged, SECTIONS) == merged
+
+
+def test_merge_drops_stale_headers() -> None:
+    # Content added above the file pushes its header off the first line, the header must not pile up
+    existing = b"export FOO=1\n" + render_regions("#", SECTIONS)
+
+    merged = merge_regions("#", existing, SECTIONS)
+    merged_again = merge_regions("#", b"export BAR=1\n" + merged, SECTIONS)
+
+    assert merged.count(b"configold-index:") == 1
+    assert merged_again.count(b"configold-index:") == 1
+    assert merged_again.startswith(b"# configold-index:")
+    assert b"export FOO=1\n" in merged_again and b"export BAR=1\n" in merged_again
+
+
+def test_edited_header_falls_back_to_scanning() -> None:
+    data = render_regions("#", SECTIONS)
+    header_end = data.index(b"\n") + 1
+    # Editing the file by hand moves the regions away from the offsets in the header
+    edited = data[:header_end] + b"# a comment\n" + data[header_end:]
+
+    assert [region.name for region in find_regions("#", edited)] == [
+        "aliases",
+        "prompt",
+    ]
+    assert _region_contents(edited)["aliases"].endswith(
+        b"# <<< configold aliases <<<\n"
+    )
@@ -0,0 +1,83 @@
+from typing import Any
+
+from apps.tmux.config_data import TmuxConfigData
+from apps.zsh.config_data import ZshConfigData
+
+ZSHRC: bytes = b"""# my zshrc
+export EDITOR=nvim
+export PATH="$HOME/bin:$PATH"
+alias ll='ls -l'
+alias -s py=bat
+plugins=(git fzf-tab)
+zstyle ':completion:*' menu no
+bindkey -v
+"""
+
+TMUX_CONF: bytes = b"""set -g mouse on
+set -g prefix C-a
+bind r source-file ~/.tmux.conf
+set -g @plugin 'tmux-plugins/tmux-sensible'
+run '~/.tmux/plugins/tpm/tpm'
+display-message hello
+"""
+
+
+def _fields(config_data: Any) -> dict[str, Any]:
+    return config_data.model_dump(mode="json", exclude={"logger"})
+
+
+def test_zshrc_import() -> None:
+    rc_import = ZshConfigData.import_config_file(ZSHRC)
+
+    assert rc_import.statements == 7
+    assert rc_import.imported == 6
+    assert rc_import.unsupported == ["bindkey -v"]
+    assert rc_import.config["aliases"] == {"ll": "ls -l"}
+    assert rc_import.config["suffix_aliases"] == {"py": "bat"}
+    assert rc_import.config["exports"] == {
+        "EDITOR": "nvim",
+        "PATH": "$HOME/bin:$PATH",
+    }
+    assert rc_import.config["plugins"] == ["git", "fzf-tab"]
+    # The statements that do not fit into a field are kept in the extra field
+    assert rc_import.config["extra"] == "bindkey -v"
+
+
+def test_zshrc_round_trip() -> None:
+    config_data = ZshConfigData.model_validate(
+        ZshConfigData.import_config_file(
+            b"alias gs='git status'\nexport FOO='bar baz'\nplugins=(git)\n"
+        ).config
+    )
+
+    rc_import = ZshConfigData.import_config_file(config_data.render().encode())
+    imported = ZshConfigData.model_validate(rc_import.config)
+
+    for field_name in ("aliases", "suffix_aliases", "exports", "plugins"):
+        assert _fields(imported)[field_name] == _fields(config_data)[field_name]
+
+
+def test_tmux_conf_import() -> None:
+    rc_import = TmuxConfigData.import_config_file(TMUX_CONF)
+
+    assert rc_import.unsupported == ["display-message hello"]
+    assert rc_import.config["prefix"] == "C-a"
+    assert rc_import.config["mouse_support"] is True
+    assert rc_import.config["tpm"] is True
+    assert rc_import.config["plugins"] == ["tmux-sensible"]
+    assert rc_import.config["keybindings"]["r"]["bind_value"] == (
+        "source-file ~/.tmux.conf"
+    )
+
+
+def test_tmux_conf_round_trip() -> None:
+    for config_data in (
+        TmuxConfigData(),
+        TmuxConfigData(prefix="C-a", mouse_support=False, base_index=0),
+    ):
+        rc_import = TmuxConfigData.import_config_file(config_data.render().encode())
+
+        assert rc_import.unsupported == []
+        assert _fields(TmuxConfigData.model_validate(rc_import.config)) == _fields(
+            config_data
+        )
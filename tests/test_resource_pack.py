@@ -0,0 +1,84 @@
+import os
+from pathlib import PosixPath
+
+import pytest
+
+from utils.resource_pack import ResourcePack, build_resource_pack, sync_resource_pack
+from utils.resource_sync import ResourceSelection
+
+
+@pytest.fixture
+def pack_path(tmp_path: PosixPath) -> PosixPath:
+    source = PosixPath(tmp_path, "source")
+    PosixPath(source, "themes").mkdir(parents=True)
+    _ = PosixPath(source, "themes", "robbyrussell.zsh-theme").write_text(
+        "PROMPT='> '\n" * 100
+    )
+    _ = PosixPath(source, "themes", "copy.zsh-theme").write_text("PROMPT='> '\n" * 100)
+    _ = PosixPath(source, "init.zsh").write_bytes(os.urandom(64))
+    PosixPath(source, "init.zsh").chmod(0o755)
+
+    pack_path = PosixPath(tmp_path, "resources.pack")
+    assert build_resource_pack(source, pack_path) == 3
+    return pack_path
+
+
+def test_pack_extracts_the_members(pack_path: PosixPath, tmp_path: PosixPath) -> None:
+    pack = ResourcePack(pack_path)
+    target = PosixPath(tmp_path, "target")
+    PosixPath(target, "themes").mkdir(parents=True)
+
+    pack.extract(["init.zsh", "themes/copy.zsh-theme"], target)
+
+    assert (
+        PosixPath(target, "themes", "copy.zsh-theme").read_text()
+        == "PROMPT='> '\n" * 100
+    )
+    assert PosixPath(target, "init.zsh").stat().st_mode & 0o777 == 0o755
+    assert not PosixPath(target, "themes", "robbyrussell.zsh-theme").exists()
+
+
+def test_pack_stores_identical_files_once(pack_path: PosixPath) -> None:
+    members = ResourcePack(pack_path).members
+
+    assert (
+        members["themes/copy.zsh-theme"].offset
+        == members["themes/robbyrussell.zsh-theme"].offset
+    )
+    # The themes compress well, the random bytes are stored as they are
+    assert (
+        members["themes/copy.zsh-theme"].stored_size
+        < members["themes/copy.zsh-theme"].size
+    )
+    assert members["init.zsh"].stored_size == members["init.zsh"].size
+
+
+def test_not_a_pack_is_rejected(tmp_path: PosixPath) -> None:
+    path = PosixPath(tmp_path, "not.pack")
+    _ = path.write_bytes(b"something else")
+
+    with pytest.raises(ValueError):
+        _ = ResourcePack(path)
+
+
+def test_sync_resource_pack(pack_path: PosixPath, tmp_path: PosixPath) -> None:
+    pack = ResourcePack(pack_path)
+    target = PosixPath(tmp_path, "target")
+
+    result = sync_resource_pack(
+        pack, target, selection=ResourceSelection(paths=("themes/",))
+    )
+    assert sorted(result.copied) == [
+        "themes/copy.zsh-theme",
+        "themes/robbyrussell.zsh-theme",
+    ]
+
+    PosixPath(target, "themes", "copy.zsh-theme").unlink()
+    result = sync_resource_pack(
+        pack, target, selection=ResourceSelection(paths=("themes/",))
+    )
+    assert result.copied == ["themes/copy.zsh-theme"]
+    assert result.unchanged == 1
+
+    result = sync_resource_pack(pack, target)
+    assert result.copied == ["init.zsh"]
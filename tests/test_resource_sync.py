@@ -0,0 +1,144 @@
+import os
+from pathlib import PosixPath
+
+import pytest
+
+from utils.resource_sync import (
+    MANIFEST_FILE_NAME,
+    ResourceManifest,
+    ResourceSelection,
+    link_resource_tree,
+    sync_resource_tree,
+)
+
+
+@pytest.fixture
+def source(tmp_path: PosixPath) -> PosixPath:
+    source_path = PosixPath(tmp_path, "source")
+    PosixPath(source_path, "plugins", "git").mkdir(parents=True)
+    PosixPath(source_path, "plugins", "git", "tests").mkdir()
+    _ = PosixPath(source_path, "init.zsh").write_text("source plugins/git/git.zsh\n")
+    _ = PosixPath(source_path, "plugins", "git", "git.zsh").write_text("alias g=git\n")
+    _ = PosixPath(source_path, "plugins", "git", "README.md").write_text("# git\n")
+    _ = PosixPath(source_path, "plugins", "git", "tests", "test.zsh").write_text("\n")
+    return source_path
+
+
+def _files(directory: PosixPath) -> set[str]:
+    return {
+        os.path.relpath(os.path.join(directory_path, file_name), directory)
+        for directory_path, _, file_names in os.walk(directory)
+        for file_name in file_names
+        if file_name != MANIFEST_FILE_NAME
+    }
+
+
+def test_sync_copies_every_file(source: PosixPath, tmp_path: PosixPath) -> None:
+    target = PosixPath(tmp_path, "target")
+
+    result = sync_resource_tree(source, target)
+
+    assert set(result.copied) == _files(source) == _files(target)
+    assert result.deleted == []
+    assert ResourceManifest.load(PosixPath(target, MANIFEST_FILE_NAME)) is not None
+
+
+def test_sync_of_unchanged_resources_copies_nothing(
+    source: PosixPath, tmp_path: PosixPath
+) -> None:
+    target = PosixPath(tmp_path, "target")
+    _ = sync_resource_tree(source, target)
+
+    result = sync_resource_tree(source, target)
+
+    assert result.copied == []
+    assert result.unchanged == len(_files(source))
+
+
+def test_sync_copies_only_the_changed_files(
+    source: PosixPath, tmp_path: PosixPath
+) -> None:
+    target = PosixPath(tmp_path, "target")
+    _ = sync_resource_tree(source, target)
+
+    _ = PosixPath(source, "init.zsh").write_text(
+        "source plugins/git/git.zsh # changed\n"
+    )
+    PosixPath(source, "plugins", "git", "README.md").unlink()
+    result = sync_resource_tree(source, target)
+
+    assert result.copied == ["init.zsh"]
+    assert result.deleted == ["plugins/git/README.md"]
+    assert PosixPath(target, "init.zsh").read_text().endswith("# changed\n")
+    assert not PosixPath(target, "plugins", "git", "README.md").exists()
+
+
+def test_sync_repairs_damaged_files(source: PosixPath, tmp_path: PosixPath) -> None:
+    target = PosixPath(tmp_path, "target")
+    _ = sync_resource_tree(source, target)
+
+    PosixPath(target, "init.zsh").unlink()
+    _ = PosixPath(target, "plugins", "git", "git.zsh").write_text("edited by hand\n")
+    result = sync_resource_tree(source, target)
+
+    assert sorted(result.copied) == ["init.zsh", "plugins/git/git.zsh"]
+    assert _files(target) == _files(source)
+    assert PosixPath(target, "plugins", "git", "git.zsh").read_text() == "alias g=git\n"
+
+
+def test_sync_keeps_files_of_the_user(source: PosixPath, tmp_path: PosixPath) -> None:
+    target = PosixPath(tmp_path, "target")
+    _ = sync_resource_tree(source, target)
+
+    _ = PosixPath(target, "mine.zsh").write_text("mine\n")
+    _ = PosixPath(source, "init.zsh").write_text("changed, so the sync runs again\n")
+    _ = sync_resource_tree(source, target)
+
+    assert PosixPath(target, "mine.zsh").read_text() == "mine\n"
+
+
+def test_sync_deploys_only_the_selection(
+    source: PosixPath, tmp_path: PosixPath
+) -> None:
+    target = PosixPath(tmp_path, "target")
+    _ = sync_resource_tree(source, target)
+
+    result = sync_resource_tree(
+        source, target, selection=ResourceSelection(paths=("plugins/",))
+    )
+
+    assert _files(target) == {"plugins/git/git.zsh"}
+    assert sorted(result.deleted) == [
+        "init.zsh",
+        "plugins/git/README.md",
+        "plugins/git/tests/test.zsh",
+    ]
+
+
+def test_link_replaces_the_copied_resources(
+    source: PosixPath, tmp_path: PosixPath
+) -> None:
+    target = PosixPath(tmp_path, "target")
+    _ = sync_resource_tree(source, target)
+
+    result = link_resource_tree(source, target, ("plugins",))
+
+    assert PosixPath(target, "init.zsh").is_symlink()
+    assert PosixPath(target, "plugins").is_dir()
+    assert not PosixPath(target, "plugins").is_symlink()
+    assert PosixPath(target, "plugins", "git").is_symlink()
+    assert not PosixPath(target, MANIFEST_FILE_NAME).exists()
+    assert "init.zsh" in result.linked
+
+
+def test_link_of_a_missing_tree_keeps_the_copied_resources(
+    source: PosixPath, tmp_path: PosixPath
+) -> None:
+    target = PosixPath(tmp_path, "target")
+    _ = sync_resource_tree(source, target)
+
+    with pytest.raises(FileNotFoundError):
+        _ = link_resource_tree(PosixPath(tmp_path, "missing"), target, ("plugins",))
+
+    assert _files(target) == _files(source)
+    assert PosixPath(target, MANIFEST_FILE_NAME).exists()
@@ -1,4 +1,19 @@
+from typing import TYPE_CHECKING
+
 from .find_executable import find_executable
-from .logger import setup_logger
+
+if TYPE_CHECKING:
+    from .logger import setup_logger
+
+
+def __getattr__(name: str):
+    # The logging configuration pulls in the resources machinery, so it is only imported when the logger is set up
+    if name == "setup_logger":
+        from .logger import setup_logger
+
+        return setup_logger
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = ["find_executable", "setup_logger"]
@@ -0,0 +1,58 @@
+import os
+import stat
+import tempfile
+from enum import StrEnum
+from pathlib import PosixPath
+
+DEFAULT_FILE_MODE: int = 0o644
+
+
+class FsyncPolicy(StrEnum):
+    NONE = "none"
+    "Leave flushing to the operating system (the fastest, a crash can lose the new content)"
+
+    FILE = "file"
+    "Flush the content of the file before it replaces the old file, so a crash leaves either the old or the new file"
+
+    FULL = "full"
+    "Flush the content of the file and the directory, so the new file survives a crash once the write returns"
+
+
+def atomic_write(
+    path: PosixPath, data: bytes, fsync_policy: FsyncPolicy = FsyncPolicy.FILE
+) -> None:
+    """
+    Writes the whole file with a single write to a temporary file, which then replaces the file.
+    Readers (and crashes) only ever see the old or the new content, never a partial file.
+    If the path is a symlink the file it points to is replaced, so the symlink is kept
+    """
+    target_path = PosixPath(os.path.realpath(path))
+
+    try:
+        mode = stat.S_IMODE(target_path.stat().st_mode)
+    except FileNotFoundError:
+        mode = DEFAULT_FILE_MODE
+
+    file_descriptor, temporary_path = tempfile.mkstemp(
+        dir=target_path.parent, prefix=f".{target_path.name}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(file_descriptor, "wb") as temporary_file:
+            _ = temporary_file.write(data)
+            temporary_file.flush()
+            os.fchmod(temporary_file.fileno(), mode)
+
+            if fsync_policy != FsyncPolicy.NONE:
+                os.fsync(temporary_file.fileno())
+
+        os.replace(temporary_path, target_path)
+    except BaseException:
+        PosixPath(temporary_path).unlink(missing_ok=True)
+        raise
+
+    if fsync_policy == FsyncPolicy.FULL:
+        directory_descriptor = os.open(target_path.parent, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(directory_descriptor)
+        finally:
+            os.close(directory_descriptor)
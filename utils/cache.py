@@ -0,0 +1,65 @@
+import hashlib
+import os
+import sys
+from pathlib import PosixPath
+
+from utils.atomic_write import FsyncPolicy, atomic_write
+
+
+CACHE_DIRECTORY_ENV: str = "CONFIGOLD_CACHE_DIR"
+DISABLE_CACHE_ENV: str = "CONFIGOLD_NO_CACHE"
+
+
+def cache_directory(*parts: str) -> PosixPath | None:
+    """
+    The directory configold keeps its on-disk caches in, or None if caching on disk is disabled
+    (by setting the CONFIGOLD_NO_CACHE environment variable)
+    """
+    if os.getenv(DISABLE_CACHE_ENV):
+        return None
+
+    base_directory = os.getenv(CACHE_DIRECTORY_ENV)
+    if base_directory:
+        return PosixPath(base_directory, *parts)
+
+    xdg_cache_home = os.getenv("XDG_CACHE_HOME") or PosixPath(
+        os.getenv("HOME", "~"), ".cache"
+    )
+    return PosixPath(xdg_cache_home, "configold", *parts)
+
+
+def module_source_hash(*module_names: str) -> str | None:
+    """
+    Hashes the source of the given (already imported) modules, so caches can be invalidated when the code changes.
+    Returns None if the source of any of the modules can not be read
+    """
+    digest = hashlib.sha256()
+
+    for module_name in sorted(set(module_names)):
+        module = sys.modules.get(module_name)
+        loader = getattr(getattr(module, "__spec__", None), "loader", None)
+        module_file: str | None = getattr(module, "__file__", None)
+
+        if module_file is None or not hasattr(loader, "get_data"):
+            return None
+
+        try:
+            digest.update(
+                loader.get_data(module_file)
+            )  # pyright: ignore[reportOptionalMemberAccess]
+        except OSError:
+            return None
+
+    return digest.hexdigest()
+
+
+def write_cache_file(path: PosixPath, data: bytes) -> None:
+    """
+    Writes a cache file atomically, so a concurrent reader never sees a partial file.
+    Failing to write a cache is never an error, the cache will just be rebuilt the next time
+    """
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write(path, data, FsyncPolicy.NONE)
+    except OSError:
+        return
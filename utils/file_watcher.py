@@ -0,0 +1,290 @@
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import time
+from pathlib import PosixPath
+
+# The inotify constants (see inotify(7))
+IN_MODIFY: int = 0x00000002
+IN_ATTRIB: int = 0x00000004
+IN_CLOSE_WRITE: int = 0x00000008
+IN_MOVED_FROM: int = 0x00000040
+IN_MOVED_TO: int = 0x00000080
+IN_CREATE: int = 0x00000100
+IN_DELETE: int = 0x00000200
+IN_DELETE_SELF: int = 0x00000400
+IN_MOVE_SELF: int = 0x00000800
+IN_Q_OVERFLOW: int = 0x00004000
+IN_ISDIR: int = 0x40000000
+WATCH_MASK: int = (
+    IN_MODIFY
+    | IN_ATTRIB
+    | IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+    | IN_MOVE_SELF
+)
+EVENT_HEADER: struct.Struct = struct.Struct("iIII")
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+def _is_watched(path: PosixPath, watched_paths: list[PosixPath]) -> bool:
+    return any(
+        path == watched_path or path.is_relative_to(watched_path)
+        for watched_path in watched_paths
+    )
+
+
+def _existing_directory(path: PosixPath) -> PosixPath:
+    """
+    The directory to watch for a path: the path itself if it is a directory, otherwise its closest existing parent
+    (so files that are replaced atomically, or do not exist yet, are still noticed)
+    """
+    while not path.is_dir() and path != path.parent:
+        path = path.parent
+
+    return path
+
+
+class FileWatcher:
+    """
+    Watches files and directories (recursively) for changes, with inotify when it is available and by polling otherwise
+    """
+
+    def __init__(
+        self,
+        paths: list[PosixPath],
+        debounce: float = 0.2,
+        poll_interval: float = 1.0,
+        use_inotify: bool = True,
+    ) -> None:
+        """
+        Changes are reported once they have been quiet for `debounce` seconds, so a burst of writes is reported once
+        """
+        self.paths: list[PosixPath] = [
+            PosixPath(os.path.abspath(path)) for path in paths
+        ]
+        self.debounce: float = debounce
+        self.poll_interval: float = poll_interval
+
+        self._file_descriptor: int | None = None
+        self._watches: dict[int, PosixPath] = {}
+        self._snapshot: dict[PosixPath, tuple[int, int]] = {}
+
+        if use_inotify:
+            self._file_descriptor = self._init_inotify()
+
+        if self._file_descriptor is None:
+            self._snapshot = self._take_snapshot()
+
+    @property
+    def uses_inotify(self) -> bool:
+        return self._file_descriptor is not None
+
+    def close(self) -> None:
+        if self._file_descriptor is not None:
+            os.close(self._file_descriptor)
+            self._file_descriptor = None
+
+    def _init_inotify(self) -> int | None:
+        try:
+            libc = ctypes.CDLL(
+                ctypes.util.find_library("c") or "libc.so.6", use_errno=True
+            )
+            file_descriptor: int = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        except (OSError, AttributeError):
+            logger.info("inotify is not available, polling for changes instead")
+            return None
+
+        if file_descriptor < 0:
+            logger.info(
+                "inotify is not available (%s), polling for changes instead",
+                os.strerror(ctypes.get_errno()),
+            )
+            return None
+
+        self._libc: ctypes.CDLL = libc
+        self._file_descriptor = file_descriptor
+        for path in self.paths:
+            # The parent is watched as well, so replaced (or recreated) files and directories are noticed
+            if not self._add_watches(
+                _existing_directory(path.parent), recursive=False
+            ) or (path.is_dir() and not self._add_watches(path, recursive=True)):
+                os.close(file_descriptor)
+                self._file_descriptor = None
+                return None
+
+        return file_descriptor
+
+    def _is_relevant_directory(self, directory: PosixPath) -> bool:
+        """
+        Whether a new directory has to be watched: it is watched itself, or one of the watched paths may be created inside of it
+        """
+        return _is_watched(directory, self.paths) or any(
+            path.is_relative_to(directory) for path in self.paths
+        )
+
+    def _add_watches(self, directory: PosixPath, recursive: bool) -> bool:
+        directories = [directory]
+        if recursive:
+            directories += [
+                PosixPath(directory_path, directory_name)
+                for directory_path, directory_names, _ in os.walk(directory)
+                for directory_name in directory_names
+            ]
+
+        for watched_directory in directories:
+            watch_descriptor: int = self._libc.inotify_add_watch(
+                self._file_descriptor, os.fsencode(watched_directory), WATCH_MASK
+            )
+            if watch_descriptor < 0:
+                # Usually the limit of watches was reached (fs.inotify.max_user_watches)
+                logger.warning(
+                    "Could not watch %s (%s), polling for changes instead",
+                    watched_directory,
+                    os.strerror(ctypes.get_errno()),
+                )
+                return False
+
+            self._watches[watch_descriptor] = watched_directory
+
+        return True
+
+    def _read_events(self, timeout: float | None) -> set[PosixPath] | None:
+        """
+        Reads the pending inotify events (waiting up to the timeout for them), None if the events overflowed
+        """
+        assert self._file_descriptor is not None
+
+        readable, _, _ = select.select([self._file_descriptor], [], [], timeout)
+        if len(readable) == 0:
+            return set()
+
+        changed_paths: set[PosixPath] = set()
+        while True:
+            try:
+                data = os.read(self._file_descriptor, 64 * 1024)
+            except BlockingIOError:
+                return changed_paths
+
+            offset = 0
+            while offset < len(data):
+                watch_descriptor, mask, _, name_length = EVENT_HEADER.unpack_from(
+                    data, offset
+                )
+                offset += EVENT_HEADER.size
+                name = data[offset : offset + name_length].rstrip(b"\0")
+                offset += name_length
+
+                if mask & IN_Q_OVERFLOW:
+                    return None
+
+                directory = self._watches.get(watch_descriptor)
+                if directory is None:
+                    continue
+
+                path = PosixPath(directory, os.fsdecode(name)) if name else directory
+                if (
+                    mask & IN_ISDIR
+                    and mask & (IN_CREATE | IN_MOVED_TO)
+                    and self._is_relevant_directory(path)
+                ):
+                    # New directories are watched as well (including what was created in them before the watch)
+                    _ = self._add_watches(path, recursive=True)
+                    changed_paths.update(
+                        file_path
+                        for directory_path, _, file_names in os.walk(path)
+                        for file_name in file_names
+                        if _is_watched(
+                            file_path := PosixPath(directory_path, file_name),
+                            self.paths,
+                        )
+                    )
+
+                if _is_watched(path, self.paths):
+                    changed_paths.add(path)
+
+    def _take_snapshot(self) -> dict[PosixPath, tuple[int, int]]:
+        snapshot: dict[PosixPath, tuple[int, int]] = {}
+
+        for path in self.paths:
+            file_paths = (
+                [
+                    PosixPath(directory_path, file_name)
+                    for directory_path, _, file_names in os.walk(path)
+                    for file_name in file_names
+                ]
+                if path.is_dir()
+                else [path]
+            )
+
+            for file_path in file_paths:
+                try:
+                    file_stat = file_path.stat()
+                except OSError:
+                    continue
+
+                snapshot[file_path] = (file_stat.st_mtime_ns, file_stat.st_size)
+
+        return snapshot
+
+    def _poll(self) -> set[PosixPath]:
+        snapshot = self._take_snapshot()
+        changed_paths = {
+            path
+            for path in snapshot.keys() | self._snapshot.keys()
+            if snapshot.get(path) != self._snapshot.get(path)
+        }
+        self._snapshot = snapshot
+        return changed_paths
+
+    def _collect(self, timeout: float | None) -> set[PosixPath] | None:
+        if self._file_descriptor is not None:
+            return self._read_events(timeout)
+
+        time.sleep(self.poll_interval if timeout is None else timeout)
+        return self._poll()
+
+    def wait(self, timeout: float | None = None) -> set[PosixPath] | None:
+        """
+        Waits for changes and returns the changed paths once the changes stopped for the debounce period
+        (an empty set if nothing changed before the timeout, None if changes were lost and everything should be refreshed)
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        changed_paths: set[PosixPath] = set()
+
+        while len(changed_paths) == 0:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return set()
+
+            if self._file_descriptor is None:
+                remaining = (
+                    self.poll_interval
+                    if remaining is None
+                    else min(remaining, self.poll_interval)
+                )
+
+            collected = self._collect(remaining)
+            if collected is None:
+                return None
+
+            changed_paths |= collected
+
+        # Debouncing: a burst of changes is reported once, after it is quiet for a while
+        while True:
+            collected = self._collect(self.debounce)
+            if collected is None:
+                return None
+
+            if len(collected) == 0:
+                return changed_paths
+
+            changed_paths |= collected
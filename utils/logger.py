@@ -2,14 +2,26 @@ import logging
 import logging.config
 from typing import Any
 
-import yaml
+from utils.resources import package_resource
+from utils.state import state_directory
+
 
 def setup_logger(console=True):
-    with open("logger.yml", "r") as f:
-        config: dict[str, Any] = yaml.safe_load(f.read())
+    import yaml
+
+    config: dict[str, Any] = yaml.safe_load(
+        package_resource("utils", "logger.yml").read_text()
+    )
+
+    # The log file is kept in the state directory, so it does not depend on where configold was started from
+    log_directory = state_directory()
+    log_directory.mkdir(parents=True, exist_ok=True)
+    config['handlers']['file']['filename'] = str(
+        log_directory / config['handlers']['file']['filename']
+    )
 
-        if console:
-            config['root']['handlers'].append('console')
-            config['loggers']['app']['handlers'].append('console')
+    if console:
+        config['root']['handlers'].append('console')
+        config['loggers']['app']['handlers'].append('console')
 
-        logging.config.dictConfig(config)
+    logging.config.dictConfig(config)
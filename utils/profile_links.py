@@ -0,0 +1,163 @@
+import json
+import os
+import shutil
+from pathlib import PosixPath
+
+from utils.state import config_directory, data_directory
+
+# Only the standard library is used here, so switching a profile is fast enough to run in a login hook
+PROFILES_DIRECTORY_NAME: str = "profiles"
+ACTIVE_PROFILE_LINK_NAME: str = "current"
+MANIFEST_FILE_NAME: str = "manifest.json"
+
+
+def profiles_directory(*parts: str) -> PosixPath:
+    """
+    The directory the profiles are rendered into, every profile gets its own directory (mirroring the home directory)
+    """
+    return data_directory(PROFILES_DIRECTORY_NAME, *parts)
+
+
+def profile_source_path(name: str) -> PosixPath:
+    """
+    The configuration a profile is rendered from (in the same format as the saved profile)
+    """
+    return config_directory(
+        PROFILES_DIRECTORY_NAME, f"{validate_profile_name(name)}.yaml"
+    )
+
+
+def validate_profile_name(name: str) -> str:
+    if (
+        not name
+        or name.startswith(".")
+        or "/" in name
+        or name == ACTIVE_PROFILE_LINK_NAME
+    ):
+        raise ValueError(f"Invalid profile name: {name!r}")
+
+    return name
+
+
+def profile_directory(name: str) -> PosixPath:
+    return profiles_directory(validate_profile_name(name))
+
+
+def active_link_path() -> PosixPath:
+    return profiles_directory(ACTIVE_PROFILE_LINK_NAME)
+
+
+def linked_path(relative_path: str) -> PosixPath:
+    """
+    Where a configuration file is linked to, through the active profile (so switching the active profile switches every file at once)
+    """
+    return PosixPath(active_link_path(), relative_path)
+
+
+def read_manifest(name: str) -> dict[str, str]:
+    """
+    The files of a rendered profile: the path of every configuration file, mapped to its path inside of the profile
+    """
+    manifest_path = PosixPath(profile_directory(name), MANIFEST_FILE_NAME)
+
+    try:
+        with open(manifest_path, "r") as manifest_file:
+            manifest: dict[str, dict[str, str]] = json.load(manifest_file)
+    except FileNotFoundError:
+        raise LookupError(f"The profile {name} was not built") from None
+
+    return manifest["files"]
+
+
+def list_profiles() -> list[str]:
+    try:
+        entries = os.scandir(profiles_directory())
+    except FileNotFoundError:
+        return []
+
+    with entries:
+        return sorted(
+            entry.name
+            for entry in entries
+            if entry.name != ACTIVE_PROFILE_LINK_NAME
+            and os.path.isfile(os.path.join(entry.path, MANIFEST_FILE_NAME))
+        )
+
+
+def active_profile() -> str | None:
+    try:
+        return os.path.basename(os.readlink(active_link_path()))
+    except OSError:
+        return None
+
+
+def is_linked(config_path: str | PosixPath, relative_path: str) -> bool:
+    try:
+        return os.readlink(config_path) == linked_path(relative_path).as_posix()
+    except OSError:
+        return False
+
+
+def replace_symlink(link_path: PosixPath, target: str | PosixPath) -> None:
+    """
+    Points the link at the target atomically, the link is either the old or the new one (never missing)
+    """
+    temporary_path = PosixPath(link_path.parent, f".{link_path.name}.{os.getpid()}.tmp")
+    try:
+        os.unlink(temporary_path)
+    except FileNotFoundError:
+        pass
+
+    os.symlink(target, temporary_path)
+    os.replace(temporary_path, link_path)
+
+
+def switch_profile(name: str) -> None:
+    """
+    Makes a rendered profile the active one, with a single atomic swap of the active profile link.
+    The configuration files must already be linked through the active profile (building a profile links them)
+    """
+    unlinked_paths = [
+        config_path
+        for config_path, relative_path in read_manifest(name).items()
+        if not is_linked(config_path, relative_path)
+    ]
+    if len(unlinked_paths) != 0:
+        raise LookupError(
+            f"These files are not linked to the profiles, build the profile to link them: {", ".join(unlinked_paths)}"
+        )
+
+    # The link is relative, so the profiles directory can be moved as a whole
+    replace_symlink(active_link_path(), validate_profile_name(name))
+
+
+def deactivate_profile() -> list[str]:
+    """
+    Replaces the links through the active profile with copies of the files they point to, and removes the active profile link.
+    Returns the configuration files that were replaced (a link to a file the profile does not have, e.g. a compiled zshrc, is removed)
+    """
+    name = active_profile()
+    if name is None:
+        raise LookupError("There is no active profile")
+
+    replaced_paths: list[str] = []
+    for config_path, relative_path in read_manifest(name).items():
+        if not is_linked(config_path, relative_path):
+            continue
+
+        source_path = linked_path(relative_path)
+        if not source_path.exists():
+            os.unlink(config_path)
+            continue
+
+        # Copied next to the link and moved over it, so the file is never missing
+        temporary_path = PosixPath(
+            os.path.dirname(config_path),
+            f".{os.path.basename(config_path)}.{os.getpid()}.tmp",
+        )
+        _ = shutil.copy2(source_path, temporary_path)
+        os.replace(temporary_path, config_path)
+        replaced_paths.append(config_path)
+
+    os.unlink(active_link_path())
+    return replaced_paths
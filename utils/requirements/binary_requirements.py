@@ -1,6 +1,5 @@
 import logging
-import sys
-from typing import Generic, TypeVar, override
+from typing import Any, Generic, TypeVar, override
 
 from pydantic import GetCoreSchemaHandler
 from pydantic_core import CoreSchema, core_schema
@@ -10,6 +9,16 @@ from utils import find_executable
 T = TypeVar("T")
 
 
+class MissingBinariesError(Exception):
+    """
+    Raised when binaries an application must have are not in the PATH
+    """
+
+    def __init__(self, binaries: list[str]) -> None:
+        super().__init__(f"Missing binaries: {", ".join(binaries)}")
+        self.binaries: list[str] = binaries
+
+
 class BinaryRequirement(Generic[T]):
     """
     Used for enforcing requirements that rely on specific binaries to be in the PATH, intended to be used as a string
@@ -43,15 +52,62 @@ class BinaryRequirement(Generic[T]):
         )
         if self.must_have:
             self.logger.fatal(missing_message)
-            sys.exit(1)
+            raise MissingBinariesError(missing_binaries)
 
         self.logger.warning(missing_message)
 
+    @override
+    def __eq__(self, other: object) -> bool:
+        # Compared by value, so a requirement equal to the default is recognized as the default
+        if not isinstance(other, BinaryRequirement):
+            return NotImplemented
+
+        return (self.value, self.binaries, self.must_have) == (
+            other.value,
+            other.binaries,
+            other.must_have,
+        )
+
+    @override
+    def __hash__(self) -> int:
+        return hash((self.value, tuple(self.binaries), self.must_have))
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "value": self.value,
+            "binaries": self.binaries,
+            "must_have": self.must_have,
+        }
+
     @classmethod
     def __get_pydantic_core_schema__(
         cls, source_type, handler: GetCoreSchemaHandler
     ) -> CoreSchema:
-        return core_schema.no_info_after_validator_function(cls, handler(str))
+        # A requirement is given either as an instance, or as a mapping of its arguments (e.g. when loaded from a file)
+        from_mapping_schema = core_schema.no_info_after_validator_function(
+            lambda raw_requirement: cls(**raw_requirement),
+            core_schema.typed_dict_schema(
+                {
+                    "value": core_schema.typed_dict_field(handler(str)),
+                    "binaries": core_schema.typed_dict_field(
+                        core_schema.list_schema(core_schema.str_schema())
+                    ),
+                    "must_have": core_schema.typed_dict_field(
+                        core_schema.bool_schema(), required=False
+                    ),
+                }
+            ),
+        )
+
+        return core_schema.json_or_python_schema(
+            json_schema=from_mapping_schema,
+            python_schema=core_schema.union_schema(
+                [core_schema.is_instance_schema(cls), from_mapping_schema]
+            ),
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                lambda requirement: requirement.to_dict()
+            ),
+        )
 
     @override
     def __str__(self) -> str:
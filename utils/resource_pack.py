@@ -0,0 +1,195 @@
+import hashlib
+import json
+import os
+import struct
+import zlib
+from collections.abc import Iterable
+from dataclasses import dataclass
+from functools import cache
+from importlib.resources.abc import Traversable
+from pathlib import Path, PosixPath
+
+from utils.atomic_write import FsyncPolicy, atomic_write
+from utils.resource_sync import (
+    ManifestEntry,
+    ResourceManifest,
+    ResourceSelection,
+    SyncResult,
+    sync_manifest,
+    walk_resources,
+)
+from utils.resources import package_resource
+
+PACK_MAGIC: bytes = b"CFGPACK1"
+PACK_FILE_NAME: str = "resources.pack"
+"The packed resources of an application, next to where its resources directory would be"
+
+_INDEX_LENGTH: struct.Struct = struct.Struct("<Q")
+
+
+@dataclass(frozen=True)
+class PackMember:
+    offset: int
+    "Where the member's data starts (relative to the end of the index)"
+
+    stored_size: int
+    "The size of the data in the pack, the data is compressed only when it is smaller than the file"
+
+    size: int
+    mode: int
+    digest: str
+
+
+class ResourcePack:
+    """
+    A resource tree packed into a single file: a compact index of the members (their offsets, sizes, permissions and
+    digests) followed by their data. The index is read once, and the members are read by seeking to them,
+    so extracting a few members does not read the rest of the pack
+    """
+
+    def __init__(self, pack: Traversable) -> None:
+        self.pack: Traversable = pack
+
+        with pack.open("rb") as pack_file:
+            header = pack_file.read(len(PACK_MAGIC) + _INDEX_LENGTH.size)
+            if not header.startswith(PACK_MAGIC):
+                raise ValueError(f"{pack} is not a resource pack")
+
+            (index_length,) = _INDEX_LENGTH.unpack_from(header, len(PACK_MAGIC))
+            raw_index = json.loads(zlib.decompress(pack_file.read(index_length)))
+
+        self.data_offset: int = len(header) + index_length
+        self.version: str = raw_index["version"]
+        self.members: dict[str, PackMember] = {
+            relative_path: PackMember(*fields)
+            for relative_path, fields in raw_index["members"].items()
+        }
+
+    def manifest(self) -> ResourceManifest:
+        # The digests were computed when the pack was built
+        return ResourceManifest(
+            self.version,
+            {
+                relative_path: ManifestEntry(member.size, 0, member.digest)
+                for relative_path, member in self.members.items()
+            },
+        )
+
+    @staticmethod
+    def _member_data(member: PackMember, stored_data: bytes) -> bytes:
+        if member.stored_size == member.size:
+            return stored_data
+
+        return zlib.decompress(stored_data)
+
+    def extract(self, relative_paths: Iterable[str], target: PosixPath) -> None:
+        """
+        Extracts the members into the target directory (their directories have to exist already).
+        The members are read in the order they are packed in, so the pack is read forward only
+        """
+        members = sorted(
+            (
+                (self.members[relative_path], relative_path)
+                for relative_path in relative_paths
+            ),
+            key=lambda member: member[0].offset,
+        )
+        if len(members) == 0:
+            return
+
+        with self.pack.open("rb") as pack_file:
+            for member, relative_path in members:
+                _ = pack_file.seek(self.data_offset + member.offset)
+                data = self._member_data(member, pack_file.read(member.stored_size))
+
+                target_path = PosixPath(target, relative_path)
+                with open(target_path, "wb") as target_file:
+                    _ = target_file.write(data)
+
+                target_path.chmod(member.mode)
+
+
+def build_resource_pack(source: Path, output_path: PosixPath) -> int:
+    """
+    Packs a resource tree (symbolic links are followed, the same as when it is copied), returns how many files were packed
+    """
+    members: dict[str, list[int | str]] = {}
+    data_parts: list[bytes] = []
+    # Files with the same content (e.g. reached through symbolic links) share their data
+    stored_by_digest: dict[str, tuple[int, int]] = {}
+    offset = 0
+
+    for relative_path, resource in walk_resources(source):
+        data = resource.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()
+
+        if digest not in stored_by_digest:
+            compressed_data = zlib.compress(data, 9)
+            stored_data = compressed_data if len(compressed_data) < len(data) else data
+            stored_by_digest[digest] = (offset, len(stored_data))
+            data_parts.append(stored_data)
+            offset += len(stored_data)
+
+        member_offset, stored_size = stored_by_digest[digest]
+        members[relative_path] = [
+            member_offset,
+            stored_size,
+            len(data),
+            os.stat(resource).st_mode & 0o777,
+            digest,
+        ]
+
+    index = json.dumps(
+        {
+            "version": hashlib.sha256(
+                json.dumps(members, sort_keys=True).encode()
+            ).hexdigest(),
+            "members": members,
+        },
+        separators=(",", ":"),
+    ).encode()
+    compressed_index = zlib.compress(index, 9)
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    atomic_write(
+        output_path,
+        b"".join(
+            [PACK_MAGIC, _INDEX_LENGTH.pack(len(compressed_index)), compressed_index]
+            + data_parts
+        ),
+        FsyncPolicy.NONE,
+    )
+    return len(members)
+
+
+@cache
+def shipped_resource_pack(app_name: str) -> ResourcePack | None:
+    """
+    The packed resources shipped with an application (e.g. inside of the zipapp), None if its resources are not packed.
+    The index is only read once per process
+    """
+    pack = package_resource("apps", app_name, PACK_FILE_NAME)
+    if not pack.is_file():
+        return None
+
+    return ResourcePack(pack)
+
+
+def sync_resource_pack(
+    pack: ResourcePack,
+    target: PosixPath,
+    fsync_policy: FsyncPolicy = FsyncPolicy.NONE,
+    selection: ResourceSelection | None = None,
+) -> SyncResult:
+    """
+    Deploys packed resources to the target directory by the pack's index (see `sync_manifest`), only the new and the
+    changed members are extracted
+    """
+    return sync_manifest(
+        pack.version,
+        pack.manifest,
+        pack.extract,
+        target,
+        fsync_policy,
+        selection,
+    )
@@ -0,0 +1,616 @@
+import fnmatch
+import hashlib
+import itertools
+import json
+import os
+import re
+import stat
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from importlib.resources.abc import Traversable
+from pathlib import Path, PosixPath
+
+from utils.atomic_write import FsyncPolicy, atomic_write
+from utils.cache import cache_directory, write_cache_file
+from utils.resources import copy_resource_file, resource_tree_version
+
+MANIFEST_FILE_NAME: str = ".configold-manifest.json"
+"The manifest of the deployed resources, kept inside of the directory they are deployed to"
+
+SYNC_BATCH_SIZE: int = 64
+"How many files a worker copies (or hashes) at once, small files are not worth a task of their own"
+
+NON_RUNTIME_DIRECTORIES: frozenset[str] = frozenset(
+    {".github", ".devcontainer", "test", "tests", "spec", "docs", "images", "img"}
+)
+"Directories the shells never load (the repositories' tests, documentation and so on)"
+
+NON_RUNTIME_FILES: tuple[str, ...] = (
+    "README*",
+    "CHANGELOG*",
+    "CONTRIBUTING*",
+    "*.md",
+    "*.png",
+    "*.gif",
+    "*.jpg",
+    "*.jpeg",
+    "*.svg",
+    "*.webp",
+)
+"Files the shells never load (the licenses are kept)"
+
+_NON_RUNTIME_FILE_PATTERN: re.Pattern[str] = re.compile(
+    "|".join(fnmatch.translate(pattern) for pattern in NON_RUNTIME_FILES)
+)
+
+
+@dataclass(frozen=True)
+class ResourceSelection:
+    """
+    The part of a resource tree that is deployed: the files and directories the configuration uses, without the files
+    that are never loaded at runtime
+    """
+
+    paths: tuple[str, ...]
+    "The selected files and directories (relative to the resource tree, the directories end with a `/`)"
+
+    excluded_paths: tuple[str, ...] = ()
+    "Parts of the selected directories that are not deployed, unless a more specific path inside of them is selected"
+
+    strip_non_runtime: bool = True
+
+    def includes(self, relative_path: str) -> bool:
+        selected_path = max(
+            (path for path in self.paths if relative_path.startswith(path)),
+            key=len,
+            default=None,
+        )
+        if selected_path is None or any(
+            relative_path.startswith(excluded_path)
+            and len(excluded_path) > len(selected_path)
+            for excluded_path in self.excluded_paths
+        ):
+            return False
+
+        if not self.strip_non_runtime:
+            return True
+
+        *directories, name = relative_path.split("/")
+        return (
+            NON_RUNTIME_DIRECTORIES.isdisjoint(directories)
+            and _NON_RUNTIME_FILE_PATTERN.match(name) is None
+        )
+
+    @property
+    def version(self) -> str:
+        return hashlib.sha256(
+            json.dumps(
+                [
+                    sorted(self.paths),
+                    sorted(self.excluded_paths),
+                    self.strip_non_runtime,
+                ]
+            ).encode()
+        ).hexdigest()
+
+
+@dataclass(frozen=True)
+class ManifestEntry:
+    size: int
+    mtime_ns: int
+    "The modification time of the source file (0 inside of the zipapp), to tell if its digest has to be computed again"
+
+    digest: str
+
+
+@dataclass
+class ResourceManifest:
+    """
+    Every file of a resource tree by its path (relative to the tree), with its size, modification time and sha256
+    """
+
+    version: str
+    "The version of the resource tree the manifest was built from (see `resource_tree_version`)"
+
+    files: dict[str, ManifestEntry] = field(default_factory=dict)
+
+    def to_json(self) -> bytes:
+        return json.dumps(
+            {
+                "version": self.version,
+                # Lists instead of objects, the manifest of the zsh resources has thousands of entries
+                "files": {
+                    relative_path: [entry.size, entry.mtime_ns, entry.digest]
+                    for relative_path, entry in self.files.items()
+                },
+            },
+            separators=(",", ":"),
+        ).encode()
+
+    @classmethod
+    def from_json(cls, data: bytes) -> "ResourceManifest":
+        raw_manifest = json.loads(data)
+        return cls(
+            version=raw_manifest["version"],
+            files={
+                relative_path: ManifestEntry(size, mtime_ns, digest)
+                for relative_path, (size, mtime_ns, digest) in raw_manifest[
+                    "files"
+                ].items()
+            },
+        )
+
+    @classmethod
+    def load(cls, path: PosixPath) -> "ResourceManifest | None":
+        """
+        Reads a manifest, None if it does not exist or can not be read (e.g. it was written by an older version)
+        """
+        try:
+            with open(path, "rb") as manifest_file:
+                return cls.from_json(manifest_file.read())
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+
+@dataclass
+class SyncResult:
+    copied: list[str] = field(default_factory=list)
+    "The files that were new or changed (relative to the resources directory)"
+
+    deleted: list[str] = field(default_factory=list)
+    "The deployed files that are no longer in the resources"
+
+    unchanged: int = 0
+    "How many deployed files were already up to date"
+
+    linked: list[str] = field(default_factory=list)
+    "The resources that were linked to a shared resource tree"
+
+
+def walk_resources(
+    resource: Traversable, prefix: str = ""
+) -> list[tuple[str, Traversable]]:
+    """
+    Every file of a resource tree with its relative path (symbolic links are followed, the same as when copying the tree)
+    """
+    if isinstance(resource, Path):
+        resource_files: list[tuple[str, Traversable]] = []
+        for directory_path, directory_names, file_names in os.walk(
+            resource, followlinks=True
+        ):
+            directory_names.sort()
+            relative_directory = os.path.relpath(directory_path, resource)
+
+            for file_name in sorted(file_names):
+                relative_path = (
+                    file_name
+                    if relative_directory == "."
+                    else f"{relative_directory}/{file_name}"
+                )
+                resource_files.append((relative_path, Path(directory_path, file_name)))
+
+        return resource_files
+
+    resource_files = []
+    for child in sorted(resource.iterdir(), key=lambda child: child.name):
+        relative_path = f"{prefix}{child.name}"
+        if child.is_dir():
+            resource_files += walk_resources(child, f"{relative_path}/")
+        else:
+            resource_files.append((relative_path, child))
+
+    return resource_files
+
+
+def _manifest_entry(
+    resource: Traversable, previous_entry: ManifestEntry | None
+) -> ManifestEntry:
+    if isinstance(resource, Path):
+        resource_stat = resource.stat()
+        if (
+            previous_entry is not None
+            and previous_entry.size == resource_stat.st_size
+            and previous_entry.mtime_ns == resource_stat.st_mtime_ns
+        ):
+            return previous_entry
+
+        with resource.open("rb") as resource_file:
+            digest = hashlib.file_digest(resource_file, "sha256").hexdigest()
+
+        return ManifestEntry(resource_stat.st_size, resource_stat.st_mtime_ns, digest)
+
+    with resource.open("rb") as resource_file:
+        data = resource_file.read()
+
+    return ManifestEntry(len(data), 0, hashlib.sha256(data).hexdigest())
+
+
+def _manifest_cache_path(resource: Traversable) -> PosixPath | None:
+    manifests_directory = cache_directory("manifests")
+    if manifests_directory is None:
+        return None
+
+    return PosixPath(
+        manifests_directory, hashlib.sha256(str(resource).encode()).hexdigest()
+    )
+
+
+def resource_manifest(
+    resource: Traversable, version: str | None = None
+) -> ResourceManifest:
+    """
+    The manifest of a resource tree, built once per version of the tree (and kept in the cache directory).
+    When the tree changes only the files whose size or modification time changed are hashed again
+    """
+    version = version or resource_tree_version(resource)
+    cache_path = _manifest_cache_path(resource)
+    cached_manifest = None if cache_path is None else ResourceManifest.load(cache_path)
+    if cached_manifest is not None and cached_manifest.version == version:
+        return cached_manifest
+
+    previous_files = {} if cached_manifest is None else cached_manifest.files
+    resource_files = walk_resources(resource)
+
+    def hash_batch(
+        batch: tuple[tuple[str, Traversable], ...],
+    ) -> list[tuple[str, ManifestEntry]]:
+        return [
+            (relative_path, _manifest_entry(file, previous_files.get(relative_path)))
+            for relative_path, file in batch
+        ]
+
+    manifest = ResourceManifest(version)
+    with ThreadPoolExecutor() as executor:
+        for entries in executor.map(
+            hash_batch, itertools.batched(resource_files, SYNC_BATCH_SIZE)
+        ):
+            manifest.files.update(entries)
+
+    if cache_path is not None:
+        write_cache_file(cache_path, manifest.to_json())
+
+    return manifest
+
+
+def _remove_empty_directories(path: PosixPath, root: PosixPath) -> None:
+    """
+    Removes the empty directories from the path up to (not including) the root
+    """
+    while path != root and path.is_relative_to(root):
+        try:
+            path.rmdir()
+        except OSError:
+            return
+
+        path = path.parent
+
+
+def _is_deployed(path: PosixPath, entry: ManifestEntry) -> bool:
+    try:
+        path_stat = path.lstat()
+    except OSError:
+        return False
+
+    return stat.S_ISREG(path_stat.st_mode) and path_stat.st_size == entry.size
+
+
+def _deploy_paths(
+    relative_paths: list[str],
+    deploy_files: Callable[[Iterable[str], PosixPath], None],
+    target: PosixPath,
+) -> None:
+    if len(relative_paths) == 0:
+        return
+
+    # The directories are created once up front, instead of by every file
+    for relative_directory in sorted(
+        {os.path.dirname(relative_path) for relative_path in relative_paths}
+    ):
+        os.makedirs(PosixPath(target, relative_directory), exist_ok=True)
+
+    for relative_path in relative_paths:
+        target_path = PosixPath(target, relative_path)
+        # A deployed symlink is replaced, instead of writing into the file it points to
+        if target_path.is_symlink():
+            target_path.unlink()
+
+    deploy_files(relative_paths, target)
+
+
+def sync_manifest(
+    version: str,
+    load_manifest: Callable[[], ResourceManifest],
+    deploy_files: Callable[[Iterable[str], PosixPath], None],
+    target: PosixPath,
+    fsync_policy: FsyncPolicy = FsyncPolicy.NONE,
+    selection: ResourceSelection | None = None,
+) -> SyncResult:
+    """
+    Deploys resources to the target directory by their manifest: only the new and the changed files are deployed,
+    and the files a previous sync deployed that are no longer in the resources (or no longer selected) are deleted.
+    When the resources did not change since the last sync, the manifest of the resources is not even loaded: the
+    deployed files are only checked by their size (a stat per file), and the ones that were deleted or edited by hand
+    are deployed again. Files in the target directory that were not deployed by a sync are left alone
+    """
+    result = SyncResult()
+    if selection is not None:
+        version = f"{version}:{selection.version}"
+    manifest_path = PosixPath(target, MANIFEST_FILE_NAME)
+
+    deployed_manifest = ResourceManifest.load(manifest_path)
+    if deployed_manifest is not None and deployed_manifest.version == version:
+        damaged_paths = [
+            relative_path
+            for relative_path, entry in deployed_manifest.files.items()
+            if not _is_deployed(PosixPath(target, relative_path), entry)
+        ]
+        _deploy_paths(damaged_paths, deploy_files, target)
+        result.copied = damaged_paths
+        result.unchanged = len(deployed_manifest.files) - len(damaged_paths)
+        return result
+
+    deployed_files = {} if deployed_manifest is None else deployed_manifest.files
+    manifest = ResourceManifest(
+        version,
+        {
+            relative_path: entry
+            for relative_path, entry in load_manifest().files.items()
+            if selection is None or selection.includes(relative_path)
+        },
+    )
+
+    changed_paths: list[str] = []
+    for relative_path, entry in manifest.files.items():
+        deployed_entry = deployed_files.get(relative_path)
+        if deployed_entry is not None and deployed_entry.digest == entry.digest:
+            result.unchanged += 1
+        else:
+            changed_paths.append(relative_path)
+
+    target.mkdir(parents=True, exist_ok=True)
+    _deploy_paths(changed_paths, deploy_files, target)
+    result.copied = changed_paths
+
+    for relative_path in sorted(deployed_files.keys() - manifest.files.keys()):
+        target_path = PosixPath(target, relative_path)
+        target_path.unlink(missing_ok=True)
+        _remove_empty_directories(target_path.parent, target)
+        result.deleted.append(relative_path)
+
+    # Written last, an interrupted sync is completed by the next one
+    atomic_write(manifest_path, manifest.to_json(), fsync_policy)
+    return result
+
+
+def sync_resource_tree(
+    source: Traversable,
+    target: PosixPath,
+    fsync_policy: FsyncPolicy = FsyncPolicy.NONE,
+    selection: ResourceSelection | None = None,
+) -> SyncResult:
+    """
+    Deploys a resource tree to the target directory by its manifest (see `sync_manifest`),
+    the changed files are copied in parallel batches
+    """
+    tree_version = resource_tree_version(source)
+
+    def copy_batch(batch: tuple[str, ...]) -> None:
+        for relative_path in batch:
+            copy_resource_file(
+                source.joinpath(*relative_path.split("/")),
+                PosixPath(target, relative_path),
+            )
+
+    def copy_files(relative_paths: Iterable[str], _target: PosixPath) -> None:
+        with ThreadPoolExecutor() as executor:
+            # Consumed so the first failing copy is raised
+            _ = list(
+                executor.map(
+                    copy_batch, itertools.batched(relative_paths, SYNC_BATCH_SIZE)
+                )
+            )
+
+    return sync_manifest(
+        tree_version,
+        lambda: resource_manifest(source, tree_version),
+        copy_files,
+        target,
+        fsync_policy,
+        selection,
+    )
+
+
+def _copied_resources(target: PosixPath) -> list[str]:
+    """
+    The files a copying sync deployed (by its manifest), they are replaced by links
+    """
+    deployed_manifest = (
+        None
+        if target.is_symlink()
+        else ResourceManifest.load(PosixPath(target, MANIFEST_FILE_NAME))
+    )
+    return [] if deployed_manifest is None else sorted(deployed_manifest.files)
+
+
+def _remove_copied_resources(
+    target: PosixPath | None, relative_path: str, result: SyncResult
+) -> None:
+    """
+    Deletes the copied files of a resource (a file, or everything under a directory), right before it is linked
+    """
+    if target is None:
+        return
+
+    prefix = "" if relative_path == "." else f"{relative_path}/"
+    for copied_path in result.deleted:
+        if copied_path == relative_path or copied_path.startswith(prefix):
+            copied_file_path = PosixPath(target, copied_path)
+            copied_file_path.unlink(missing_ok=True)
+            _remove_empty_directories(copied_file_path.parent, target)
+
+
+def _link_resource(
+    source: PosixPath,
+    target: PosixPath,
+    relative_path: str,
+    result: SyncResult,
+) -> None:
+    if target.is_symlink():
+        if os.readlink(target) == source.as_posix():
+            result.unchanged += 1
+            return
+
+        target.unlink()
+    elif target.is_dir():
+        try:
+            target.rmdir()
+        except OSError:
+            # The directory has files of the user's own, the rest of it is linked around them
+            if source.is_dir():
+                prefix = "" if relative_path == "." else f"{relative_path}/"
+                # Its copied files were removed along with the directory's
+                _link_directory(source, target, prefix, (), result, None)
+            return
+    elif target.exists():
+        # A file of the user's own is never replaced
+        return
+
+    target.symlink_to(source)
+    result.linked.append(relative_path)
+
+
+def _materialize_resource(
+    source: PosixPath,
+    target: PosixPath,
+    relative_path: str,
+    result: SyncResult,
+) -> None:
+    """
+    Makes a real directory the applications can write to: its files are copied (once, they belong to the user from then on)
+    and its directories are linked
+    """
+    if target.is_symlink():
+        target.unlink()
+
+    target.mkdir(parents=True, exist_ok=True)
+
+    for name in sorted(os.listdir(source)):
+        child_source = PosixPath(source, name)
+        child_target = PosixPath(target, name)
+
+        if child_source.is_dir():
+            _link_resource(
+                child_source, child_target, f"{relative_path}/{name}", result
+            )
+        elif not child_target.exists():
+            copy_resource_file(child_source, child_target)
+            result.copied.append(f"{relative_path}/{name}")
+
+
+def _link_directory(
+    source: PosixPath,
+    target: PosixPath,
+    prefix: str,
+    mutable_paths: tuple[str, ...],
+    result: SyncResult,
+    target_root: PosixPath | None,
+) -> None:
+    names = sorted(os.listdir(source))
+
+    for name in names:
+        relative_path = f"{prefix}{name}"
+        child_source = PosixPath(source, name)
+        child_target = PosixPath(target, name)
+
+        if relative_path in mutable_paths:
+            _remove_copied_resources(target_root, relative_path, result)
+            _materialize_resource(child_source, child_target, relative_path, result)
+        elif any(
+            mutable_path.startswith(f"{relative_path}/")
+            for mutable_path in mutable_paths
+        ):
+            # Only the directories on the way to the mutable resources are real directories
+            if child_target.is_symlink():
+                child_target.unlink()
+
+            child_target.mkdir(exist_ok=True)
+            _link_directory(
+                child_source,
+                child_target,
+                f"{relative_path}/",
+                mutable_paths,
+                result,
+                target_root,
+            )
+        else:
+            _remove_copied_resources(target_root, relative_path, result)
+            _link_resource(child_source, child_target, relative_path, result)
+
+    # The links to resources that are no longer shipped
+    for name in sorted(set(os.listdir(target)) - set(names)):
+        stale_path = PosixPath(target, name)
+        if stale_path.is_symlink() and os.readlink(stale_path).startswith(
+            f"{source.as_posix()}/"
+        ):
+            stale_path.unlink()
+            result.deleted.append(f"{prefix}{name}")
+
+
+def link_resource_tree(
+    source: PosixPath, target: PosixPath, mutable_paths: tuple[str, ...] = ()
+) -> SyncResult:
+    """
+    Deploys a shared (read-only) resource tree by linking to it instead of copying it: the target is a single symbolic link
+    to the tree, or when some of the resources are written to (`mutable_paths`, relative to the tree) a farm of links
+    where only the directories on the way to the mutable resources are real directories.
+    Linking again is cheap, the links that are already in place are kept. Resources that were copied by a sync are
+    replaced one by one, each right before its link is made (nothing is deleted when the tree can not be linked)
+    """
+    if not source.is_dir():
+        raise FileNotFoundError(f"The shared resource tree does not exist: {source}")
+
+    result = SyncResult()
+    result.deleted = _copied_resources(target)
+    manifest_path = PosixPath(target, MANIFEST_FILE_NAME)
+
+    if len(mutable_paths) == 0:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        _remove_copied_resources(target, ".", result)
+        # The whole tree is a single link, it replaces the directory once it is empty
+        manifest_path.unlink(missing_ok=True)
+        _link_resource(source, target, ".", result)
+    else:
+        if target.is_symlink():
+            target.unlink()
+
+        target.mkdir(parents=True, exist_ok=True)
+        _link_directory(source, target, "", mutable_paths, result, target)
+
+    # Removed last, an interrupted linking still knows which files were copied
+    if not target.is_symlink():
+        manifest_path.unlink(missing_ok=True)
+    return result
+
+
+def unlink_resource_tree(source: PosixPath, target: PosixPath) -> None:
+    """
+    Removes the links a linked deployment of the source tree made in the target, so the resources can be copied in their place
+    (writing a copy through the links would write into the shared tree)
+    """
+    if target.is_symlink():
+        if os.readlink(target) == source.as_posix():
+            target.unlink()
+        return
+
+    if not target.is_dir() or PosixPath(target, MANIFEST_FILE_NAME).is_file():
+        # Copied by a sync (or never deployed)
+        return
+
+    for directory_path, directory_names, file_names in os.walk(target):
+        for name in directory_names + file_names:
+            path = PosixPath(directory_path, name)
+            if path.is_symlink() and os.readlink(path).startswith(
+                f"{source.as_posix()}/"
+            ):
+                path.unlink()
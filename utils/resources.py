@@ -0,0 +1,100 @@
+import hashlib
+import os
+import shutil
+from importlib.resources import files
+from importlib.resources.abc import Traversable
+from pathlib import Path, PosixPath
+
+from utils.cache import cache_directory, write_cache_file
+
+
+def package_resource(package: str, *parts: str) -> Traversable:
+    """
+    Locates a resource shipped inside of a package, this works both from a checkout and from inside of the zipapp
+    (regardless of the current working directory)
+    """
+    return files(package).joinpath(*parts)
+
+
+def copy_resource_file(source: Traversable, target: PosixPath) -> None:
+    """
+    Copies a single resource file to the target path (with its permissions, when it is a file on the disk)
+    """
+    if isinstance(source, Path):
+        _ = shutil.copy2(source, target)
+        return
+
+    with source.open("rb") as source_file, open(target, "wb") as target_file:
+        shutil.copyfileobj(source_file, target_file)
+
+
+def _resource_identity(resource: Traversable) -> str | None:
+    """
+    Identifies the current version of a resource by its location, size and modification time (without reading it).
+    Inside of the zipapp the resources only change with the zipapp itself
+    """
+    if isinstance(resource, Path):
+        resource_stat = resource.stat()
+        return f"{resource}:{resource_stat.st_size}:{resource_stat.st_mtime_ns}"
+
+    archive_path: str | None = getattr(
+        getattr(resource, "root", None), "filename", None
+    )
+    if archive_path is None:
+        return None
+
+    archive_stat = os.stat(archive_path)
+    return f"{archive_path}:{getattr(resource, "at", "")}:{archive_stat.st_size}:{archive_stat.st_mtime_ns}"
+
+
+def resource_digest(resource: Traversable) -> str:
+    """
+    The sha256 of a resource file, memoized on disk by the resource's identity, so big archives are only hashed
+    when they change
+    """
+    identity = _resource_identity(resource)
+    digests_directory = cache_directory("digests")
+    cache_path = (
+        None
+        if identity is None or digests_directory is None
+        else PosixPath(digests_directory, hashlib.sha256(identity.encode()).hexdigest())
+    )
+
+    if cache_path is not None:
+        try:
+            return cache_path.read_text()
+        except OSError:
+            pass
+
+    with resource.open("rb") as resource_file:
+        digest = hashlib.file_digest(resource_file, "sha256").hexdigest()
+
+    if cache_path is not None:
+        write_cache_file(cache_path, digest.encode())
+
+    return digest
+
+
+def resource_tree_version(resource: Traversable) -> str:
+    """
+    A version of a resource directory that changes whenever any file inside of it changes
+    (by the files' paths, sizes and modification times)
+    """
+    identity = _resource_identity(resource)
+    if not isinstance(resource, Path) and identity is not None:
+        return hashlib.sha256(identity.encode()).hexdigest()
+
+    tree_hash = hashlib.sha256()
+    for directory_path, directory_names, file_names in os.walk(
+        resource, followlinks=True
+    ):
+        directory_names.sort()
+
+        for file_name in sorted(file_names):
+            file_path = os.path.join(directory_path, file_name)
+            file_stat = os.stat(file_path)
+            tree_hash.update(
+                f"{os.path.relpath(file_path, resource)}:{file_stat.st_size}:{file_stat.st_mtime_ns}\n".encode()
+            )
+
+    return tree_hash.hexdigest()
@@ -0,0 +1,52 @@
+import os
+from pathlib import PosixPath
+
+STATE_DIRECTORY_ENV: str = "CONFIGOLD_STATE_DIR"
+
+
+def state_directory(*parts: str) -> PosixPath:
+    """
+    The directory configold keeps its persistent state in (logs, journals and so on)
+    """
+    base_directory = os.getenv(STATE_DIRECTORY_ENV)
+    if base_directory:
+        return PosixPath(base_directory, *parts)
+
+    xdg_state_home = os.getenv("XDG_STATE_HOME") or PosixPath(
+        os.getenv("HOME", "~"), ".local", "state"
+    )
+    return PosixPath(xdg_state_home, "configold", *parts)
+
+
+CONFIG_DIRECTORY_ENV: str = "CONFIGOLD_CONFIG_DIR"
+
+
+def config_directory(*parts: str) -> PosixPath:
+    """
+    The directory the user's own configold files are kept in (the saved profile, template overrides and so on)
+    """
+    base_directory = os.getenv(CONFIG_DIRECTORY_ENV)
+    if base_directory:
+        return PosixPath(base_directory, *parts)
+
+    xdg_config_home = os.getenv("XDG_CONFIG_HOME") or PosixPath(
+        os.getenv("HOME", "~"), ".config"
+    )
+    return PosixPath(xdg_config_home, "configold", *parts)
+
+
+DATA_DIRECTORY_ENV: str = "CONFIGOLD_DATA_DIR"
+
+
+def data_directory(*parts: str) -> PosixPath:
+    """
+    The directory configold keeps the files it generates for the user in (e.g. the rendered profiles)
+    """
+    base_directory = os.getenv(DATA_DIRECTORY_ENV)
+    if base_directory:
+        return PosixPath(base_directory, *parts)
+
+    xdg_data_home = os.getenv("XDG_DATA_HOME") or PosixPath(
+        os.getenv("HOME", "~"), ".local", "share"
+    )
+    return PosixPath(xdg_data_home, "configold", *parts)